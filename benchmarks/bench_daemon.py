@@ -0,0 +1,62 @@
+# Measures requests of daemon on fake data dictionary: first one gathers and renders, next ones within TTL are
+# served from memory, and ones after TTL only read signature of dictionary.
+# Usage: python benchmarks/bench_daemon.py [tables] [requests] [--dir DIR]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_gather import get_dictionary, OWNER
+from yet_another_oracle_doc_gen.main import check_database, close_database, gather_database, get_database_args, \
+    open_database, render_database, DEFAULT_RENDER_CACHE_SIZE, DRIVER_FAKE, LONG_FULL
+from yet_another_oracle_doc_gen.reports import MODE_HTML
+from yet_another_oracle_doc_gen.service import get_report, new_entry
+
+FUNCTIONS = {"check": check_database, "gather": gather_database, "render": render_database,
+             "close": close_database}
+
+
+def measure(entry, ttl, count):
+    start = time.perf_counter()
+    for i in range(count):
+        get_report(entry, MODE_HTML, ttl, FUNCTIONS)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark requests of daemon on fake dictionary.')
+    parser.add_argument("tables", action="store", type=int, nargs="?", default=1000)
+    parser.add_argument("requests", action="store", type=int, nargs="?", default=20)
+    parser.add_argument("--dir", help="Directory for generated dictionaries", action="store")
+    args = parser.parse_args()
+    directory = args.dir
+    if directory is None:
+        directory = os.path.join(tempfile.gettempdir(), "yaodg_bench")
+    os.makedirs(directory, exist_ok=True)
+    filename = get_dictionary(directory, args.tables)
+    settings = argparse.Namespace(driver=DRIVER_FAKE, tns=filename, user=OWNER, password="", target_user=OWNER,
+                                  dba=False, sysdba=False, incremental=None, parallel=1, shards=1,
+                                  async_gather=False, long_columns=LONG_FULL, locale="english",
+                                  render_cache=None, render_cache_size=DEFAULT_RENDER_CACHE_SIZE)
+    start = time.perf_counter()
+    database = open_database(get_database_args(settings, {}), None)
+    open_time = time.perf_counter() - start
+    entry = new_entry(database)
+    try:
+        first_time = measure(entry, 0, 1)
+        cached_time = measure(entry, 3600, args.requests)
+        checked_time = measure(entry, 0, args.requests)
+    finally:
+        close_database(database)
+    print("{} tables".format(args.tables))
+    print("Open database:        {:8.3f} s".format(open_time))
+    print("First request:        {:8.3f} s".format(first_time))
+    print("Request within TTL:   {:8.3f} s".format(cached_time))
+    print("Request after TTL:    {:8.3f} s".format(checked_time))
+
+
+if __name__ == '__main__':
+    main()
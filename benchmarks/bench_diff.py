@@ -0,0 +1,67 @@
+# Measures schema diff of two snapshots of a synthetic schema, where a small share of tables is changed.
+# Usage: python benchmarks/bench_diff.py [tables] [columns per table] [changed tables]
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_schema import make_model
+from yet_another_oracle_doc_gen.diff import diff_models
+from yet_another_oracle_doc_gen.main import load_diff_model, make_diff_report
+from yet_another_oracle_doc_gen.reports import MODE_HTML
+from yet_another_oracle_doc_gen.snapshot import save_snapshot
+
+
+def change_model(model, changed_count):
+    # every changed table gets different comment and type of its last column
+    table_ids = list(model["tables"])
+    step = max(1, len(table_ids) // max(changed_count, 1))
+    for table_id in table_ids[::step][:changed_count]:
+        table = model["tables"][table_id]
+        table["comment"] = "Changed " + table["comment"]
+        column = table["columns"][list(table["columns"])[-1]]
+        column["type"] = "VARCHAR2"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark schema diff of synthetic snapshots.')
+    parser.add_argument("tables", action="store", type=int, nargs="?", default=50000)
+    parser.add_argument("columns", help="Columns per table", action="store", type=int, nargs="?", default=20)
+    parser.add_argument("changed", help="Changed tables", action="store", type=int, nargs="?", default=100)
+    args = parser.parse_args()
+    tables_count = args.tables
+    columns_count = args.columns
+    changed_count = args.changed
+    with tempfile.TemporaryDirectory() as temp_dir:
+        old_filename = os.path.join(temp_dir, "old.snapshot")
+        new_filename = os.path.join(temp_dir, "new.snapshot")
+        save_snapshot(old_filename, {"owners": ["APP"], "gen_user": "BENCH",
+                                     "model": make_model(tables_count, columns_count)})
+        model = make_model(tables_count, columns_count)
+        change_model(model, changed_count)
+        save_snapshot(new_filename, {"owners": ["APP"], "gen_user": "BENCH", "model": model})
+        # main loads models with collector disabled
+        gc.disable()
+        start = time.perf_counter()
+        old_model = load_diff_model(old_filename)
+        new_model = load_diff_model(new_filename)
+        load_time = time.perf_counter() - start
+        start = time.perf_counter()
+        changes = diff_models(old_model, new_model)
+        diff_time = time.perf_counter() - start
+        start = time.perf_counter()
+        make_diff_report(changes, os.path.join(temp_dir, "diff.html"), "old", "new", "english", MODE_HTML)
+        report_time = time.perf_counter() - start
+    print("Schema: {} tables, {} columns, {} changed tables".format(tables_count, tables_count * columns_count,
+                                                                   len(changes["tables"])))
+    print("Load and process: {:8.3f} s".format(load_time))
+    print("Diff:             {:8.3f} s".format(diff_time))
+    print("Report:           {:8.3f} s".format(report_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# Measures gather and process stages on fake data dictionaries of different sizes, without Oracle database.
+# Usage: python benchmarks/bench_gather.py [--sizes 100,1000,10000] [--parallel N] [--shards N] [--dir DIR]
+#        [--long-columns full|skip]
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yet_another_oracle_doc_gen.fake_db import generate_schema, DICTIONARY_VERSION
+from yet_another_oracle_doc_gen.fetch import get_stats, reset_stats
+from yet_another_oracle_doc_gen.main import gather_model, process_constraints, process_indexes, process_triggers, \
+    DRIVER_FAKE, LONG_FULL, LONG_SKIP
+
+OWNER = "APP"
+
+
+def get_dictionary(directory, size):
+    # generated dictionaries are kept in directory and reused by next runs
+    filename = os.path.join(directory, "fake_{}_v{}.db".format(size, DICTIONARY_VERSION))
+    if not os.path.exists(filename):
+        start = time.perf_counter()
+        generate_schema(filename, [OWNER], size)
+        print("Generated {} tables in {:.1f} s".format(size, time.perf_counter() - start))
+    return filename
+
+
+def run(filename, parallel, shards, long_columns):
+    args = argparse.Namespace(driver=DRIVER_FAKE, tns=filename, user=OWNER, password="", target_user=OWNER,
+                              dba=False, sysdba=False, incremental=None, parallel=parallel, shards=shards,
+                              async_gather=False, long_columns=long_columns)
+    reset_stats()
+    run_stats = {"start_gather": datetime.datetime.now(), "stages": {}}
+    start = time.perf_counter()
+    model, owners = gather_model(args, run_stats)
+    gather_time = time.perf_counter() - start
+    start = time.perf_counter()
+    tables = process_constraints(model["tables"], model["constraints"])
+    tables = process_triggers(tables, model["triggers"])
+    process_indexes(tables, model["indexes"])
+    process_time = time.perf_counter() - start
+    return gather_time, process_time, run_stats["stages"], get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark gather and process stages on fake dictionaries.')
+    parser.add_argument("--sizes", help="Tables in schema, comma separated", action="store", default="100,1000,10000")
+    parser.add_argument("--parallel", action="store", type=int, default=1)
+    parser.add_argument("--shards", action="store", type=int, default=1)
+    parser.add_argument("--dir", help="Directory for generated dictionaries", action="store")
+    # SQLite has no LONG type, so only skipping of LONG columns is measured
+    parser.add_argument("--long-columns", action="store", choices=[LONG_FULL, LONG_SKIP], default=LONG_FULL)
+    args = parser.parse_args()
+    directory = args.dir
+    if directory is None:
+        directory = os.path.join(tempfile.gettempdir(), "yaodg_bench")
+    os.makedirs(directory, exist_ok=True)
+    for size in [int(size) for size in args.sizes.split(",")]:
+        filename = get_dictionary(directory, size)
+        gather_time, process_time, stages, queries = run(filename, args.parallel, args.shards, args.long_columns)
+        rows = sum(queries[query_name]["rows"] for query_name in queries)
+        print("{} tables: gather {:.3f} s, process {:.3f} s, {} dictionary rows".format(size, gather_time,
+                                                                                      process_time, rows))
+        for stage_name in stages:
+            print("    {:12} {:.3f} s".format(stage_name, stages[stage_name].total_seconds()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+# Compares HTML report rendering throughput of the legacy writer, which wrote every call to codecs stream, and the
+# buffered writer, without and with cached fragments.
+# Usage: python benchmarks/bench_html_writer.py [tables] [columns per table] [buffer size, KB]
+import argparse
+import codecs
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yet_another_oracle_doc_gen.l18n import L18n
+from yet_another_oracle_doc_gen.main import make_report_header, make_report_tables, make_report_types, \
+    process_constraints, process_indexes, process_triggers
+from yet_another_oracle_doc_gen.reports import Report, MODE_HTML
+from synthetic_schema import make_model
+
+REPEATS = 3
+WRITER_LEGACY = "legacy"
+WRITER_BUFFERED = "buffered"
+WRITER_FRAGMENTS = "fragments"
+
+
+# HTML functions as they were before buffered writer
+def legacy_add_header(file, text, size=1):
+    tag = "h" + str(size)
+    file.write('<{0}>{1}</{2}>'.format(tag, text, tag))
+
+
+def legacy_add_link(file, anchor, text, page=""):
+    file.write('<a href="#{0}">{1}</a>'.format(anchor, text))
+
+
+def legacy_add_link_anchor(file, anchor):
+    file.write('<a id="{0}"></a>'.format(anchor))
+
+
+def legacy_add_new_line(file):
+    file.write('<br>')
+
+
+def legacy_add_table(file):
+    file.write("<table border = 1>")
+
+
+def legacy_add_table_row(file):
+    file.write("<tr>")
+
+
+def legacy_add_table_cell(file, text):
+    file.write("<td>{}</td>".format(text))
+
+
+def legacy_close_table(file):
+    file.write("</table>")
+
+
+def legacy_close_table_row(file):
+    file.write("</tr>")
+
+
+def legacy_write(file, text):
+    file.write(text)
+
+
+def legacy_init(file):
+    file.write("<html>")
+    file.write("<body>")
+
+
+def legacy_open_file(filename):
+    f = codecs.open(filename, 'w', "utf-8")
+    return f
+
+
+def legacy_close_file(file, file_name=None):
+    file.write("</body>")
+    file.write("</html>")
+    file.close()
+
+
+LEGACY_FUNCTIONS = {"_add_header": legacy_add_header, "_add_link": legacy_add_link,
+                    "_add_link_anchor": legacy_add_link_anchor, "_new_line": legacy_add_new_line,
+                    "_add_table": legacy_add_table, "_add_table_row": legacy_add_table_row,
+                    "_add_table_cell": legacy_add_table_cell, "_close_table": legacy_close_table,
+                    "_close_table_row": legacy_close_table_row, "_write": legacy_write, "_init": legacy_init,
+                    "_set_file": legacy_open_file, "_close_file": legacy_close_file}
+
+
+def open_report(filename, writer, buffer_size):
+    if writer == WRITER_LEGACY:
+        report = Report(MODE_HTML)
+        for method, function in LEGACY_FUNCTIONS.items():
+            setattr(report, method, function)
+    else:
+        report = Report(MODE_HTML, buffer_size)
+    # constant parts were rendered every time before fragment cache
+    report.cache_fragments = writer == WRITER_FRAGMENTS
+    report.set_file(filename)
+    return report
+
+
+def render(tables, types, trans, filename, writer, buffer_size):
+    report = open_report(filename, writer, buffer_size)
+    make_report_header(report, tables, types, {}, ["APP"], trans, "BENCH")
+    make_report_tables(report, tables, trans)
+    make_report_types(report, types, trans)
+    report.close()
+
+
+def measure(tables, types, trans, filename, writer, buffer_size):
+    best = None
+    for i in range(REPEATS):
+        start = time.perf_counter()
+        render(tables, types, trans, filename, writer, buffer_size)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML report writers on synthetic schema.')
+    parser.add_argument("tables", action="store", type=int, nargs="?", default=5000)
+    parser.add_argument("columns", help="Columns per table", action="store", type=int, nargs="?", default=20)
+    parser.add_argument("buffer_size", help="Buffer size, KB", action="store", type=int, nargs="?", default=1024)
+    args = parser.parse_args()
+    tables_count = args.tables
+    columns_count = args.columns
+    buffer_size = args.buffer_size * 1024
+    model = make_model(tables_count, columns_count)
+    tables = process_constraints(model["tables"], model["constraints"])
+    tables = process_triggers(tables, model["triggers"])
+    tables = process_indexes(tables, model["indexes"])
+    trans = L18n()
+    trans.set_locale("english")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename = os.path.join(temp_dir, "report.html")
+        print("Schema: {} tables, {} columns".format(tables_count, tables_count * columns_count))
+        for name, writer in (("codecs writer", WRITER_LEGACY), ("buffered writer", WRITER_BUFFERED),
+                             ("cached fragments", WRITER_FRAGMENTS)):
+            elapsed = measure(tables, model["types"], trans, filename, writer, buffer_size)
+            megabytes = os.path.getsize(filename) / 1024 / 1024
+            print("{:16} {:8.3f} s {:8.1f} MB/s ({:.1f} MB)".format(name, elapsed, megabytes / elapsed, megabytes))
+
+
+if __name__ == '__main__':
+    main()
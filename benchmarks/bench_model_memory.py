@@ -0,0 +1,179 @@
+# Measures memory and garbage collection time of tables and columns, gathered from fake data dictionary: by gather
+# functions, as they were before compact model, and by current ones.
+# Usage: python benchmarks/bench_model_memory.py [tables] [--dir DIR]
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_gather import get_dictionary, OWNER
+from yet_another_oracle_doc_gen.fake_db import connect
+from yet_another_oracle_doc_gen.main import gather_columns, gather_tables, get_system_views, merge_columns
+from yet_another_oracle_doc_gen.messages import M_TABLE_TYPE_HEAP, M_TABLE_TYPE_IOT, M_TABLE_TYPE_T, \
+    M_TABLE_TYPE_TEMP, M_TABLE_TYPE_W
+from yet_another_oracle_doc_gen.queries import make_catalog
+
+
+# Gather functions as they were before compact model, tables and columns are dicts
+def legacy_get_table_id(table_owner, table_name):
+    if table_name is not None and table_owner is not None:
+        return table_owner + '.' + table_name
+    else:
+        return ""
+
+
+def legacy_replace_views(sql, available_views):
+    for i in available_views.keys():
+        sql = sql.replace(i, available_views[i])
+    return sql
+
+
+def legacy_gather_tables(connect, user, available_views):
+    cursor = connect.cursor()
+    sql_tables = """select t.table_name, c.comments, t.owner, t.temporary, t.iot_type, t.partitioned, t.nested
+                      from all_tables t
+                      left join all_tab_comments c
+                        on t.owner = c.owner
+                       and t.table_name = c.table_name
+                    where t.owner = upper(:a)
+                    and t.table_name not like 'BIN$%'
+                    order by t.table_name"""
+    sql_tables = legacy_replace_views(sql_tables, available_views)
+    cursor.execute(sql_tables, {'a': user})
+
+    tables = {}
+
+    for table_name, table_comment, table_owner, temporary, iot_type, partitioned, nested in cursor:
+        table_id = legacy_get_table_id(table_owner, table_name)
+        table_type = M_TABLE_TYPE_HEAP
+        if iot_type is not None:
+            table_type = M_TABLE_TYPE_IOT
+        elif temporary == 'Y':
+            table_type = M_TABLE_TYPE_TEMP
+        tables[table_id] = {"name": table_name, "comment": table_comment, "columns": {}, "type": M_TABLE_TYPE_T,
+                            "unique_indexes": [], "table_type": table_type, "partitioned": partitioned == 'Y',
+                            "triggers": [], "indexes": [], "nested": nested == 'YES'}
+
+    sql_views = """select t.view_name, c.comments, t.owner
+                      from all_views t
+                      left join all_tab_comments c
+                        on t.owner = c.owner
+                       and t.view_name = c.table_name
+                     where t.owner = upper(:a)
+                     order by t.view_name
+                    """
+    sql_views = legacy_replace_views(sql_views, available_views)
+    cursor.execute(sql_views, {'a': user})
+
+    for table_name, table_comment, table_owner in cursor:
+        table_id = legacy_get_table_id(table_owner, table_name)
+        tables[table_id] = {"name": table_name, "comment": table_comment, "columns": {}, "type": M_TABLE_TYPE_W,
+                            "unique_indexes": [], "triggers": [], "indexes": [], "nested": False}
+
+    return tables
+
+
+def legacy_gather_attrs(connect, user, tables, available_views):
+    cursor = connect.cursor()
+    sql_attrs = """
+                    select t.owner, t.table_name, t.column_name, c.comments, t.owner, t.data_type,
+                        t.data_length, t.data_precision, t.data_scale, t.data_default, t.nullable,
+                        t.char_length, t.char_used, dt.owner as dt_owner, dt.type_name
+                      from all_tab_columns t
+                      left join all_col_comments c
+                        on t.owner = c.owner
+                       and t.table_name = c.table_name
+                       and t.column_name = c.column_name
+                      left join all_types dt
+                        on dt.owner = t.data_type_owner
+                       and t.data_type = dt.type_name
+                     where t.owner = upper(:a)
+                     order by t.table_name, t.column_name
+                    """
+    sql_attrs = legacy_replace_views(sql_attrs, available_views)
+    cursor.execute(sql_attrs, {'a': user})
+
+    prev_table_id = None
+    attrs = {}
+    for owner, table_name, column_name, comments, owner, data_type, data_length, data_precision, data_scale, \
+            data_default, nullable, char_length, char_used, dt_owner, type_name in cursor:
+        table_id = legacy_get_table_id(owner, table_name)
+        if prev_table_id is None:
+            prev_table_id = table_id
+        if prev_table_id != table_id:
+            tables[prev_table_id]["columns"].update(attrs)
+            prev_table_id = table_id
+            attrs = {}
+        length_semantics = ''
+        if char_used is not None:
+            data_length = char_length
+            if char_used == 'C':
+                length_semantics = 'CHAR'
+            else:
+                length_semantics = 'BYTE'
+        # remove quotas in defaults for string fields
+        if data_default is not None:
+            if data_default[0] == "'":
+                data_default = data_default[1:-1]
+        attrs[column_name] = {"name": column_name, "type": data_type, "length": data_length,
+                              "precision": data_precision, "scale": data_scale, "default": data_default,
+                              "comment": comments, "primary_key": False, "nullable": nullable == 'Y',
+                              "length_semantics": length_semantics, "type_id": legacy_get_table_id(dt_owner, type_name)}
+    if prev_table_id is not None:
+        tables[prev_table_id]["columns"].update(attrs)
+    return tables
+
+
+def gather_legacy(db):
+    return legacy_gather_attrs(db, OWNER, legacy_gather_tables(db, OWNER, {}), {})
+
+
+def gather_compact(db):
+    catalog = make_catalog(get_system_views(db, False))
+    return merge_columns(gather_tables(db, [OWNER], catalog), gather_columns(db, [OWNER], catalog))
+
+
+def measure(function, db):
+    gc.collect()
+    tracked_before = len(gc.get_objects())
+    tracemalloc.start()
+    start = time.perf_counter()
+    tables = function(db)
+    build_time = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # full collection walks every tracked container of model
+    start = time.perf_counter()
+    gc.collect()
+    gc_time = time.perf_counter() - start
+    tracked = len(gc.get_objects()) - tracked_before
+    columns_count = sum(len(tables[table_id]["columns"]) for table_id in tables)
+    return len(tables), columns_count, current, peak, build_time, gc_time, tracked
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark memory of gathered tables and columns.')
+    parser.add_argument("tables", action="store", type=int, nargs="?", default=62000)
+    parser.add_argument("--dir", help="Directory for generated dictionaries", action="store")
+    args = parser.parse_args()
+    directory = args.dir
+    if directory is None:
+        directory = os.path.join(tempfile.gettempdir(), "yaodg_bench")
+    os.makedirs(directory, exist_ok=True)
+    db = connect(OWNER, "", get_dictionary(directory, args.tables))
+    for name, function in [("dict model", gather_legacy), ("compact model", gather_compact)]:
+        tables_count, columns_count, current, peak, build_time, gc_time, tracked = measure(function, db)
+        print("{}: {} tables, {} columns".format(name, tables_count, columns_count))
+        print("    Memory:          {:8.1f} MB (peak {:.1f} MB)".format(current / 1024 / 1024, peak / 1024 / 1024))
+        print("    Gather time:     {:8.3f} s".format(build_time))
+        print("    Full gc.collect: {:8.3f} s, {} tracked objects".format(gc_time, tracked))
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
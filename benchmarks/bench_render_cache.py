@@ -0,0 +1,59 @@
+# Measures HTML report rendering without render cache, with empty cache and with filled cache, when a few
+# tables are changed.
+# Usage: python benchmarks/bench_render_cache.py [tables] [columns per table] [changed tables]
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_schema import make_model
+from yet_another_oracle_doc_gen.main import make_report, process_constraints, process_foreign_keys, \
+    process_indexes, process_triggers, DEFAULT_RENDER_CACHE_SIZE
+from yet_another_oracle_doc_gen.reports import MODE_HTML
+
+
+def render(model, fk_index, filename, cache_dir):
+    now = datetime.datetime.now()
+    run_stats = {"start_gather": now, "end_gather": now, "start_process": now, "end_process": now, "stages": {}}
+    start = time.perf_counter()
+    make_report(model["tables"], model["queues"], model["types"], model["code"], run_stats, filename, ["APP"],
+                "english", "BENCH", MODE_HTML, fk_index=fk_index, cache_dir=cache_dir,
+                cache_size=DEFAULT_RENDER_CACHE_SIZE * 1024 * 1024)
+    return time.perf_counter() - start, run_stats.get("render_cache")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML rendering with render cache.')
+    parser.add_argument("tables", action="store", type=int, nargs="?", default=5000)
+    parser.add_argument("columns", help="Columns per table", action="store", type=int, nargs="?", default=20)
+    parser.add_argument("changed", help="Changed tables", action="store", type=int, nargs="?", default=3)
+    args = parser.parse_args()
+    tables_count = args.tables
+    columns_count = args.columns
+    changed_count = args.changed
+    model = make_model(tables_count, columns_count)
+    process_constraints(model["tables"], model["constraints"])
+    fk_index = process_foreign_keys(model["tables"], model["constraints"])
+    process_triggers(model["tables"], model["triggers"])
+    process_indexes(model["tables"], model["indexes"])
+    print("Schema: {} tables, {} columns".format(tables_count, tables_count * columns_count))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename = os.path.join(temp_dir, "report.html")
+        cache_dir = os.path.join(temp_dir, "cache")
+        elapsed, cache_stats = render(model, fk_index, filename, None)
+        print("{:20} {:8.3f} s".format("no cache", elapsed))
+        elapsed, cache_stats = render(model, fk_index, filename, cache_dir)
+        print("{:20} {:8.3f} s, {} misses".format("empty cache", elapsed, cache_stats["misses"]))
+        for table_id in list(model["tables"])[:changed_count]:
+            model["tables"][table_id]["comment"] = "Changed"
+        elapsed, cache_stats = render(model, fk_index, filename, cache_dir)
+        print("{:20} {:8.3f} s, {} hits, {} misses".format("{} changed".format(changed_count), elapsed,
+                                                           cache_stats["hits"], cache_stats["misses"]))
+
+
+if __name__ == '__main__':
+    main()
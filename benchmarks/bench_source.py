@@ -0,0 +1,85 @@
+# Measures memory of PL/SQL source on fake data dictionary: all source gathered into dict at once, as model would
+# keep it, and source streamed unit by unit, as reports read it. Packages of generated dictionary are padded with
+# source lines, so units have size of real ones.
+# Usage: python benchmarks/bench_source.py [tables] [--lines N] [--dir DIR]
+import argparse
+import itertools
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_gather import OWNER
+from yet_another_oracle_doc_gen.fake_db import connect, generate_schema, DICTIONARY_VERSION
+from yet_another_oracle_doc_gen.fetch import fetch_rows, SIZE_LARGE
+from yet_another_oracle_doc_gen.main import gather_code, get_code_source, get_code_units, get_object_filter, \
+    get_system_views, open_source_stream, set_binary_sort
+from yet_another_oracle_doc_gen.queries import get_statement, make_catalog
+
+SOURCE_LINE = "    l_value := nvl(p_value, l_default); -- keeps value of column, when it is set\n"
+
+
+def get_dictionary(directory, size, lines):
+    # every package gets lines after its declarations, line numbers of the last line go on
+    filename = os.path.join(directory, "source_{}_{}_v{}.db".format(size, lines, DICTIONARY_VERSION))
+    if not os.path.exists(filename):
+        generate_schema(filename, [OWNER], size)
+        db = sqlite3.connect(filename)
+        units = db.execute("select owner, name, type, max(line) from all_source group by owner, name, type").fetchall()
+        for owner, name, unit_type, last_line in units:
+            db.executemany("insert into all_source values (?, ?, ?, ?, ?)",
+                           ((owner, name, unit_type, last_line + n, SOURCE_LINE) for n in range(1, lines + 1)))
+        db.commit()
+        db.close()
+    return filename
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = function(*args)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def gather_all(db, owners, catalog):
+    owner_filter, owner_params = get_object_filter("s.owner", owners)
+    sql_source = get_statement(catalog, "code_source", owner_filter=owner_filter)
+    rows = fetch_rows(db, "source", sql_source, owner_params, SIZE_LARGE)
+    sources = {key: get_code_source(unit_rows) for key, unit_rows in itertools.groupby(rows, key=lambda row: row[:3])}
+    return sum(len(sources[key]) for key in sources)
+
+
+def stream_all(db, owners, catalog):
+    code = gather_code(db, owners, catalog)
+    return sum(len(source) for i, unit, source in get_code_units(code, open_source_stream(db, owners, catalog)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark memory of gathered and streamed source.')
+    parser.add_argument("tables", action="store", type=int, nargs="?", default=10000)
+    parser.add_argument("--lines", help="Lines added to every unit", action="store", type=int, default=2000)
+    parser.add_argument("--dir", help="Directory for generated dictionaries", action="store")
+    args = parser.parse_args()
+    directory = args.dir
+    if directory is None:
+        directory = os.path.join(tempfile.gettempdir(), "yaodg_bench")
+    os.makedirs(directory, exist_ok=True)
+    db = connect(OWNER, "", get_dictionary(directory, args.tables, args.lines))
+    set_binary_sort(db)
+    catalog = make_catalog(get_system_views(db, False))
+    for name, function in [("gathered", gather_all), ("streamed", stream_all)]:
+        elapsed, peak, size = measure(function, db, [OWNER], catalog)
+        print("{:10} {:8.3f} s, peak {:8.1f} MB, {:.1f} MB of source".format(name, elapsed, peak / 1024 / 1024,
+                                                                            size / 1024 / 1024))
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# Measures cold start of generator: time of help over bare interpreter start, and modules, which are loaded by it.
+# Exits with error, when start is over budget or loads modules, which are needed only by some modes.
+# Usage: python benchmarks/bench_startup.py [budget, ms] [runs]
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = 60
+DEFAULT_RUNS = 10
+# drivers are imported on connect, backends on first report of their type, the rest by functions using them.
+# HTML functions are loaded with JSON lines writer, which shares their buffer
+LAZY_MODULES = ["cx_Oracle", "oracledb", "sqlite3", "asyncio", "concurrent.futures", "hashlib", "zipfile",
+                "yet_another_oracle_doc_gen.fake_db", "yet_another_oracle_doc_gen.diff",
+                "yet_another_oracle_doc_gen.render_cache", "yet_another_oracle_doc_gen.report_functions.ms_word"]
+LOADED_MODULES = """
+import sys
+sys.argv = ["yet_another_oracle_doc_gen", "--help"]
+try:
+    import runpy
+    runpy.run_module("yet_another_oracle_doc_gen", run_name="__main__")
+except SystemExit:
+    pass
+sys.stderr.write("\\n".join(sys.modules))
+"""
+
+
+def get_start_time(command, runs):
+    # best of runs, others are slowed by other processes
+    times = []
+    for i in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=PACKAGE_DIR, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def get_loaded_modules():
+    result = subprocess.run([sys.executable, "-c", LOADED_MODULES], cwd=PACKAGE_DIR, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, check=True, universal_newlines=True)
+    return set(result.stderr.split("\n"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold start of generator.')
+    parser.add_argument("budget", help="Budget of start, ms", action="store", type=float, nargs="?",
+                        default=DEFAULT_BUDGET)
+    parser.add_argument("runs", action="store", type=int, nargs="?", default=DEFAULT_RUNS)
+    args = parser.parse_args()
+    budget = args.budget
+    runs = args.runs
+    interpreter_time = get_start_time([sys.executable, "-c", "pass"], runs)
+    help_time = get_start_time([sys.executable, "-m", "yet_another_oracle_doc_gen", "--help"], runs)
+    start_time = (help_time - interpreter_time) * 1000
+    print("Interpreter: {:8.1f} ms".format(interpreter_time * 1000))
+    print("Help:        {:8.1f} ms".format(help_time * 1000))
+    print("Start:       {:8.1f} ms, budget {:.1f} ms".format(start_time, budget))
+    loaded = [module for module in LAZY_MODULES if module in get_loaded_modules()]
+    if len(loaded) > 0:
+        print("Loaded on start: {}".format(", ".join(loaded)))
+    if start_time > budget or len(loaded) > 0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import random
+from yet_another_oracle_doc_gen.main import make_column, make_table
+
+# Column types of synthetic schema with their lengths, precisions and scales
+COLUMN_TYPES = [("VARCHAR2", 100, None, None), ("NUMBER", 22, 10, 0), ("NUMBER", 22, 12, 2), ("DATE", 7, None, None),
+                ("CHAR", 1, None, None), ("CLOB", 4000, None, None)]
+
+
+def make_model(tables_count, columns_count, owner="APP", seed=1):
+    # model in form, returned by gather stages, with primary keys, foreign keys to previous tables and indexes.
+    # Tables and columns are built by the same functions as gathered ones
+    rnd = random.Random(seed)
+    tables = {}
+    constraints = {}
+    indexes = {}
+    for i in range(tables_count):
+        table_name = "TABLE_{:06d}".format(i)
+        table_id = owner + "." + table_name
+        table = make_table(table_name, "Synthetic table {}".format(i), owner, 'N', None, 'NO', 'NO')
+        for j in range(columns_count):
+            column_name = "COLUMN_{:03d}".format(j)
+            data_type, data_length, data_precision, data_scale = rnd.choice(COLUMN_TYPES)
+            char_used = None
+            if data_type in ("VARCHAR2", "CHAR"):
+                char_used = 'C'
+            nullable = 'N' if j == 0 else 'Y'
+            table["columns"][column_name] = make_column(column_name,
+                                                        "Column {} of table {} <{}>".format(j, i, data_type.lower()),
+                                                        data_type, data_length, data_precision, data_scale, None,
+                                                        nullable, data_length, char_used, None, None)
+        tables[table_id] = table
+        pk_name = "PK_" + table_name
+        constraints[(owner, pk_name)] = {"table": table_id, "type": "P", "name": pk_name, "owner": owner,
+                                         "columns": ["COLUMN_000"], "check": None, "index_owner": owner,
+                                         "index_name": pk_name, "ref_owner": None, "ref_constr": None,
+                                         "ref_table": ""}
+        indexes[owner + "." + pk_name] = {"table": table_id, "type": "NORMAL", "columns": ["COLUMN_000"],
+                                          "columns_order": ["ASC"], "owner": owner, "name": pk_name}
+        if i > 0 and columns_count > 1:
+            fk_name = "FK_" + table_name
+            ref_table_name = "TABLE_{:06d}".format(rnd.randrange(i))
+            constraints[(owner, fk_name)] = {"table": table_id, "type": "R", "name": fk_name, "owner": owner,
+                                             "columns": ["COLUMN_001"], "check": None, "index_owner": None,
+                                             "index_name": None, "ref_owner": owner,
+                                             "ref_constr": "PK_" + ref_table_name,
+                                             "ref_table": owner + "." + ref_table_name}
+    return {"tables": tables, "constraints": constraints, "indexes": indexes, "triggers": {}, "queues": {},
+            "types": {}, "code": {}}
@@ -11,6 +11,13 @@ setup(
     # Project uses reStructuredText, so ensure that the docutils get
     # installed or upgraded on the target machine
     install_requires=["cx_oracle>=7.3.0"],
+    # thin driver without Oracle Client libraries, asyncio connections appeared in 2.0
+    extras_require={"oracledb": ["oracledb>=2.0"]},
+    # built in report types are imported directly, other packages could add their own types as modules with report
+    # functions to "yet_another_oracle_doc_gen.report_backends" entry point group
+    entry_points={
+        "console_scripts": ["yet_another_oracle_doc_gen = yet_another_oracle_doc_gen.main:main"],
+    },
 
     package_data={
         "": ["*.py", "*.lng"],
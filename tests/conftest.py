@@ -0,0 +1,73 @@
+import itertools
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yet_another_oracle_doc_gen.fake_db import generate_schema
+from yet_another_oracle_doc_gen.main import main
+
+OWNERS = ["APP", "REF"]
+TABLES = 120
+# footer of report has timings, which differ for every run
+FOOTER = "<h1>Time report</h1>"
+
+
+def get_database_argv(dictionary):
+    return ["--driver", "fake", "-t", dictionary, "-u", OWNERS[0], "-r", ",".join(OWNERS), "-p", "x"]
+
+
+def read_report(filename):
+    with open(filename, "r", encoding="utf-8") as f:
+        return f.read().split(FOOTER)[0]
+
+
+def change_dictionary(dictionary, *statements):
+    db = sqlite3.connect(dictionary)
+    for statement in statements:
+        db.execute(statement)
+    db.commit()
+    db.close()
+
+
+@pytest.fixture(scope="session")
+def dictionary(tmp_path_factory):
+    # generated once, tests, which change it, change its copy
+    filename = str(tmp_path_factory.mktemp("fake") / "dictionary.db")
+    generate_schema(filename, OWNERS, TABLES)
+    return filename
+
+
+@pytest.fixture
+def changed_dictionary(dictionary, tmp_path):
+    filename = str(tmp_path / "changed.db")
+    shutil.copyfile(dictionary, filename)
+    return filename
+
+
+@pytest.fixture
+def run(monkeypatch):
+    # runs generator as from command line
+    def run_main(*argv):
+        monkeypatch.setattr(sys, "argv", ["yet_another_oracle_doc_gen"] + [str(arg) for arg in argv])
+        main()
+    return run_main
+
+
+@pytest.fixture
+def report(run, tmp_path):
+    # makes report of fake dictionary, or of snapshot without it, and returns it without footer
+    numbers = itertools.count()
+
+    def make_report(*options, file_type="html", database=None):
+        filename = str(tmp_path / "report_{}.{}".format(next(numbers), file_type))
+        argv = ["-ft", file_type, "-f", filename]
+        if database is not None:
+            argv += get_database_argv(database)
+        run(*(argv + list(options)))
+        return read_report(filename)
+    return make_report
@@ -0,0 +1,38 @@
+import json
+
+from conftest import change_dictionary, get_database_argv
+
+
+def make_snapshots(dictionary, changed_dictionary, run, tmp_path):
+    old_snapshot = str(tmp_path / "old.snapshot")
+    new_snapshot = str(tmp_path / "new.snapshot")
+    run(*(get_database_argv(dictionary) + ["--save-snapshot", old_snapshot, "-f", str(tmp_path / "old.html")]))
+    run(*(get_database_argv(changed_dictionary) + ["--save-snapshot", new_snapshot, "-f", str(tmp_path / "new.html")]))
+    return old_snapshot, new_snapshot
+
+
+def read_changes(run, tmp_path, old_snapshot, new_snapshot):
+    filename = str(tmp_path / "diff.jsonl")
+    run("--diff", old_snapshot, new_snapshot, "-ft", "jsonl", "-f", filename)
+    with open(filename, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_diff_of_same_models(dictionary, run, tmp_path):
+    old_snapshot, new_snapshot = make_snapshots(dictionary, dictionary, run, tmp_path)
+    assert read_changes(run, tmp_path, old_snapshot, new_snapshot) == []
+
+
+def test_diff_of_changed_models(dictionary, changed_dictionary, run, tmp_path):
+    change_dictionary(changed_dictionary,
+                      "update all_tab_columns set data_precision = 12 where owner = 'APP' and table_name = "
+                      "'TABLE_000005' and column_name = 'ID'",
+                      "insert into all_tables values ('REF', 'NEW_TABLE', 'N', null, 'NO', 'NO')",
+                      "insert into all_tab_columns values ('REF', 'NEW_TABLE', 'ID', 1, 'NUMBER', null, 22, 10, 0, "
+                      "null, 'N', null, null)")
+    old_snapshot, new_snapshot = make_snapshots(dictionary, changed_dictionary, run, tmp_path)
+    changes = read_changes(run, tmp_path, old_snapshot, new_snapshot)
+    assert [(change["id"], change["change"]) for change in changes] == [("APP.TABLE_000005", "changed"),
+                                                                        ("REF.NEW_TABLE", "added")]
+    assert changes[0]["changes"] == [{"part": "columns", "name": "ID", "field": "precision", "change": "changed",
+                                      "old": 10, "new": 12}]
@@ -0,0 +1,23 @@
+import re
+
+import pytest
+
+# streamed reports have no foreign key index, as referencing tables may come later
+FK_INDEX_PARTS = re.compile(r"Dependency level: [^<]*<br>|"
+                            r"<br>Referenced by:<br><br>(<a [^>]*>[^<]*</a> \([^)]*\)<br>)*")
+
+
+@pytest.mark.parametrize("options", [["--parallel", 3], ["--shards", 2], ["--parallel", 3, "--shards", 2],
+                                     ["--async"], ["--async", "--shards", 2]])
+def test_gather_modes_make_same_report(dictionary, report, options):
+    assert report(*options, database=dictionary) == report(database=dictionary)
+
+
+def test_stream_makes_same_report(dictionary, report):
+    full = report(database=dictionary)
+    assert "Referenced by:" in full
+    assert report("--stream", database=dictionary) == FK_INDEX_PARTS.sub("", full)
+
+
+def test_stream_makes_same_records(dictionary, report):
+    assert report("--stream", file_type="jsonl", database=dictionary) == report(file_type="jsonl", database=dictionary)
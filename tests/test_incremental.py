@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from conftest import change_dictionary
+
+
+def test_incremental_without_changes(changed_dictionary, report, tmp_path):
+    state = str(tmp_path / "state")
+    full = report(database=changed_dictionary)
+    assert report("--incremental", state, database=changed_dictionary) == full
+    assert report("--incremental", state, database=changed_dictionary) == full
+
+
+def test_incremental_with_changes(changed_dictionary, report, tmp_path):
+    state = str(tmp_path / "state")
+    profile = str(tmp_path / "profile.json")
+    before = report("--incremental", state, database=changed_dictionary)
+    # table with the same name is in other schema too, it isn't gathered again
+    change_dictionary(changed_dictionary,
+                      "update all_tab_columns set data_precision = 12 where owner = 'APP' and table_name = "
+                      "'TABLE_000005' and column_name = 'ID'",
+                      "update all_objects set last_ddl_time = '2022-01-01 00:00:00' where owner = 'APP' and "
+                      "object_name = 'TABLE_000005'")
+    incremental = report("--incremental", state, "--profile-json", profile, database=changed_dictionary)
+    assert incremental != before
+    assert incremental == report(database=changed_dictionary)
+    with open(profile, "r", encoding="utf-8") as f:
+        queries = json.load(f)["queries"]
+    assert queries["tables"]["rows"] == 1
+
+
+@pytest.mark.parametrize("options", [["--parallel", 2], ["--shards", 2], ["--async"]])
+def test_incremental_rejects_concurrent_gather(run, tmp_path, options):
+    with pytest.raises(SystemExit):
+        run("--incremental", str(tmp_path / "state"), *options)
@@ -0,0 +1,18 @@
+import json
+
+
+def read_cache_stats(filename):
+    with open(filename, "r", encoding="utf-8") as f:
+        return json.load(f)["render_cache"]
+
+
+def test_render_cache_hits(dictionary, report, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    profile = str(tmp_path / "profile.json")
+    first = report("--render-cache", cache_dir, "--profile-json", profile, database=dictionary)
+    assert read_cache_stats(profile)["hits"] == 0
+    second = report("--render-cache", cache_dir, "--profile-json", profile, database=dictionary)
+    stats = read_cache_stats(profile)
+    assert stats["misses"] == 0
+    assert stats["hits"] > 0
+    assert first == second == report(database=dictionary)
@@ -0,0 +1,62 @@
+import sys
+
+import pytest
+
+from conftest import change_dictionary, get_database_argv
+from yet_another_oracle_doc_gen.main import check_database, close_database, gather_database, get_settings, \
+    open_database, render_database
+from yet_another_oracle_doc_gen.reports import MODE_HTML
+from yet_another_oracle_doc_gen.service import get_report, new_entry
+
+TTL = 3600
+
+
+@pytest.fixture
+def entry(changed_dictionary, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["yet_another_oracle_doc_gen"] + get_database_argv(changed_dictionary))
+    database = open_database(get_settings(), None)
+    yield new_entry(database)
+    close_database(database)
+
+
+@pytest.fixture
+def calls():
+    # counts calls of daemon functions
+    counts = {"check": 0, "gather": 0, "render": 0}
+    functions = {"check": check_database, "gather": gather_database, "render": render_database}
+
+    def counted(name):
+        def call(*args):
+            counts[name] += 1
+            return functions[name](*args)
+        return call
+    return counts, {name: counted(name) for name in functions}
+
+
+def test_model_is_kept_within_ttl(entry, calls):
+    counts, functions = calls
+    first = get_report(entry, MODE_HTML, TTL, functions)
+    assert get_report(entry, MODE_HTML, TTL, functions) == first
+    assert counts == {"check": 0, "gather": 1, "render": 1}
+
+
+def test_model_is_checked_after_ttl(entry, calls):
+    counts, functions = calls
+    first = get_report(entry, MODE_HTML, 0, functions)
+    assert get_report(entry, MODE_HTML, 0, functions) == first
+    assert get_report(entry, MODE_HTML, TTL, functions, check=True) == first
+    assert counts == {"check": 2, "gather": 1, "render": 1}
+
+
+def test_model_is_gathered_after_change(entry, calls, changed_dictionary):
+    counts, functions = calls
+    first = get_report(entry, MODE_HTML, 0, functions)
+    change_dictionary(changed_dictionary,
+                      "delete from all_tab_comments where owner = 'APP' and table_name = 'TABLE_000005'",
+                      "insert into all_tab_comments values ('APP', 'TABLE_000005', 'Changed table')",
+                      "update all_objects set last_ddl_time = '2022-01-01 00:00:00' where owner = 'APP' and "
+                      "object_name = 'TABLE_000005'")
+    second = get_report(entry, MODE_HTML, 0, functions)
+    assert second != first
+    assert b"Changed table" in second
+    assert counts == {"check": 1, "gather": 2, "render": 2}
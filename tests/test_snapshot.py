@@ -0,0 +1,17 @@
+import json
+
+
+def read_records(text):
+    # source of program units isn't kept in snapshot, it is read from database at render time
+    records = [json.loads(line) for line in text.splitlines()]
+    for record in records:
+        record.pop("source", None)
+    return records
+
+
+def test_report_from_snapshot(dictionary, report, tmp_path):
+    snapshot = str(tmp_path / "model.snapshot")
+    gathered = report("--save-snapshot", snapshot, file_type="jsonl", database=dictionary)
+    loaded = report("--from-snapshot", snapshot, file_type="jsonl")
+    assert read_records(loaded) == read_records(gathered)
+
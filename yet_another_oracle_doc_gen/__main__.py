@@ -0,0 +1,3 @@
+from yet_another_oracle_doc_gen.main import main
+
+main()
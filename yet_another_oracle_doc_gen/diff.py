@@ -0,0 +1,115 @@
+import hashlib
+import marshal
+
+# Differences between two processed models. Every object is hashed, so unchanged ones are skipped by comparing
+# digests, and only changed objects are compared field by field
+CHANGE_ADDED = "added"
+CHANGE_DROPPED = "dropped"
+CHANGE_CHANGED = "changed"
+DIGEST_SIZE = 16
+# first marshal version writes every value as it is, later ones mark interned and repeated objects, so equal
+# objects could be written differently
+MARSHAL_VERSION = 0
+# parts of objects, which are lists or dicts of named elements
+TABLE_PARTS = ("columns", "unique_indexes", "indexes", "triggers")
+TYPE_PARTS = ("attrs", "methods")
+CODE_PARTS = ("subprograms",)
+
+
+def get_values(value):
+    # records are compared by their packed values, dicts as they are
+    if hasattr(value, "pack"):
+        return value.pack()
+    return value
+
+
+def get_object_hash(value):
+    # packed records and gathered dicts hold only builtin values, filled in gather order
+    return hashlib.blake2b(marshal.dumps(get_values(value), MARSHAL_VERSION), digest_size=DIGEST_SIZE).digest()
+
+
+def get_object_hashes(objects):
+    return {object_id: get_object_hash(objects[object_id]) for object_id in objects}
+
+
+def make_change(part, name, change, field=None, old=None, new=None):
+    return {"part": part, "name": name, "field": field, "change": change, "old": old, "new": new}
+
+
+def get_named(elements):
+    # columns are mapping by name already, other parts are lists of dicts with names.
+    # Overloaded methods have same names, so repeated names get numbers
+    if hasattr(elements, "keys"):
+        return elements
+    named = {}
+    for element in elements:
+        name = element["name"]
+        n = 1
+        while name in named:
+            n += 1
+            name = "{} ({})".format(element["name"], n)
+        named[name] = element
+    return named
+
+
+def diff_fields(part, name, old, new, skip=()):
+    changes = []
+    for field in new.keys():
+        if field in skip:
+            continue
+        if old.get(field) != new[field]:
+            changes.append(make_change(part, name, CHANGE_CHANGED, field, old.get(field), new[field]))
+    for field in old.keys():
+        if field not in skip and field not in new:
+            changes.append(make_change(part, name, CHANGE_CHANGED, field, old[field], None))
+    return changes
+
+
+def diff_part(part, old, new):
+    old = get_named(old)
+    new = get_named(new)
+    changes = []
+    for name in new:
+        if name not in old:
+            changes.append(make_change(part, name, CHANGE_ADDED))
+        elif get_values(old[name]) != get_values(new[name]):
+            changes.extend(diff_fields(part, name, old[name], new[name]))
+    for name in old:
+        if name not in new:
+            changes.append(make_change(part, name, CHANGE_DROPPED))
+    return changes
+
+
+def diff_object(old, new, parts):
+    changes = diff_fields("", "", old, new, parts)
+    for part in parts:
+        if part in new or part in old:
+            changes.extend(diff_part(part, old.get(part, ()), new.get(part, ())))
+    return changes
+
+
+def diff_objects(old_objects, new_objects, parts=()):
+    # list of object id, change and changes of its fields and parts, in order of new model, dropped objects last
+    old_hashes = get_object_hashes(old_objects)
+    new_hashes = get_object_hashes(new_objects)
+    changes = []
+    for object_id in new_hashes:
+        old_hash = old_hashes.get(object_id)
+        if old_hash is None:
+            changes.append((object_id, CHANGE_ADDED, []))
+        elif old_hash != new_hashes[object_id]:
+            # objects with same values in other order of dict keys are equal, but have different hashes
+            object_changes = diff_object(old_objects[object_id], new_objects[object_id], parts)
+            if len(object_changes) > 0:
+                changes.append((object_id, CHANGE_CHANGED, object_changes))
+    for object_id in old_hashes:
+        if object_id not in new_hashes:
+            changes.append((object_id, CHANGE_DROPPED, []))
+    return changes
+
+
+def diff_models(old_model, new_model):
+    return {"tables": diff_objects(old_model["tables"], new_model["tables"], TABLE_PARTS),
+            "queues": diff_objects(old_model["queues"], new_model["queues"]),
+            "types": diff_objects(old_model["types"], new_model["types"], TYPE_PARTS),
+            "code": diff_objects(old_model["code"], new_model["code"], CODE_PARTS)}
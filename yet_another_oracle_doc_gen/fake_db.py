@@ -0,0 +1,415 @@
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import sqlite3
+import urllib.request
+
+# Stand-in for cx_Oracle, which reads data dictionary views from SQLite file instead of Oracle database.
+# TNS is the file name, user and password are ignored. File is filled by generate_schema.
+SYSDBA = 2
+DEFAULT_AUTH = 0
+SPOOL_ATTRVAL_WAIT = 1
+# changed with dictionary views, so files generated by older versions aren't reused
+DICTIONARY_VERSION = 2
+
+DICTIONARY_DDL = """
+create table product_component_version(product text, version text);
+create table all_users(username text);
+create table all_objects(owner text, object_name text, object_type text, last_ddl_time text);
+create table all_tables(owner text, table_name text, temporary text, iot_type text, partitioned text, nested text);
+create table all_tab_comments(owner text, table_name text, comments text);
+create table all_views(owner text, view_name text);
+create table all_tab_columns(owner text, table_name text, column_name text, column_id int, data_type text,
+    data_type_owner text, data_length int, data_precision int, data_scale int, data_default text, nullable text,
+    char_length int, char_used text);
+create table all_tab_cols(owner text, table_name text, column_name text, data_default text, virtual_column text);
+create table all_col_comments(owner text, table_name text, column_name text, comments text);
+create table all_constraints(owner text, table_name text, constraint_name text, constraint_type text,
+    search_condition text, r_owner text, r_constraint_name text, index_owner text, index_name text);
+create table all_cons_columns(owner text, table_name text, constraint_name text, column_name text, position int);
+create table all_indexes(owner text, index_name text, table_owner text, table_name text, index_type text);
+create table all_ind_columns(index_owner text, index_name text, table_owner text, table_name text,
+    column_name text, column_position int, descend text);
+create table all_triggers(owner text, trigger_name text, trigger_type text, triggering_event text,
+    table_owner text, table_name text, base_object_type text);
+create table all_queues(owner text, name text, queue_table text, user_comment text, queue_type text);
+create table all_types(owner text, type_name text, typecode text);
+create table all_coll_types(owner text, type_name text, coll_type text, upper_bound int, elem_type_name text,
+    length int, precision int, scale int);
+create table all_type_attrs(owner text, type_name text, attr_name text, attr_type_owner text, attr_type_mod text,
+    attr_type_name text, precision int, scale int, attr_no int, length int);
+create table all_type_methods(owner text, type_name text, method_name text, method_no int);
+create table all_procedures(owner text, object_name text, procedure_name text, object_type text, subprogram_id int,
+    overload text);
+create table all_arguments(owner text, package_name text, object_name text, subprogram_id int, argument_name text,
+    position int, sequence int, data_level int, data_type text, in_out text);
+create table all_source(owner text, name text, type text, line int, text text);
+create index all_objects_i on all_objects(owner, object_name, object_type);
+create index all_tables_i on all_tables(owner, table_name);
+create index all_tab_comments_i on all_tab_comments(owner, table_name);
+create index all_views_i on all_views(owner, view_name);
+create index all_tab_columns_i on all_tab_columns(owner, table_name, column_name);
+create index all_tab_cols_i on all_tab_cols(owner, table_name, column_name);
+create index all_col_comments_i on all_col_comments(owner, table_name, column_name);
+create index all_constraints_i on all_constraints(owner, constraint_name);
+create index all_cons_columns_i on all_cons_columns(owner, table_name, constraint_name);
+create index all_indexes_i on all_indexes(owner, index_name);
+create index all_ind_columns_i on all_ind_columns(index_owner, index_name);
+create index all_types_i on all_types(owner, type_name);
+create index all_source_i on all_source(owner, name, type, line);
+"""
+
+# Column types with their lengths, precisions and scales, repeated by frequency
+COLUMN_TYPES = [("NUMBER", 22, None, None), ("NUMBER", 22, 10, 0), ("NUMBER", 22, 10, 0), ("NUMBER", 22, 12, 2),
+                ("VARCHAR2", 30, None, None), ("VARCHAR2", 100, None, None), ("VARCHAR2", 255, None, None),
+                ("VARCHAR2", 4000, None, None), ("DATE", 7, None, None), ("DATE", 7, None, None),
+                ("TIMESTAMP(6)", 11, None, 6), ("CHAR", 1, None, None), ("CLOB", 4000, None, None)]
+DEFAULTS = {"NUMBER": "0", "VARCHAR2": "'N/A'", "DATE": "sysdate", "CHAR": "'N'"}
+
+
+class Error:
+    def __init__(self, message):
+        self.message = message
+
+
+class DatabaseError(Exception):
+    pass
+
+
+def decode(value, *pairs):
+    for i in range(0, len(pairs) - 1, 2):
+        if value == pairs[i]:
+            return pairs[i + 1]
+    if len(pairs) % 2 == 1:
+        return pairs[-1]
+    return None
+
+
+def nvl(value, replacement):
+    if value is None:
+        return replacement
+    return value
+
+
+class Cursor:
+    def __init__(self, connection):
+        self.cursor = connection.db.cursor()
+        self.arraysize = 100
+        self.prefetchrows = 2
+        self.description = None
+
+    def execute(self, sql, params=None):
+        # session settings make no sense for SQLite, which always sorts binary
+        if sql.lstrip().lower().startswith("alter session"):
+            return None
+        try:
+            self.cursor.execute(sql, params or {})
+        except sqlite3.Error as exc:
+            raise DatabaseError(Error(str(exc)))
+        self.description = self.cursor.description
+        return self
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchmany(self, rows=None):
+        if rows is None:
+            rows = self.arraysize
+        return self.cursor.fetchmany(rows)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        self.cursor.close()
+
+
+class Connection:
+    def __init__(self, dsn):
+        if not os.path.exists(dsn):
+            raise DatabaseError(Error("Fake dictionary {} not found".format(dsn)))
+        uri = "file:{}?mode=ro".format(urllib.request.pathname2url(os.path.abspath(dsn)))
+        self.db = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self.db.create_function("decode", -1, decode)
+        self.db.create_function("nvl", 2, nvl)
+        # like in Oracle is case sensitive
+        self.db.execute("pragma case_sensitive_like = on")
+        self.stmtcachesize = 20
+
+    def cursor(self):
+        return Cursor(self)
+
+    def close(self):
+        self.db.close()
+
+
+def connect(user, password, dsn, mode=DEFAULT_AUTH, **kwargs):
+    return Connection(dsn)
+
+
+class SessionPool:
+    # released connections are kept open and given to next acquire, like sessions of real pool
+    def __init__(self, user, password, dsn, min=1, max=2, increment=1, threaded=False, getmode=None, **kwargs):
+        self.dsn = dsn
+        self.stmtcachesize = 20
+        self.idle = []
+        self.session_callback = kwargs.get("sessionCallback")
+
+    def acquire(self):
+        try:
+            return self.idle.pop()
+        except IndexError:
+            connection = Connection(self.dsn)
+            if self.session_callback is not None:
+                self.session_callback(connection, None)
+            return connection
+
+    def release(self, connection):
+        self.idle.append(connection)
+
+    def close(self, force=False):
+        while len(self.idle) > 0:
+            self.idle.pop().close()
+
+
+class AsyncCursor(Cursor):
+    # SQLite runs queries at once, asyncio cursor only lets other tasks run between calls
+    async def execute(self, sql, params=None):
+        await asyncio.sleep(0)
+        return Cursor.execute(self, sql, params)
+
+    async def fetchmany(self, rows=None):
+        await asyncio.sleep(0)
+        return Cursor.fetchmany(self, rows)
+
+    async def fetchall(self):
+        await asyncio.sleep(0)
+        return Cursor.fetchall(self)
+
+
+class AsyncConnection(Connection):
+    def cursor(self):
+        return AsyncCursor(self)
+
+    async def close(self):
+        Connection.close(self)
+
+
+async def connect_async(user=None, password=None, dsn=None, mode=DEFAULT_AUTH, **kwargs):
+    return AsyncConnection(dsn)
+
+
+class AsyncConnectionPool:
+    def __init__(self, dsn):
+        self.dsn = dsn
+
+    async def acquire(self):
+        return AsyncConnection(self.dsn)
+
+    async def release(self, connection):
+        await connection.close()
+
+    async def close(self, force=False):
+        pass
+
+
+def create_pool_async(user=None, password=None, dsn=None, min=1, max=2, increment=1, **kwargs):
+    return AsyncConnectionPool(dsn)
+
+
+def get_columns_count(rnd):
+    # most tables are narrow, some are wide
+    if rnd.random() < 0.1:
+        return rnd.randint(30, 80)
+    return rnd.randint(3, 20)
+
+
+def generate_schema(filename, owners, tables_count, seed=1):
+    # tables_count is per schema. Every table has primary key and NOT NULL checks; most have foreign keys
+    # to tables made before and indexes on them, some have unique keys, checks, function based indexes and triggers.
+    # Every tenth object is view, every hundredth is type, every 50th table has package with its body, every 500th
+    # table has queue
+    rnd = random.Random(seed)
+    if os.path.exists(filename):
+        os.remove(filename)
+    db = sqlite3.connect(filename)
+    db.executescript(DICTIONARY_DDL)
+    db.execute("insert into product_component_version values ('Oracle Database', '19.0.0.0.0')")
+    ddl_time = datetime.datetime(2021, 1, 1)
+    rows = {}
+
+    def add(view, *values):
+        rows.setdefault(view, []).append(values)
+
+    for owner in owners:
+        add("all_users", owner)
+        for i in range(tables_count):
+            table_name = "TABLE_{:06d}".format(i)
+            temporary = 'Y' if rnd.random() < 0.02 else 'N'
+            iot_type = 'IOT' if rnd.random() < 0.02 else None
+            partitioned = 'YES' if rnd.random() < 0.05 else 'NO'
+            add("all_tables", owner, table_name, temporary, iot_type, partitioned, 'NO')
+            add("all_objects", owner, table_name, "TABLE", str(ddl_time + datetime.timedelta(minutes=i)))
+            if rnd.random() < 0.9:
+                add("all_tab_comments", owner, table_name, "Table {} of {}".format(i, owner))
+            columns = ["ID"]
+            add("all_tab_columns", owner, table_name, "ID", 1, "NUMBER", None, 22, 10, 0, None, 'N', None, None)
+            for j in range(1, get_columns_count(rnd)):
+                column_name = "COLUMN_{:03d}".format(j)
+                columns.append(column_name)
+                data_type, data_length, data_precision, data_scale = rnd.choice(COLUMN_TYPES)
+                char_length = None
+                char_used = None
+                if data_type in ("VARCHAR2", "CHAR"):
+                    char_length = data_length
+                    char_used = 'B' if rnd.random() < 0.3 else 'C'
+                data_default = None
+                if data_type in DEFAULTS and rnd.random() < 0.1:
+                    data_default = DEFAULTS[data_type]
+                nullable = 'N' if rnd.random() < 0.3 else 'Y'
+                add("all_tab_columns", owner, table_name, column_name, j + 1, data_type, None, data_length,
+                    data_precision, data_scale, data_default, nullable, char_length, char_used)
+                if nullable == 'N':
+                    add_constraint(add, owner, table_name, "SYS_C_{}_{}".format(i, j), 'C',
+                                   '"{}" IS NOT NULL'.format(column_name), [column_name])
+            for column_name in columns:
+                if rnd.random() < 0.8:
+                    add("all_col_comments", owner, table_name, column_name, "Column {} of {}".format(column_name,
+                                                                                                    table_name))
+            pk_name = "PK_" + table_name
+            add_constraint(add, owner, table_name, pk_name, 'P', None, ["ID"], index_name=pk_name)
+            add_index(add, owner, table_name, pk_name, "NORMAL", ["ID"])
+            if i > 0 and len(columns) > 1:
+                for k in range(min(rnd.choice([0, 1, 1, 1, 2, 2, 3]), len(columns) - 1)):
+                    ref_table = "TABLE_{:06d}".format(rnd.randrange(i))
+                    fk_name = "FK_{}_{}".format(table_name, k)
+                    column_name = columns[k + 1]
+                    add_constraint(add, owner, table_name, fk_name, 'R', None, [column_name],
+                                   ref_owner=owner, ref_constraint="PK_" + ref_table)
+                    if rnd.random() < 0.7:
+                        add_index(add, owner, table_name, "IX_{}_{}".format(table_name, k), "NORMAL", [column_name])
+            if len(columns) > 2 and rnd.random() < 0.1:
+                uk_name = "UK_" + table_name
+                add_constraint(add, owner, table_name, uk_name, 'U', None, columns[-2:], index_name=uk_name)
+                add_index(add, owner, table_name, uk_name, "NORMAL", columns[-2:])
+            if len(columns) > 1 and rnd.random() < 0.1:
+                add_constraint(add, owner, table_name, "CK_" + table_name, 'C',
+                               "{} in ('Y', 'N')".format(columns[-1]), [columns[-1]])
+            if len(columns) > 1 and rnd.random() < 0.05:
+                virtual_column = "SYS_NC{:05d}$".format(i)
+                add("all_tab_cols", owner, table_name, virtual_column, 'UPPER("{}")'.format(columns[1]), "YES")
+                add_index(add, owner, table_name, "FX_" + table_name, "FUNCTION-BASED NORMAL", [virtual_column])
+            if rnd.random() < 0.15:
+                add("all_triggers", owner, "TRG_" + table_name, "BEFORE EACH ROW", "INSERT OR UPDATE", owner,
+                    table_name, "TABLE")
+                add("all_objects", owner, "TRG_" + table_name, "TRIGGER", str(ddl_time))
+            if i % 500 == 0:
+                queue_name = "QUEUE_{:06d}".format(i)
+                add("all_queues", owner, queue_name, table_name, "Queue on {}".format(table_name), "NORMAL_QUEUE")
+                add("all_objects", owner, queue_name, "QUEUE", str(ddl_time))
+            if i % 10 == 0:
+                view_name = "VIEW_{:06d}".format(i)
+                add("all_views", owner, view_name)
+                add("all_objects", owner, view_name, "VIEW", str(ddl_time))
+                add("all_tab_comments", owner, view_name, "View on {}".format(table_name))
+                for j, column_name in enumerate(columns[:5]):
+                    add("all_tab_columns", owner, view_name, column_name, j + 1, "NUMBER", None, 22, None, None, None,
+                        'Y', None, None)
+            if i % 100 == 0:
+                add_types(add, owner, i, ddl_time)
+            if i % 50 == 0:
+                add_package(add, owner, table_name, columns, ddl_time)
+    for view in rows:
+        db.executemany("insert into {} values ({})".format(view, ", ".join("?" * len(rows[view][0]))), rows[view])
+    db.commit()
+    db.close()
+
+
+def add_constraint(add, owner, table_name, constraint_name, constraint_type, search_condition, columns,
+                   ref_owner=None, ref_constraint=None, index_name=None):
+    index_owner = owner if index_name is not None else None
+    add("all_constraints", owner, table_name, constraint_name, constraint_type, search_condition, ref_owner,
+        ref_constraint, index_owner, index_name)
+    for position, column_name in enumerate(columns):
+        add("all_cons_columns", owner, table_name, constraint_name, column_name, position + 1)
+
+
+def add_index(add, owner, table_name, index_name, index_type, columns):
+    add("all_indexes", owner, index_name, owner, table_name, index_type)
+    add("all_objects", owner, index_name, "INDEX", str(datetime.datetime(2021, 1, 1)))
+    for position, column_name in enumerate(columns):
+        add("all_ind_columns", owner, index_name, owner, table_name, column_name, position + 1, "ASC")
+
+
+def add_types(add, owner, i, ddl_time):
+    object_name = "T_OBJECT_{:06d}".format(i)
+    list_name = "T_LIST_{:06d}".format(i)
+    add("all_types", owner, object_name, "OBJECT")
+    add("all_objects", owner, object_name, "TYPE", str(ddl_time))
+    add("all_type_attrs", owner, object_name, "ID", None, None, "NUMBER", 10, 0, 1, 22)
+    add("all_type_attrs", owner, object_name, "NAME", None, None, "VARCHAR2", None, None, 2, 255)
+    add("all_type_methods", owner, object_name, "GET_NAME", 1)
+    add("all_types", owner, list_name, "COLLECTION")
+    add("all_objects", owner, list_name, "TYPE", str(ddl_time))
+    add("all_coll_types", owner, list_name, "TABLE", None, object_name, None, None, None)
+
+
+def add_source(add, owner, name, unit_type, lines):
+    for line, text in enumerate(lines):
+        add("all_source", owner, name, unit_type, line + 1, text + "\n")
+
+
+def add_package(add, owner, table_name, columns, ddl_time):
+    # package with getter of every column and overloaded setter, arguments of subprogram are numbered from 1,
+    # function result is argument at position 0
+    package_name = "PKG_" + table_name
+    add("all_objects", owner, package_name, "PACKAGE", str(ddl_time))
+    add("all_objects", owner, package_name, "PACKAGE BODY", str(ddl_time))
+    spec = ["package {} is".format(package_name)]
+    body = ["package body {} is".format(package_name)]
+    subprogram_id = 0
+    for column_name in columns:
+        subprogram_id += 1
+        function_name = "GET_" + column_name
+        add("all_procedures", owner, package_name, function_name, "PACKAGE", subprogram_id, None)
+        add("all_arguments", owner, package_name, function_name, subprogram_id, None, 0, 1, 0, "VARCHAR2", "OUT")
+        add("all_arguments", owner, package_name, function_name, subprogram_id, "P_ID", 1, 2, 0, "NUMBER", "IN")
+        spec.append("  function {}(p_id number) return varchar2;".format(function_name.lower()))
+        body.append("  function {}(p_id number) return varchar2 is".format(function_name.lower()))
+        body.append("  begin")
+        body.append("    return null;")
+        body.append("  end;")
+    for overload, data_type in enumerate(["NUMBER", "VARCHAR2"]):
+        subprogram_id += 1
+        add("all_procedures", owner, package_name, "SET_VALUE", "PACKAGE", subprogram_id, str(overload + 1))
+        add("all_arguments", owner, package_name, "SET_VALUE", subprogram_id, "P_ID", 1, 1, 0, "NUMBER", "IN")
+        add("all_arguments", owner, package_name, "SET_VALUE", subprogram_id, "P_VALUE", 2, 2, 0, data_type,
+            "IN/OUT")
+        spec.append("  procedure set_value(p_id number, p_value in out {});".format(data_type.lower()))
+        body.append("  procedure set_value(p_id number, p_value in out {}) is".format(data_type.lower()))
+        body.append("  begin")
+        body.append("    null;")
+        body.append("  end;")
+    spec.append("end;")
+    body.append("end;")
+    add_source(add, owner, package_name, "PACKAGE", spec)
+    add_source(add, owner, package_name, "PACKAGE BODY", body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate fake data dictionary with synthetic schemas.')
+    parser.add_argument("file", help="SQLite file, used as TNS with --driver fake")
+    parser.add_argument("--tables", help="Tables in every schema", action="store", type=int, default=1000)
+    parser.add_argument("--owners", help="Schema names, comma separated", action="store", default="APP")
+    parser.add_argument("--seed", help="Random seed", action="store", type=int, default=1)
+    args = parser.parse_args()
+    generate_schema(args.file, args.owners.upper().split(","), args.tables, args.seed)
+
+
+if __name__ == '__main__':
+    main()
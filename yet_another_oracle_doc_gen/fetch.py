@@ -0,0 +1,255 @@
+import datetime
+import threading
+
+# Expected result size of dictionary query, used for automatic fetch sizing
+SIZE_SMALL = "SMALL"
+SIZE_MEDIUM = "MEDIUM"
+SIZE_LARGE = "LARGE"
+
+AUTO_ARRAY_SIZES = {SIZE_SMALL: 100, SIZE_MEDIUM: 1000, SIZE_LARGE: 5000}
+
+# Session statistics, read before and after every query, if user is granted to see them
+STAT_ROUND_TRIPS = "SQL*Net roundtrips to/from client"
+STAT_BYTES = "bytes sent via SQL*Net to client"
+SESSION_STATS_SQL = """select n.name, s.value
+                         from v$mystat s
+                         join v$statname n
+                           on n.statistic# = s.statistic#
+                        where n.name in ('{}', '{}')""".format(STAT_ROUND_TRIPS, STAT_BYTES)
+
+# Names of LONG type in cx_Oracle 8 and python-oracledb, and in cx_Oracle 7
+LONG_TYPE_NAMES = ("DB_TYPE_LONG", "LONG_STRING")
+# Errors of value longer than its define buffer: OCI column level and statement level ones
+LONG_TRUNCATION_ERRORS = ("ORA-01406", "ORA-24345")
+
+_settings = {"arraysize": None, "prefetch": None, "long_size": None, "session_stats": False,
+             "stats_overhead": (0, 0)}
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def configure(arraysize=None, prefetch=None, long_size=None):
+    # None means automatic sizing by expected query result size.
+    # long_size limits LONG values, None means they are fetched whole
+    _settings["arraysize"] = arraysize
+    _settings["prefetch"] = prefetch
+    _settings["long_size"] = long_size
+
+
+def is_long_type(default_type):
+    type_name = getattr(default_type, "name", getattr(default_type, "__name__", None))
+    return type_name in LONG_TYPE_NAMES
+
+
+def is_long_truncation(exc):
+    return any(code in str(exc) for code in LONG_TRUNCATION_ERRORS)
+
+
+def cut_long_value(value):
+    return value[:_settings["long_size"]]
+
+
+def truncate_long_handler(cursor, name, default_type, size, precision, scale):
+    # LONG is fetched piecewise, row by row. Bounded string buffer is fetched by arrays, as other columns. For longer
+    # value driver could cut it, return it whole or fail with truncation error, so value is cut here too, and error
+    # makes query fetched again with whole LONG values
+    if is_long_type(default_type):
+        return cursor.var(str, _settings["long_size"], cursor.arraysize, outconverter=cut_long_value)
+
+
+def whole_long_handler(cursor, name, default_type, size, precision, scale):
+    if is_long_type(default_type):
+        return cursor.var(default_type, arraysize=cursor.arraysize, outconverter=cut_long_value)
+
+
+def read_session_stats(connect):
+    cursor = connect.cursor()
+    cursor.execute(SESSION_STATS_SQL)
+    values = dict(cursor.fetchall())
+    cursor.close()
+    return values.get(STAT_ROUND_TRIPS, 0), values.get(STAT_BYTES, 0)
+
+
+def enable_session_stats(connect, error_class):
+    # without access to v$mystat round trips are estimated and bytes are unknown
+    try:
+        read_session_stats(connect)
+        first = read_session_stats(connect)
+        second = read_session_stats(connect)
+    except error_class:
+        _settings["session_stats"] = False
+        return False
+    # reading statistics costs round trips and bytes too, they are subtracted from every measure
+    _settings["stats_overhead"] = (second[0] - first[0], second[1] - first[1])
+    _settings["session_stats"] = True
+    return True
+
+
+def disable_session_stats():
+    _settings["session_stats"] = False
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def get_stats():
+    with _stats_lock:
+        return {query_name: dict(_stats[query_name]) for query_name in _stats}
+
+
+def get_fetch_sizes(size):
+    arraysize = _settings["arraysize"]
+    if arraysize is None:
+        arraysize = AUTO_ARRAY_SIZES[size]
+    prefetch = _settings["prefetch"]
+    if prefetch is None:
+        # first batch comes with execute round trip
+        prefetch = arraysize
+    return arraysize, prefetch
+
+
+def estimate_round_trips(rows, arraysize, prefetch):
+    # execute brings prefetched rows, every next batch costs one more trip, including one for end of data
+    if rows < prefetch:
+        return 1
+    return 1 + (rows - prefetch) // arraysize + 1
+
+
+def record_query(query_name, rows, round_trips, bytes_received, elapsed, arraysize, prefetch):
+    # bytes_received is None, when round trips are estimated
+    with _stats_lock:
+        if query_name not in _stats:
+            _stats[query_name] = {"executions": 0, "rows": 0, "round_trips": 0, "bytes": None, "measured": True,
+                                  "elapsed": datetime.timedelta(0), "arraysize": arraysize, "prefetch": prefetch}
+        query_stats = _stats[query_name]
+        query_stats["executions"] += 1
+        query_stats["rows"] += rows
+        query_stats["round_trips"] += round_trips
+        if bytes_received is None:
+            query_stats["measured"] = False
+        else:
+            query_stats["bytes"] = (query_stats["bytes"] or 0) + bytes_received
+        query_stats["elapsed"] += elapsed
+
+
+class QueryPlan:
+    # Stands for connection in gather stage. First run of stage only collects its queries, then they are fetched
+    # elsewhere, and second run gets their rows in the same order
+    def __init__(self):
+        self.queries = []
+        self.results = None
+
+    def get_rows(self, query_name, sql, params, size):
+        if self.results is None:
+            self.queries.append((query_name, sql, params, size))
+            return []
+        return self.results.pop(0)
+
+
+def open_cursor(connect, sql, params, arraysize, prefetch, handler=None):
+    cursor = connect.cursor()
+    cursor.arraysize = arraysize
+    # prefetchrows available since cx_Oracle 8
+    if hasattr(cursor, "prefetchrows"):
+        cursor.prefetchrows = prefetch
+    if handler is not None:
+        cursor.outputtypehandler = handler
+    if params is None:
+        cursor.execute(sql)
+    else:
+        cursor.execute(sql, params)
+    return cursor
+
+
+def fetch_rows(connect, query_name, sql, params=None, size=SIZE_MEDIUM):
+    if isinstance(connect, QueryPlan):
+        yield from connect.get_rows(query_name, sql, params, size)
+        return
+    arraysize, prefetch = get_fetch_sizes(size)
+    session_stats = None
+    if _settings["session_stats"]:
+        session_stats = read_session_stats(connect)
+    handler = None
+    if _settings["long_size"] is not None:
+        handler = truncate_long_handler
+    start = datetime.datetime.now()
+    cursor = None
+    rows_count = 0
+    while True:
+        try:
+            if cursor is None:
+                cursor = open_cursor(connect, sql, params, arraysize, prefetch, handler)
+                # queries with LONG columns are ordered, so rows, which were read before truncation error, are skipped
+                skipped = 0
+                while skipped < rows_count:
+                    rows = cursor.fetchmany(min(arraysize, rows_count - skipped))
+                    if not rows:
+                        break
+                    skipped += len(rows)
+            rows = cursor.fetchmany(arraysize)
+        except Exception as exc:
+            if handler is not truncate_long_handler or not is_long_truncation(exc):
+                raise
+            if cursor is not None:
+                cursor.close()
+                cursor = None
+            handler = whole_long_handler
+            continue
+        if not rows:
+            break
+        rows_count += len(rows)
+        for row in rows:
+            yield row
+    cursor.close()
+    elapsed = datetime.datetime.now() - start
+    if session_stats is None:
+        round_trips = estimate_round_trips(rows_count, arraysize, prefetch)
+        bytes_received = None
+    else:
+        round_trips, bytes_received = read_session_stats(connect)
+        overhead_round_trips, overhead_bytes = _settings["stats_overhead"]
+        round_trips -= session_stats[0] + overhead_round_trips
+        bytes_received -= session_stats[1] + overhead_bytes
+    record_query(query_name, rows_count, round_trips, bytes_received, elapsed, arraysize, prefetch)
+
+
+async def fetch_rows_async(connect, query_name, sql, params=None, size=SIZE_MEDIUM):
+    # fetch_rows for asyncio connection, rows are returned at once. Round trips are always estimated, because
+    # statistics reads would wait behind queries of other tasks
+    arraysize, prefetch = get_fetch_sizes(size)
+    handler = None
+    if _settings["long_size"] is not None:
+        handler = truncate_long_handler
+    start = datetime.datetime.now()
+    while True:
+        cursor = connect.cursor()
+        cursor.arraysize = arraysize
+        cursor.prefetchrows = prefetch
+        if handler is not None:
+            cursor.outputtypehandler = handler
+        result = []
+        try:
+            if params is None:
+                await cursor.execute(sql)
+            else:
+                await cursor.execute(sql, params)
+            while True:
+                rows = await cursor.fetchmany(arraysize)
+                if not rows:
+                    break
+                result.extend(rows)
+        except Exception as exc:
+            cursor.close()
+            # rows are returned at once, so query is just fetched again with whole LONG values
+            if handler is not truncate_long_handler or not is_long_truncation(exc):
+                raise
+            handler = whole_long_handler
+            continue
+        break
+    cursor.close()
+    elapsed = datetime.datetime.now() - start
+    record_query(query_name, len(result), estimate_round_trips(len(result), arraysize, prefetch), None, elapsed,
+                 arraysize, prefetch)
+    return result
@@ -0,0 +1,95 @@
+import os
+from yet_another_oracle_doc_gen.messages import M_TABLE_TYPE_T
+from yet_another_oracle_doc_gen.snapshot import load_snapshot, save_snapshot
+
+STATE_VERSION = 2
+
+# Object groups, which could be regathered separately
+OBJECT_TABLE = "TABLE"
+OBJECT_QUEUE = "QUEUE"
+OBJECT_TYPE = "TYPE"
+OBJECT_CODE = "CODE"
+OBJECT_GROUPS = [OBJECT_TABLE, OBJECT_QUEUE, OBJECT_TYPE, OBJECT_CODE]
+
+# Parts of gathered model and object groups they belong to
+MODEL_PARTS = {"tables": OBJECT_TABLE, "constraints": OBJECT_TABLE, "indexes": OBJECT_TABLE,
+               "triggers": OBJECT_TABLE, "queues": OBJECT_QUEUE, "types": OBJECT_TYPE, "code": OBJECT_CODE}
+# parts, which are regathered together with their tables
+TABLE_DEPENDENT_PARTS = ["constraints", "indexes", "triggers"]
+# parts, which are in gather order by their own owner, table name and name, others are by table owner and name
+OWNED_PARTS = ["constraints", "triggers"]
+
+
+def load_state(filename):
+    if not os.path.exists(filename):
+        return None
+    try:
+        state = load_snapshot(filename)
+    except ValueError:
+        # state of other format is just ignored, full gather would rewrite it
+        return None
+    if state.get("state_version") != STATE_VERSION:
+        return None
+    return state
+
+
+def save_state(filename, owners, versions, model):
+    save_snapshot(filename, {"state_version": STATE_VERSION, "owners": owners, "versions": versions, "model": model})
+
+
+def get_changed_names(state, versions):
+    # owners and names of new, changed and dropped objects by object group
+    changed = {group: set() for group in OBJECT_GROUPS}
+    old_versions = state["versions"]
+    for key in versions:
+        if old_versions.get(key) != versions[key]:
+            group, owner, name = key
+            changed[group].add((owner, name))
+    for key in old_versions:
+        if key not in versions:
+            group, owner, name = key
+            changed[group].add((owner, name))
+    return changed
+
+
+def merge_model(model, changed_model, changed):
+    # changed objects are dropped from model and replaced by regathered ones, if they still exist
+    table_ids = set(table_id for table_id in model["tables"]
+                    if (model["tables"][table_id]["owner"], model["tables"][table_id]["name"]) in changed[OBJECT_TABLE])
+    table_ids.update(changed_model["tables"].keys())
+    for part in MODEL_PARTS:
+        group = MODEL_PARTS[part]
+        if len(changed[group]) == 0:
+            continue
+        items = model[part]
+        for key in list(items.keys()):
+            if part in TABLE_DEPENDENT_PARTS:
+                is_changed = items[key]["table"] in table_ids
+            else:
+                is_changed = (items[key]["owner"], items[key]["name"]) in changed[group]
+            if is_changed:
+                del items[key]
+        items.update(changed_model[part])
+    # restore gather order: tables before views, ordered by owner and name
+    model["tables"] = dict(sorted(model["tables"].items(),
+                                  key=lambda item: (item[1]["type"] != M_TABLE_TYPE_T, item[1]["owner"],
+                                                    item[1]["name"])))
+    for part in ("queues", "types", "code"):
+        model[part] = dict(sorted(model[part].items(), key=lambda item: (item[1]["owner"], item[1]["name"])))
+    # order of constraints, indexes and triggers makes order of referenced by lists, indexes and triggers of tables
+    for part in TABLE_DEPENDENT_PARTS:
+        model[part] = dict(sorted(model[part].items(), key=lambda item: get_dependent_key(model["tables"], part,
+                                                                                          item[1])))
+    return model
+
+
+def get_dependent_key(tables, part, item):
+    # dependent parts have only id of their table, tables of other schemas aren't in model
+    table = tables.get(item["table"])
+    if table is not None:
+        table_owner, table_name = table["owner"], table["name"]
+    else:
+        table_owner, dot, table_name = item["table"].partition(".")
+    if part in OWNED_PARTS:
+        return item["owner"], table_name, item["name"]
+    return table_owner, table_name, item["name"]
@@ -1,8 +1,16 @@
 import json
 import codecs
+import os
 from yet_another_oracle_doc_gen.messages import M_TRUE, M_FALSE
 
 DEFAULT_LOCALE = 'english'
+# Localization files are looked for near module, so program could be started from any directory
+LOCALE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "l18n")
+
+
+def load_locale(name):
+    with codecs.open(os.path.join(LOCALE_DIR, name + ".lng"), 'r', "utf-8") as fp:
+        return json.load(fp)
 
 
 class L18n:
@@ -10,32 +18,38 @@ class L18n:
     def __init__(self):
         self.locale = ''
         self.encoding = None
-        self.msg_map = []
-        self.alternative = None
+        self.locale_map = {}
+        self.default_map = {}
+        # messages of locale with missing ones taken from default locale, encoded if needed
+        self.msg_map = {}
 
     def set_encoding(self, encoding):
         self.encoding = encoding
+        self.resolve()
 
     def set_locale(self, name):
         self.locale = name
-        f = "l18n//" + name + ".lng"
-        fp = codecs.open(f, 'r', "utf-8")
-        self.msg_map = json.load(fp)
+        self.locale_map = load_locale(name)
         if self.locale != DEFAULT_LOCALE:
-            self.alternative = L18n()
-            self.alternative.set_locale(DEFAULT_LOCALE)
+            self.default_map = load_locale(DEFAULT_LOCALE)
+        else:
+            self.default_map = {}
+        self.resolve()
+
+    def resolve(self):
+        # every message is looked up and encoded once, report only takes ready ones
+        msg_map = dict(self.default_map)
+        msg_map.update(self.locale_map)
+        if self.encoding is not None:
+            msg_map = {msg_type: str(msg_map[msg_type].encode(self.encoding)) for msg_type in msg_map}
+        self.msg_map = msg_map
 
     def get_message(self, msg_type):
-        if msg_type in self.msg_map.keys():
-            msg = self.msg_map[msg_type]
-        elif self.locale != DEFAULT_LOCALE:
-            msg = self.alternative.get_message(msg_type)
-        else:
+        try:
+            return self.msg_map[msg_type]
+        except KeyError:
             raise KeyError("Can't find message {} in locale {} (default locale {})".format(msg_type, self.locale,
                                                                                            DEFAULT_LOCALE))
-        if self.encoding is not None:
-            msg = str(msg.encode(self.encoding))
-        return msg
 
     def translate_bool(self, value):
         if value:
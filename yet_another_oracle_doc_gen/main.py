@@ -1,27 +1,149 @@
-import cx_Oracle
 import datetime
 import argparse
+import gc
 import getpass
+import importlib
+import itertools
+import json
 import os
+import re
+from yet_another_oracle_doc_gen.fetch import configure, disable_session_stats, enable_session_stats, fetch_rows, \
+    fetch_rows_async, get_stats, QueryPlan, reset_stats, SIZE_SMALL, SIZE_MEDIUM, SIZE_LARGE
+from yet_another_oracle_doc_gen.incremental import get_changed_names, load_state, merge_model, save_state, \
+    OBJECT_CODE, OBJECT_QUEUE, OBJECT_TABLE, OBJECT_TYPE
 from yet_another_oracle_doc_gen.l18n import L18n
 from yet_another_oracle_doc_gen.messages import *
-from yet_another_oracle_doc_gen.reports import Report
+from yet_another_oracle_doc_gen.model import make_column_values, pack_tables, unpack_tables, Table
+from yet_another_oracle_doc_gen.queries import get_in_list_size, get_statement, make_catalog, STATEMENT_CACHE_SIZE, \
+    STREAM_KIND_TABLE
+from yet_another_oracle_doc_gen.report_functions import jsonl
+from yet_another_oracle_doc_gen.reports import get_file_extension, FILE_EXTENSIONS, MODE_HTML, MODE_JSONL, Report
+from yet_another_oracle_doc_gen.search import add_search_table, add_search_type, get_search_dir, new_search_index, \
+    save_search_index
+from yet_another_oracle_doc_gen.snapshot import load_snapshot, save_snapshot
+# asyncio, executors, schema diff and render cache are imported by functions, which use them, so help and
+# reports, which don't need them, start without loading them
 
 TYPE_TABLE = M_TABLE_TYPE_T
 TYPE_VIEW = M_TABLE_TYPE_W
+# Oracle limit for expressions in IN list
+MAX_IN_LIST = 1000
+# Database driver modules, fake one reads data dictionary from SQLite file.
+# python-oracledb works in thin mode by default, without Oracle Client libraries
+DRIVER_CX_ORACLE = "cx_oracle"
+DRIVER_ORACLEDB = "oracledb"
+DRIVER_FAKE = "fake"
+DRIVERS = {DRIVER_CX_ORACLE: "cx_Oracle", DRIVER_ORACLEDB: "oracledb",
+           DRIVER_FAKE: "yet_another_oracle_doc_gen.fake_db"}
+# drivers with asyncio connections
+ASYNC_DRIVERS = [DRIVER_ORACLEDB, DRIVER_FAKE]
+# Handling of LONG dictionary columns: column defaults, virtual column formulas and check conditions
+LONG_FULL = "full"
+LONG_TRUNCATE = "truncate"
+LONG_SKIP = "skip"
+DEFAULT_LONG_SIZE = 4000
+# Multi-file report: object pages are written into directory named after index file, by chunks of tables
+PAGES_DIR_SUFFIX = "_files"
+PAGE_CHUNKS_PER_WORKER = 4
+PAGE_NAME_CHARS = re.compile(r"[^\w.$-]")
+# Kinds of JSON lines records
+RECORD_TABLE = "table"
+RECORD_VIEW = "view"
+RECORD_QUEUE = "queue"
+RECORD_TYPE = "type"
+RECORD_CODE = "code"
+# stable values of records instead of message keys, which are used by report
+RECORD_TABLE_TYPES = {M_TABLE_TYPE_T: "table", M_TABLE_TYPE_W: "view"}
+RECORD_TABLE_KINDS = {M_TABLE_TYPE_HEAP: "heap", M_TABLE_TYPE_IOT: "iot", M_TABLE_TYPE_TEMP: "temporary"}
+# Messages of schema diff report
+DIFF_PARTS = {"columns": M_COLUMNS, "unique_indexes": M_UNIQUE_CONSTRAINTS, "indexes": M_INDEXES,
+              "triggers": M_TRIGGERS, "attrs": M_ATTRS, "methods": M_METHODS, "subprograms": M_SUBPROGRAMS}
+DIFF_OBJECTS = [("tables", M_TABLES, RECORD_TABLE), ("queues", M_QUEUES, RECORD_QUEUE), ("types", M_TYPES, RECORD_TYPE),
+                ("code", M_CODE_UNITS, RECORD_CODE)]
+DEFAULT_RENDER_CACHE_SIZE = 256
+# Daemon mode: settings, which databases of config could have, others are taken from command line
+DATABASE_SETTINGS = ["driver", "tns", "user", "password", "target_user", "dba", "sysdba"]
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_MODEL_TTL = 300
+
+
+def get_driver(name=DRIVER_CX_ORACLE):
+    # driver is imported only when database is really used, rendering from snapshot doesn't need it
+    return importlib.import_module(DRIVERS[name])
 
 
 def get_connect(args):
+    cx_Oracle = get_driver(args.driver)
     credentials = {"user": args.user, "password": args.password, "tns": args.tns}
     if args.sysdba:
         mode = cx_Oracle.SYSDBA
     else:
         mode = cx_Oracle.DEFAULT_AUTH
 
-    connect = cx_Oracle.connect(credentials["user"], credentials["password"], credentials["tns"], mode=mode)
+    # python-oracledb takes only dsn as positional argument
+    connect = cx_Oracle.connect(user=credentials["user"], password=credentials["password"], dsn=credentials["tns"],
+                                mode=mode)
+    connect.stmtcachesize = STATEMENT_CACHE_SIZE
     return connect
 
 
+def get_pool(args, size, session_callback=None):
+    # SYSDBA sessions can't be pooled, standalone connections are used for them instead. Session callback is called
+    # once for every new session of pool
+    if args.sysdba:
+        return None
+    cx_Oracle = get_driver(args.driver)
+    if hasattr(cx_Oracle, "create_pool"):
+        # python-oracledb pools are always threaded
+        pool = cx_Oracle.create_pool(user=args.user, password=args.password, dsn=args.tns, min=1, max=size,
+                                     increment=1, getmode=cx_Oracle.POOL_GETMODE_WAIT,
+                                     session_callback=session_callback)
+    else:
+        pool = cx_Oracle.SessionPool(args.user, args.password, args.tns, min=1, max=size, increment=1, threaded=True,
+                                     getmode=cx_Oracle.SPOOL_ATTRVAL_WAIT, sessionCallback=session_callback)
+    pool.stmtcachesize = STATEMENT_CACHE_SIZE
+    return pool
+
+
+def get_async_pool(args, size):
+    if args.sysdba:
+        return None
+    driver = get_driver(args.driver)
+    pool = driver.create_pool_async(user=args.user, password=args.password, dsn=args.tns, min=1, max=size,
+                                    increment=1, stmtcachesize=STATEMENT_CACHE_SIZE)
+    return pool
+
+
+async def acquire_async_connect(pool, args):
+    if pool is None:
+        driver = get_driver(args.driver)
+        mode = driver.SYSDBA if args.sysdba else driver.DEFAULT_AUTH
+        return await driver.connect_async(user=args.user, password=args.password, dsn=args.tns, mode=mode,
+                                          stmtcachesize=STATEMENT_CACHE_SIZE)
+    return await pool.acquire()
+
+
+async def release_async_connect(pool, connect):
+    if pool is None:
+        await connect.close()
+    else:
+        await pool.release(connect)
+
+
+def acquire_connect(pool, args):
+    if pool is None:
+        return get_connect(args)
+    return pool.acquire()
+
+
+def release_connect(pool, connect):
+    if pool is None:
+        connect.close()
+    else:
+        pool.release(connect)
+
+
 def get_version(connect):
     cursor = connect.cursor()
     cursor.execute("""select version from product_component_version""")
@@ -37,259 +159,295 @@ def get_table_id(table_owner, table_name):
         return ""
 
 
-def replace_views(sql, available_views):
-    for i in available_views.keys():
-        sql = sql.replace(i, available_views[i])
-    return sql
-
-
-def gather_tables(connect, user, available_views):
-    cursor = connect.cursor()
-    sql_tables = """select t.table_name, c.comments, t.owner, t.temporary, t.iot_type, t.partitioned, t.nested
-                      from all_tables t
-                      left join all_tab_comments c
-                        on t.owner = c.owner
-                       and t.table_name = c.table_name
-                    where t.owner = upper(:a)
-                    and t.table_name not like 'BIN$%'
-                    order by t.table_name"""
-    sql_tables = replace_views(sql_tables, available_views)
-    cursor.execute(sql_tables, {'a': user})
+def get_owners(connect, target_schemas, catalog):
+    # target schemas are comma separated names or LIKE patterns
+    owners = []
+    patterns = []
+    for schema in target_schemas.split(","):
+        schema = schema.strip().upper()
+        if len(schema) == 0:
+            continue
+        if "%" in schema:
+            patterns.append(schema)
+        elif schema not in owners:
+            owners.append(schema)
+    sql_users = get_statement(catalog, "owners")
+    for pattern in patterns:
+        for owner, in fetch_rows(connect, "owners", sql_users, {'pattern': pattern}, SIZE_SMALL):
+            if owner not in owners:
+                owners.append(owner)
+    return owners
+
+
+def get_in_list_filter(column, values, bind_prefix):
+    params = {}
+    in_lists = []
+    for start in range(0, len(values), MAX_IN_LIST):
+        binds = []
+        count = min(MAX_IN_LIST, len(values) - start)
+        # list is padded with its last value, so statement text depends on size bucket only
+        for i in range(start, start + get_in_list_size(count)):
+            params["{}_{}".format(bind_prefix, i)] = values[min(i, start + count - 1)]
+            binds.append(":{}_{}".format(bind_prefix, i))
+        in_lists.append("{} in ({})".format(column, ", ".join(binds)))
+    return "(" + " or ".join(in_lists) + ")", params
+
+
+def get_object_filter(owner_column, owners, name_column=None, names=None):
+    # names restrict query to some objects of schemas, used for incremental gathering. They are pairs of owner and
+    # name, so changed object of one schema doesn't regather objects with the same name in others
+    sql, params = get_in_list_filter(owner_column, owners, "owner")
+    if names is not None:
+        name_filters = []
+        for n, owner in enumerate(sorted(set(owner for owner, name in names))):
+            names_sql, names_params = get_in_list_filter(name_column, sorted(name for name_owner, name in names
+                                                                             if name_owner == owner),
+                                                         "name_{}".format(n))
+            name_filters.append("({} = :name_owner_{} and {})".format(owner_column, n, names_sql))
+            params["name_owner_{}".format(n)] = owner
+            params.update(names_params)
+        sql += " and (" + " or ".join(name_filters) + ")"
+    return sql, params
+
+
+def get_key_ranges(connect, owners, catalog, shards):
+    # split schema tables into ranges of roughly the same size by table name
+    owner_filter, owner_params = get_object_filter("t.owner", owners)
+    sql_bounds = get_statement(catalog, "key_ranges", owner_filter=owner_filter)
+    rows = fetch_rows(connect, "key_ranges", sql_bounds, dict(owner_params, n=shards), SIZE_SMALL)
+    # range predicates compare names binary, so bounds are ordered the same way, whatever NLS_SORT is
+    bounds = sorted(set(bound for bound, in rows))[1:]
+    ranges = []
+    low = None
+    for high in bounds:
+        ranges.append((low, high))
+        low = high
+    ranges.append((low, None))
+    return ranges
+
+
+def get_key_range_filter(column, key_range):
+    sql = ""
+    params = {}
+    if key_range is not None:
+        low, high = key_range
+        if low is not None:
+            sql += " and {} >= :range_low".format(column)
+            params["range_low"] = low
+        if high is not None:
+            sql += " and {} < :range_high".format(column)
+            params["range_high"] = high
+    return sql, params
+
+
+def make_table(table_name, table_comment, table_owner, temporary, iot_type, partitioned, nested):
+    table_type = M_TABLE_TYPE_HEAP
+    if iot_type is not None:
+        table_type = M_TABLE_TYPE_IOT
+    elif temporary == 'Y':
+        table_type = M_TABLE_TYPE_TEMP
+    return Table(table_name, table_owner, table_comment, TYPE_TABLE, nested == 'YES', table_type, partitioned == 'Y')
+
+
+def make_view(table_name, table_comment, table_owner):
+    return Table(table_name, table_owner, table_comment, TYPE_VIEW, False)
+
+
+def gather_tables(connect, owners, catalog, names=None):
+    owner_filter, owner_params = get_object_filter("t.owner", owners, "t.table_name", names)
+    sql_tables = get_statement(catalog, "tables", owner_filter=owner_filter)
+    rows = fetch_rows(connect, "tables", sql_tables, owner_params, SIZE_MEDIUM)
 
     tables = {}
 
-    for table_name, table_comment, table_owner, temporary, iot_type, partitioned, nested in cursor:
+    for table_name, table_comment, table_owner, temporary, iot_type, partitioned, nested in rows:
         table_id = get_table_id(table_owner, table_name)
-        table_type = M_TABLE_TYPE_HEAP
-        if iot_type is not None:
-            table_type = M_TABLE_TYPE_IOT
-        elif temporary == 'Y':
-            table_type = M_TABLE_TYPE_TEMP
-        tables[table_id] = {"name": table_name, "comment": table_comment, "columns": {}, "type": TYPE_TABLE,
-                            "unique_indexes": [], "table_type": table_type, "partitioned": partitioned == 'Y',
-                            "triggers": [], "indexes": [], "nested": nested == 'YES'}
-
-    sql_views = """select t.view_name, c.comments, t.owner
-                      from all_views t
-                      left join all_tab_comments c
-                        on t.owner = c.owner
-                       and t.view_name = c.table_name
-                     where t.owner = upper(:a)
-                     order by t.view_name
-                    """
-    sql_views = replace_views(sql_views, available_views)
-    cursor.execute(sql_views, {'a': user})
-
-    for table_name, table_comment, table_owner in cursor:
+        tables[table_id] = make_table(table_name, table_comment, table_owner, temporary, iot_type, partitioned,
+                                      nested)
+
+    owner_filter, owner_params = get_object_filter("t.owner", owners, "t.view_name", names)
+    sql_views = get_statement(catalog, "views", owner_filter=owner_filter)
+    rows = fetch_rows(connect, "views", sql_views, owner_params, SIZE_MEDIUM)
+
+    for table_name, table_comment, table_owner in rows:
         table_id = get_table_id(table_owner, table_name)
-        tables[table_id] = {"name": table_name, "comment": table_comment, "columns": {}, "type": TYPE_VIEW,
-                            "unique_indexes": [], "triggers": [], "indexes": [], "nested": False}
+        tables[table_id] = make_view(table_name, table_comment, table_owner)
 
     return tables
 
 
-def gather_attrs(connect, user, tables, available_views):
-    cursor = connect.cursor()
-    sql_attrs = """
-                    select t.owner, t.table_name, t.column_name, c.comments, t.owner, t.data_type, 
-                        t.data_length, t.data_precision, t.data_scale, t.data_default, t.nullable, 
-                        t.char_length, t.char_used, dt.owner as dt_owner, dt.type_name
-                      from all_tab_columns t
-                      left join all_col_comments c
-                        on t.owner = c.owner
-                       and t.table_name = c.table_name
-                       and t.column_name = c.column_name
-                      left join all_types dt
-                        on dt.owner = t.data_type_owner
-                       and t.data_type = dt.type_name
-                     where t.owner = upper(:a)
-                     order by t.table_name, t.column_name
-                    """
-    sql_attrs = replace_views(sql_attrs, available_views)
-    cursor.execute(sql_attrs, {'a': user})
+def make_column(column_name, comments, data_type, data_length, data_precision, data_scale, data_default, nullable,
+                char_length, char_used, dt_owner, type_name):
+    length_semantics = ''
+    if char_used is not None:
+        data_length = char_length
+        if char_used == 'C':
+            length_semantics = 'CHAR'
+        else:
+            length_semantics = 'BYTE'
+    # remove quotas in defaults for string fields
+    if data_default is not None:
+        if data_default[0] == "'":
+            data_default = data_default[1:-1]
+    return make_column_values(column_name, data_type, data_length, data_precision, data_scale, data_default, comments,
+                              False, nullable == 'Y', length_semantics, get_table_id(dt_owner, type_name))
+
+
+def gather_columns(connect, owners, catalog, key_range=None, names=None):
+    owner_filter, owner_params = get_object_filter("t.owner", owners, "t.table_name", names)
+    range_filter, range_params = get_key_range_filter("t.table_name", key_range)
+    sql_attrs = get_statement(catalog, "columns", owner_filter=owner_filter, range_filter=range_filter)
+    rows = fetch_rows(connect, "columns", sql_attrs, dict(owner_params, **range_params), SIZE_LARGE)
 
     prev_table_id = None
+    prev_owner = None
+    prev_table_name = None
     attrs = {}
+    columns = {}
     for owner, table_name, column_name, comments, owner, data_type, data_length, data_precision, data_scale, \
-            data_default, nullable, char_length, char_used, dt_owner, type_name in cursor:
-        table_id = get_table_id(owner, table_name)
-        if prev_table_id is None:
-            prev_table_id = table_id
-        if prev_table_id != table_id:
-            tables[prev_table_id]["columns"].update(attrs)
-            prev_table_id = table_id
+            data_default, nullable, char_length, char_used, dt_owner, type_name in rows:
+        # table id is built once per table, not for every column
+        if table_name != prev_table_name or owner != prev_owner:
+            if prev_table_id is not None:
+                columns[prev_table_id] = attrs
+            prev_table_id = get_table_id(owner, table_name)
+            prev_owner = owner
+            prev_table_name = table_name
             attrs = {}
-        length_semantics = ''
-        if char_used is not None:
-            data_length = char_length
-            if char_used == 'C':
-                length_semantics = 'CHAR'
-            else:
-                length_semantics = 'BYTE'
-        # remove quotas in defaults for string fields
-        if data_default is not None:
-            if data_default[0] == "'":
-                data_default = data_default[1:-1]
-        attrs[column_name] = {"name": column_name, "type": data_type, "length": data_length,
-                              "precision": data_precision, "scale": data_scale, "default": data_default,
-                              "comment": comments, "primary_key": False, "nullable": nullable == 'Y',
-                              "length_semantics": length_semantics, "type_id": get_table_id(dt_owner, type_name)}
+        attrs[column_name] = make_column(column_name, comments, data_type, data_length, data_precision, data_scale,
+                                         data_default, nullable, char_length, char_used, dt_owner, type_name)
     if prev_table_id is not None:
-        tables[prev_table_id]["columns"].update(attrs)
+        columns[prev_table_id] = attrs
+    return columns
+
+
+def merge_columns(tables, columns):
+    for table_id in columns:
+        tables[table_id]["columns"].update(columns[table_id])
     return tables
 
 
-def gather_constraints(connect, user, available_views):
+def gather_attrs(connect, owners, tables, catalog):
+    return merge_columns(tables, gather_columns(connect, owners, catalog))
 
-    cursor = connect.cursor()
-    sql_constraints = """
-                select c.table_name, c.constraint_type, c.constraint_name, c.owner, search_condition, 
-                    r_constraint_name, index_owner, index_name
-                  from all_constraints c
-                  where c.owner = upper(:a)
-                    and c.constraint_name not like 'BIN$%'
-                 order by c.owner, c.table_name, c.constraint_name
-                """
-    sql_constraints = replace_views(sql_constraints, available_views)
-
-    cursor.execute(sql_constraints, {'a': user})
+
+def make_constraint(table_name, constraint_type, constraint_name, owner, search_condition, ref_owner, ref_constr,
+                    index_owner, index_name, ref_table_name):
+    return {"table": get_table_id(owner, table_name),
+            "type": constraint_type, "name": constraint_name,
+            "owner": owner, "columns": [], 'check': search_condition,
+            'index_owner': index_owner, 'index_name': index_name,
+            "ref_owner": ref_owner, "ref_constr": ref_constr,
+            "ref_table": get_table_id(ref_owner, ref_table_name)}
+
+
+def gather_constraints(connect, owners, catalog, names=None):
+    owner_filter, owner_params = get_object_filter("c.owner", owners, "c.table_name", names)
+
+    # referenced table is joined, because it could be in schema, which isn't documented
+    sql_constraints = get_statement(catalog, "constraints", owner_filter=owner_filter)
+
+    rows = fetch_rows(connect, "constraints", sql_constraints, owner_params, SIZE_MEDIUM)
+    # constraints are keyed by owner and name, dotted ids of quoted names could be the same
     constraints = {}
-    for table_name, constraint_type, constraint_name, owner, search_condition, ref_constr, index_owner, index_name \
-            in cursor:
-        constraints[constraint_name] = {"table": get_table_id(owner, table_name), "type": constraint_type,
-                                        "columns": [], 'check': search_condition, 'index_owner': index_owner,
-                                        'index_name': index_name, "ref_constr": ref_constr}
-    sql_constraint_columns = """
-                   select 
-                     cc.constraint_name,
-                     cc.column_name 
-                   from all_cons_columns cc where cc.owner = upper(:a) and cc.constraint_name not like 'BIN$%'
-                   order by owner, table_name, constraint_name, position
-                   """
-    sql_constraint_columns = replace_views(sql_constraint_columns, available_views)
-
-    cursor.execute(sql_constraint_columns, {'a': user})
-    for constraint_name, column_name in cursor:
-        constraints[constraint_name]["columns"].append(column_name)
+    for table_name, constraint_type, constraint_name, owner, search_condition, ref_owner, ref_constr, index_owner, \
+            index_name, ref_table_name in rows:
+        constraints[(owner, constraint_name)] = make_constraint(table_name, constraint_type, constraint_name, owner,
+                                                                search_condition, ref_owner, ref_constr, index_owner,
+                                                                index_name, ref_table_name)
+    owner_filter, owner_params = get_object_filter("cc.owner", owners, "cc.table_name", names)
+    sql_constraint_columns = get_statement(catalog, "constraint_columns", owner_filter=owner_filter)
+
+    rows = fetch_rows(connect, "constraint_columns", sql_constraint_columns, owner_params, SIZE_LARGE)
+    for owner, constraint_name, column_name in rows:
+        constraints[(owner, constraint_name)]["columns"].append(column_name)
 
     return constraints
 
 
-def gather_indexes(connect, user, available_views):
+def make_index(table_owner, table_name, index_type, index_name, index_owner):
+    return {"table": get_table_id(table_owner, table_name),
+            "type": index_type, "columns": [], "columns_order": [],
+            "owner": index_owner, "name": index_name}
+
+
+def add_index_column(index, column_name, descend, data_default):
+    # get formula for functional indexes
+    if data_default is not None:
+        column_name = data_default
+    index["columns"].append(column_name)
+    index["columns_order"].append(descend)
+
+
+def gather_indexes(connect, owners, catalog, key_range=None, names=None):
     indexes = {}
-    cursor = connect.cursor()
-    sql_indexes = """
-                    select i.table_owner, i.table_name, i.index_type, i.index_name, i.owner as index_owner
-                      from all_indexes i
-                     where i.table_owner = upper(:a)
-                       and i.table_name not like 'BIN$%'
-                     order by i.table_owner, i.table_name, i.index_name
-                    """
-    sql_indexes = replace_views(sql_indexes, available_views)
-    cursor.execute(sql_indexes, {'a': user})
-    for table_owner, table_name, index_type, index_name, index_owner in cursor:
-        indexes[index_name] = {"table": get_table_id(table_owner, table_name), "type": index_type,
-                               "columns": [], "columns_order": [], " owner": index_owner, "name": index_name}
-
-    sql_index_columns = """
-                        select i.table_owner, i.table_name, i.index_name, i.owner as index_owner, 
-                               c.column_name, c.descend, t.data_default
-                          from all_indexes i
-                          join all_ind_columns c
-                            on i.owner = c.index_owner
-                           and i.index_name = c.index_name
-                          left join all_tab_cols t
-                            on t.owner = i.table_owner
-                           and t.table_name = i.table_name
-                           and t.column_name = c.column_name
-                           and t.virtual_column = 'YES'
-                         where i.table_owner = upper(:a)
-                           and i.table_name not like 'BIN$%'
-                         order by i.table_owner, i.table_name, i.index_name, c.column_position
-                        """
-    sql_index_columns = replace_views(sql_index_columns, available_views)
-    cursor.execute(sql_index_columns, {'a': user})
-    for table_owner, table_name, index_name, index_owner, column_name, descend, data_default in cursor:
-        # get formula for functional indexes
-        if data_default is not None:
-            column_name = data_default
-        indexes[index_name]["columns"].append(column_name)
-        indexes[index_name]["columns_order"].append(descend)
+    owner_filter, owner_params = get_object_filter("i.table_owner", owners, "i.table_name", names)
+    range_filter, range_params = get_key_range_filter("i.table_name", key_range)
+    sql_indexes = get_statement(catalog, "indexes", owner_filter=owner_filter, range_filter=range_filter)
+    rows = fetch_rows(connect, "indexes", sql_indexes, dict(owner_params, **range_params), SIZE_MEDIUM)
+    for table_owner, table_name, index_type, index_name, index_owner in rows:
+        indexes[get_table_id(index_owner, index_name)] = make_index(table_owner, table_name, index_type, index_name,
+                                                                    index_owner)
+
+    sql_index_columns = get_statement(catalog, "index_columns", owner_filter=owner_filter, range_filter=range_filter)
+    rows = fetch_rows(connect, "index_columns", sql_index_columns, dict(owner_params, **range_params), SIZE_LARGE)
+    for table_owner, table_name, index_name, index_owner, column_name, descend, data_default in rows:
+        add_index_column(indexes[get_table_id(index_owner, index_name)], column_name, descend, data_default)
     return indexes
 
 
-def gather_triggers(connect, user, available_views):
+def make_trigger(owner, trigger_name, trigger_type, triggering_event, table_name, trigger_owner):
+    return {"table": get_table_id(owner, table_name),
+            "type": trigger_type, "event": triggering_event,
+            "name": trigger_name, "owner": trigger_owner}
 
-    cursor = connect.cursor()
-    sql_triggers = """
-                select t.table_owner, t.trigger_name, t.trigger_type, t.triggering_event, t.table_name, t.owner
-                  from all_triggers t
-                  where t.table_owner = upper(:a)
-                 order by t.owner, t.table_name, t.trigger_name
-                """
-    sql_triggers = replace_views(sql_triggers, available_views)
-
-    cursor.execute(sql_triggers, {'a': user})
+
+def gather_triggers(connect, owners, catalog, names=None):
+    owner_filter, owner_params = get_object_filter("t.table_owner", owners, "t.table_name", names)
+
+    sql_triggers = get_statement(catalog, "triggers", owner_filter=owner_filter)
+
+    rows = fetch_rows(connect, "triggers", sql_triggers, owner_params, SIZE_MEDIUM)
     triggers = {}
-    for owner, trigger_name, trigger_type, triggering_event, table_name, trigger_owner in cursor:
+    for owner, trigger_name, trigger_type, triggering_event, table_name, trigger_owner in rows:
         if table_name is None:
             continue
-        triggers[get_table_id(trigger_owner, trigger_name)] = {"table": get_table_id(owner, table_name),
-                                                               "type": trigger_type, "event": triggering_event,
-                                                               "name": trigger_name, "owner": trigger_owner}
+        triggers[get_table_id(trigger_owner, trigger_name)] = make_trigger(owner, trigger_name, trigger_type,
+                                                                           triggering_event, table_name, trigger_owner)
 
     return triggers
 
 
-def gather_queues(connect, user, available_views):
+def gather_queues(connect, owners, catalog, names=None):
+    owner_filter, owner_params = get_object_filter("t.owner", owners, "t.name", names)
 
-    cursor = connect.cursor()
-    sql_triggers = """
-                select t.owner, t.name, t.queue_table, t.user_comment, t.queue_type
-                  from all_queues t
-                  where t.owner = upper(:a)
-                 order by t.owner, t.name, t.queue_table
-                """
-    sql_triggers = replace_views(sql_triggers, available_views)
-
-    cursor.execute(sql_triggers, {'a': user})
+    sql_triggers = get_statement(catalog, "queues", owner_filter=owner_filter)
+
+    rows = fetch_rows(connect, "queues", sql_triggers, owner_params, SIZE_SMALL)
     queues = {}
-    for owner, q_name, q_table, q_comment, q_type in cursor:
-        queues[get_table_id(owner, q_name)] = {"name": q_name, "table": get_table_id(owner, q_table), "comment": q_comment,
-                                               "type": q_type}
+    for owner, q_name, q_table, q_comment, q_type in rows:
+        queues[get_table_id(owner, q_name)] = {"name": q_name, "owner": owner, "table": get_table_id(owner, q_table),
+                                               "comment": q_comment, "type": q_type}
 
     return queues
 
 
-def gather_types(connect, user, available_views):
+def gather_types(connect, owners, catalog, names=None):
+    owner_filter, owner_params = get_object_filter("t.owner", owners, "t.type_name", names)
 
-    cursor = connect.cursor()
-    sql_types = """
-                select t.owner, t.type_name, t.typecode
-                  from all_types t
-                  where t.owner = upper(:a)
-                 order by t.owner, t.type_name
-                """
-    sql_types = replace_views(sql_types, available_views)
-
-    cursor.execute(sql_types, {'a': user})
+    sql_types = get_statement(catalog, "types", owner_filter=owner_filter)
+
+    rows = fetch_rows(connect, "types", sql_types, owner_params, SIZE_SMALL)
     types = {}
-    for owner, type_name, type_code in cursor:
-        types[get_table_id(owner, type_name)] = {"name": type_name, "code": type_code,
+    for owner, type_name, type_code in rows:
+        types[get_table_id(owner, type_name)] = {"name": type_name, "owner": owner, "code": type_code,
                                                  "type_id": get_table_id(owner, type_name),
                                                  "is_array": False, "is_object": False, "attrs": [], "methods": []}
 
-    sql_types = """
-                    select t.owner, t.type_name, t.coll_type, t.upper_bound, t.elem_type_name, t.length, t.precision,
-                        t.scale
-                      from all_coll_types t
-                      where t.owner = upper(:a)
-                     order by t.owner, t.type_name
-                    """
-    sql_types = replace_views(sql_types, available_views)
-
-    cursor.execute(sql_types, {'a': user})
-    for owner, type_name, coll_type, upper_bound, elem_type_name, length, precision, scale in cursor:
+    sql_types = get_statement(catalog, "coll_types", owner_filter=owner_filter)
+
+    rows = fetch_rows(connect, "coll_types", sql_types, owner_params, SIZE_SMALL)
+    for owner, type_name, coll_type, upper_bound, elem_type_name, length, precision, scale in rows:
         types[get_table_id(owner, type_name)]["is_array"] = True
         types[get_table_id(owner, type_name)]["array_type"] = coll_type
         types[get_table_id(owner, type_name)]["array_size"] = upper_bound
@@ -298,34 +456,21 @@ def gather_types(connect, user, available_views):
         types[get_table_id(owner, type_name)]["array_elem_precision"] = precision
         types[get_table_id(owner, type_name)]["array_elem_scale"] = scale
 
-    sql_types = """
-                        select t.owner, t.type_name, t.attr_name, t.attr_type_owner, t.attr_type_mod, t.attr_type_name, 
-                            t.precision, t.scale, t.attr_no, t.length
-                          from all_type_attrs t
-                          where t.owner = upper(:a)
-                         order by t.owner, t.type_name, attr_no
-                        """
-    sql_types = replace_views(sql_types, available_views)
+    sql_types = get_statement(catalog, "type_attrs", owner_filter=owner_filter)
 
-    cursor.execute(sql_types, {'a': user})
+    rows = fetch_rows(connect, "type_attrs", sql_types, owner_params, SIZE_MEDIUM)
     for owner, type_name, attr_name, attr_type_owner, attr_type_mod, attr_type_name, precision, scale, \
-        attr_no, length in cursor:
+        attr_no, length in rows:
         types[get_table_id(owner, type_name)]["is_object"] = True
         attr = {"precision": precision, "scale": scale, "attr_no": attr_no, "name": attr_name,
                 "type": attr_type_name, "type_id": get_table_id(attr_type_owner, attr_type_name), "length": length}
         types[get_table_id(owner, type_name)]["attrs"].append(attr)
 
-    sql_types = """
-                        select t.owner, t.type_name, t.method_name, t.method_no
-                          from all_type_methods t
-                          where t.owner = upper(:a)
-                         order by t.owner, t.type_name, method_no
-                        """
-    sql_types = replace_views(sql_types, available_views)
+    sql_types = get_statement(catalog, "type_methods", owner_filter=owner_filter)
 
-    cursor.execute(sql_types, {'a': user})
+    rows = fetch_rows(connect, "type_methods", sql_types, owner_params, SIZE_SMALL)
 
-    for owner, type_name, method_name, method_no in cursor:
+    for owner, type_name, method_name, method_no in rows:
         types[get_table_id(owner, type_name)]["is_object"] = True
         method = {"name": method_name, "scale": scale, "method_no": method_no}
         types[get_table_id(owner, type_name)]["methods"].append(method)
@@ -333,15 +478,383 @@ def gather_types(connect, user, available_views):
     return types
 
 
+def make_code_unit(owner, unit_name, unit_type):
+    return {"name": unit_name, "owner": owner, "type": unit_type, "subprograms": []}
+
+
+def make_subprogram(unit_name, subprogram_name, overload):
+    # standalone procedures and functions are their own only subprogram
+    return {"name": subprogram_name or unit_name, "overload": overload, "arguments": [], "returns": None}
+
+
+def gather_code(connect, owners, catalog, names=None):
+    owner_filter, owner_params = get_object_filter("o.owner", owners, "o.object_name", names)
+    sql_code = get_statement(catalog, "code_units", owner_filter=owner_filter)
+    code = {}
+    for owner, unit_name, unit_type in fetch_rows(connect, "code_units", sql_code, owner_params, SIZE_SMALL):
+        code[get_table_id(owner, unit_name)] = make_code_unit(owner, unit_name, unit_type)
+
+    owner_filter, owner_params = get_object_filter("p.owner", owners, "p.object_name", names)
+    sql_subprograms = get_statement(catalog, "code_subprograms", owner_filter=owner_filter)
+    subprograms = {}
+    for owner, unit_name, subprogram_name, subprogram_id, overload in fetch_rows(connect, "code_subprograms",
+                                                                                   sql_subprograms, owner_params,
+                                                                                   SIZE_MEDIUM):
+        unit = code.get(get_table_id(owner, unit_name))
+        if unit is None:
+            continue
+        subprogram = make_subprogram(unit_name, subprogram_name, overload)
+        unit["subprograms"].append(subprogram)
+        subprograms[(owner, unit_name, subprogram_id)] = subprogram
+
+    owner_filter, owner_params = get_object_filter("a.owner", owners, "nvl(a.package_name, a.object_name)", names)
+    sql_arguments = get_statement(catalog, "code_arguments", owner_filter=owner_filter)
+    for owner, unit_name, subprogram_id, argument_name, position, data_type, in_out in \
+            fetch_rows(connect, "code_arguments", sql_arguments, owner_params, SIZE_LARGE):
+        # arguments of type methods are in the same view
+        subprogram = subprograms.get((owner, unit_name, subprogram_id))
+        if subprogram is None:
+            continue
+        if position == 0:
+            subprogram["returns"] = data_type
+        elif argument_name is not None:
+            # subprogram without arguments has one row without name
+            subprogram["arguments"].append({"name": argument_name, "type": data_type, "in_out": in_out})
+    # source is read by query ordered binary, so units are sorted same way, whatever NLS_SORT of session is
+    return dict(sorted(code.items(), key=lambda item: (item[1]["owner"], item[1]["name"])))
+
+
+def get_code_source(rows):
+    # rows are lines of one unit, text is joined from them, when the last one is read
+    return "".join(text for owner, unit_name, unit_type, line, text in rows if text is not None)
+
+
+def get_objects_signature(connect, owners, catalog):
+    # count of objects and last DDL time change on create, drop, alter and comment of any object of schemas
+    owner_filter, owner_params = get_object_filter("o.owner", owners)
+    sql_changes = get_statement(catalog, "object_changes", owner_filter=owner_filter)
+    rows = list(fetch_rows(connect, "object_changes", sql_changes, owner_params, SIZE_SMALL))
+    count, last_ddl_time = rows[0]
+    return count, str(last_ddl_time)
+
+
+def gather_object_versions(connect, owners, catalog):
+    # DDL time of table is combined with its indexes and triggers, they are documented within table
+    owner_filter, owner_params = get_object_filter("o.owner", owners)
+    index_filter, index_params = get_object_filter("i.table_owner", owners)
+    trigger_filter, trigger_params = get_object_filter("t.table_owner", owners)
+    sql_versions = get_statement(catalog, "object_versions", owner_filter=owner_filter, index_filter=index_filter,
+                                 trigger_filter=trigger_filter)
+    params = dict(owner_params, **index_params)
+    params.update(trigger_params)
+    versions = {}
+    for owner, object_name, object_group, last_ddl_time in fetch_rows(connect, "object_versions", sql_versions,
+                                                                      params, SIZE_LARGE):
+        # count of objects catches dropped indexes and triggers
+        key = (object_group, owner, object_name)
+        last_ddl_time = str(last_ddl_time)
+        if key in versions:
+            version_time, version_count = versions[key]
+            versions[key] = (max(version_time, last_ddl_time), version_count + 1)
+        else:
+            versions[key] = (last_ddl_time, 1)
+    return versions
+
+
+GATHER_STAGES = [("tables", gather_tables), ("columns", gather_columns), ("constraints", gather_constraints),
+                 ("indexes", gather_indexes), ("triggers", gather_triggers), ("queues", gather_queues),
+                 ("types", gather_types), ("code", gather_code)]
+# object groups, which stages gather, for incremental gathering
+STAGE_OBJECT_GROUPS = {"tables": OBJECT_TABLE, "columns": OBJECT_TABLE, "constraints": OBJECT_TABLE,
+                       "indexes": OBJECT_TABLE, "triggers": OBJECT_TABLE, "queues": OBJECT_QUEUE,
+                       "types": OBJECT_TYPE, "code": OBJECT_CODE}
+# stages, which could be split by table name ranges
+SHARDED_STAGES = ["columns", "indexes"]
+
+
+def run_stage(run_stats, stage_name, stage, connect, owners, catalog, names=None):
+    start = datetime.datetime.now()
+    if names is None:
+        result = stage(connect, owners, catalog)
+    else:
+        result = stage(connect, owners, catalog, names=names)
+    run_stats["stages"][stage_name] = datetime.datetime.now() - start
+    return result
+
+
+def run_pooled_shard(pool, args, stage, owners, catalog, key_range):
+    connect = acquire_connect(pool, args)
+    try:
+        return stage(connect, owners, catalog, key_range)
+    finally:
+        release_connect(pool, connect)
+
+
+def run_sharded_stage(pool, args, run_stats, stage_name, stage, owners, catalog, key_ranges):
+    from concurrent.futures import ThreadPoolExecutor
+    start = datetime.datetime.now()
+    with ThreadPoolExecutor(max_workers=len(key_ranges)) as executor:
+        futures = [executor.submit(run_pooled_shard, pool, args, stage, owners, catalog, key_range)
+                   for key_range in key_ranges]
+        # ranges are ordered, so results stay ordered by table name
+        result = {}
+        for future in futures:
+            result.update(future.result())
+    run_stats["stages"][stage_name] = datetime.datetime.now() - start
+    return result
+
+
+def run_pooled_stage(pool, args, run_stats, stage_name, stage, owners, catalog, key_ranges=None):
+    if key_ranges is not None and stage_name in SHARDED_STAGES:
+        return run_sharded_stage(pool, args, run_stats, stage_name, stage, owners, catalog, key_ranges)
+    connect = acquire_connect(pool, args)
+    try:
+        return run_stage(run_stats, stage_name, stage, connect, owners, catalog)
+    finally:
+        release_connect(pool, connect)
+
+
+def gather_serial(connect, owners, catalog, run_stats, pool=None, args=None, key_ranges=None):
+    results = {}
+    for stage_name, stage in GATHER_STAGES:
+        if key_ranges is not None and stage_name in SHARDED_STAGES:
+            results[stage_name] = run_sharded_stage(pool, args, run_stats, stage_name, stage, owners, catalog,
+                                                    key_ranges)
+        else:
+            results[stage_name] = run_stage(run_stats, stage_name, stage, connect, owners, catalog)
+    return results
+
+
+def gather_incremental(connect, owners, catalog, run_stats, changed):
+    # only changed objects are regathered, by names
+    results = {}
+    for stage_name, stage in GATHER_STAGES:
+        names = changed[STAGE_OBJECT_GROUPS[stage_name]]
+        if len(names) == 0:
+            results[stage_name] = {}
+        else:
+            results[stage_name] = run_stage(run_stats, stage_name, stage, connect, owners, catalog, names)
+    return results
+
+
+def gather_parallel(pool, args, owners, catalog, run_stats, key_ranges=None):
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+        futures = {}
+        for stage_name, stage in GATHER_STAGES:
+            futures[stage_name] = executor.submit(run_pooled_stage, pool, args, run_stats, stage_name, stage, owners,
+                                                  catalog, key_ranges)
+        results = {}
+        for stage_name in futures:
+            results[stage_name] = futures[stage_name].result()
+    # stages finish in arbitrary order, keep timings in declaration order for the footer
+    run_stats["stages"] = {stage_name: run_stats["stages"][stage_name] for stage_name, stage in GATHER_STAGES}
+    return results
+
+
+async def fetch_planned_query(pool, args, query_name, sql, params, size):
+    connect = await acquire_async_connect(pool, args)
+    try:
+        return await fetch_rows_async(connect, query_name, sql, params, size)
+    finally:
+        await release_async_connect(pool, connect)
+
+
+async def run_async_stage(pool, args, stage, owners, catalog, key_range=None):
+    import asyncio
+    # stage is run on query plan to learn its queries, they are fetched concurrently, and stage is run on their rows
+    plan = QueryPlan()
+    stage_args = (owners, catalog) if key_range is None else (owners, catalog, key_range)
+    stage(plan, *stage_args)
+    plan.results = list(await asyncio.gather(*(fetch_planned_query(pool, args, *query) for query in plan.queries)))
+    return stage(plan, *stage_args)
+
+
+async def run_timed_async_stage(pool, args, run_stats, stage_name, stage, owners, catalog, key_ranges=None):
+    import asyncio
+    start = datetime.datetime.now()
+    if key_ranges is not None and stage_name in SHARDED_STAGES:
+        # ranges are ordered, so results stay ordered by table name
+        result = {}
+        for shard in await asyncio.gather(*(run_async_stage(pool, args, stage, owners, catalog, key_range)
+                                            for key_range in key_ranges)):
+            result.update(shard)
+    else:
+        result = await run_async_stage(pool, args, stage, owners, catalog)
+    run_stats["stages"][stage_name] = datetime.datetime.now() - start
+    return result
+
+
+async def gather_async(args, owners, catalog, run_stats, sessions, key_ranges=None):
+    import asyncio
+    # all stages keep their queries in flight at once, on sessions of asyncio pool, in one thread
+    pool = get_async_pool(args, sessions)
+    try:
+        results = await asyncio.gather(*(run_timed_async_stage(pool, args, run_stats, stage_name, stage, owners,
+                                                               catalog, key_ranges)
+                                         for stage_name, stage in GATHER_STAGES))
+    finally:
+        if pool is not None:
+            await pool.close()
+    run_stats["stages"] = {stage_name: run_stats["stages"][stage_name] for stage_name, stage in GATHER_STAGES}
+    return {stage_name: result for (stage_name, stage), result in zip(GATHER_STAGES, results)}
+
+
+def set_binary_sort(connect):
+    # streams are merged by python string comparison, so database should sort names the same way
+    cursor = connect.cursor()
+    cursor.execute("alter session set nls_sort = binary")
+    cursor.execute("alter session set nls_comp = binary")
+    cursor.close()
+
+
+def set_pooled_binary_sort(connect, requested_tag):
+    set_binary_sort(connect)
+
+
+def open_stream(rows):
+    # rows are sorted by owner, kind and table name, which are first three columns
+    groups = ((key, list(group)) for key, group in itertools.groupby(rows, key=lambda row: row[:3]))
+    key, group = next(groups, (None, None))
+    return {"groups": groups, "key": key, "rows": group}
+
+
+def get_stream_rows(stream, key):
+    # rows of objects, which aren't in report (clusters, for example), are skipped
+    while stream["key"] is not None and stream["key"] < key:
+        stream["key"], stream["rows"] = next(stream["groups"], (None, None))
+    if stream["key"] != key:
+        return []
+    rows = stream["rows"]
+    stream["key"], stream["rows"] = next(stream["groups"], (None, None))
+    return rows
+
+
+def close_stream(stream):
+    # read the rest, so query is finished and counted in stats
+    for key, rows in stream["groups"]:
+        pass
+
+
+def get_table_list_rows(connect, owners, catalog):
+    # rows of tables are small and read once: they give both links in header of report and order of stream
+    owner_filter, owner_params = get_object_filter("t.owner", owners)
+    sql_tables = get_statement(catalog, "stream_tables", owner_filter=owner_filter)
+    return list(fetch_rows(connect, "tables", sql_tables, owner_params, SIZE_MEDIUM))
+
+
+def stream_table_list(rows):
+    for table_owner, kind, table_name, table_comment, temporary, iot_type, partitioned, nested in rows:
+        if kind == STREAM_KIND_TABLE:
+            table = make_table(table_name, table_comment, table_owner, temporary, iot_type, partitioned, nested)
+        else:
+            table = make_view(table_name, table_comment, table_owner)
+        yield (table_owner, kind, table_name), get_table_id(table_owner, table_name), table
+
+
+def open_source_stream(connect, owners, catalog):
+    # source is the biggest part of dictionary, so it isn't kept in model. It is fetched by large arrays from one
+    # query ordered by unit, and lines of every unit are read, when the unit is written to report
+    owner_filter, owner_params = get_object_filter("s.owner", owners)
+    sql_source = get_statement(catalog, "code_source", owner_filter=owner_filter)
+    return open_stream(fetch_rows(connect, "source", sql_source, owner_params, SIZE_LARGE))
+
+
+def open_source(args, owners, catalog=None):
+    # own session with binary sort for source query, sessions of gather keep their sort
+    connect = get_connect(args)
+    set_binary_sort(connect)
+    if catalog is None:
+        catalog = make_catalog(get_system_views(connect, args.dba), args.long_columns == LONG_SKIP)
+    return connect, open_source_stream(connect, owners, catalog)
+
+
+def get_code_units(code, sources=None):
+    # units with source of current one only. Without stream of source, as for report from snapshot, source is empty
+    for i in code:
+        unit = code[i]
+        source = ""
+        if sources is not None:
+            source = get_code_source(get_stream_rows(sources, (unit["owner"], unit["name"], unit["type"])))
+        yield i, unit, source
+    if sources is not None:
+        close_stream(sources)
+
+
+def stream_tables(connect, owners, catalog, table_rows=None):
+    # every table is yielded with its columns, constraints, indexes and triggers, as soon as all of them are read
+    if table_rows is None:
+        table_rows = get_table_list_rows(connect, owners, catalog)
+    owner_filter, owner_params = get_object_filter("t.owner", owners)
+    sql_attrs = get_statement(catalog, "stream_columns", owner_filter=owner_filter)
+    columns = open_stream(fetch_rows(connect, "columns", sql_attrs, owner_params, SIZE_LARGE))
+
+    owner_filter, owner_params = get_object_filter("c.owner", owners)
+    sql_constraints = get_statement(catalog, "stream_constraints", owner_filter=owner_filter)
+    constraints = open_stream(fetch_rows(connect, "constraints", sql_constraints, owner_params, SIZE_MEDIUM))
+
+    owner_filter, owner_params = get_object_filter("cc.owner", owners)
+    sql_constraint_columns = get_statement(catalog, "stream_constraint_columns", owner_filter=owner_filter)
+    constraint_columns = open_stream(fetch_rows(connect, "constraint_columns", sql_constraint_columns, owner_params,
+                                                SIZE_LARGE))
+
+    # indexes are built on tables only
+    owner_filter, owner_params = get_object_filter("i.table_owner", owners)
+    sql_indexes = get_statement(catalog, "stream_indexes", owner_filter=owner_filter)
+    indexes = open_stream(fetch_rows(connect, "indexes", sql_indexes, owner_params, SIZE_MEDIUM))
+
+    sql_index_columns = get_statement(catalog, "stream_index_columns", owner_filter=owner_filter)
+    index_columns = open_stream(fetch_rows(connect, "index_columns", sql_index_columns, owner_params, SIZE_LARGE))
+
+    owner_filter, owner_params = get_object_filter("t.table_owner", owners)
+    sql_triggers = get_statement(catalog, "stream_triggers", owner_filter=owner_filter)
+    triggers = open_stream(fetch_rows(connect, "triggers", sql_triggers, owner_params, SIZE_MEDIUM))
+
+    streams = [columns, constraints, constraint_columns, indexes, index_columns, triggers]
+    for key, table_id, table in stream_table_list(table_rows):
+        for owner, kind, table_name, column_name, comments, data_type, data_length, data_precision, data_scale, \
+                data_default, nullable, char_length, char_used, dt_owner, type_name in get_stream_rows(columns, key):
+            table["columns"][column_name] = make_column(column_name, comments, data_type, data_length,
+                                                        data_precision, data_scale, data_default, nullable,
+                                                        char_length, char_used, dt_owner, type_name)
+        table_constraints = {}
+        for owner, kind, table_name, constraint_type, constraint_name, search_condition, ref_owner, ref_constr, \
+                index_owner, index_name, ref_table_name in get_stream_rows(constraints, key):
+            table_constraints[(owner, constraint_name)] = make_constraint(table_name, constraint_type,
+                                                                          constraint_name, owner, search_condition,
+                                                                          ref_owner, ref_constr, index_owner,
+                                                                          index_name, ref_table_name)
+        for owner, kind, table_name, constraint_name, column_name in get_stream_rows(constraint_columns, key):
+            table_constraints[(owner, constraint_name)]["columns"].append(column_name)
+        table_indexes = {}
+        for table_owner, kind, table_name, index_type, index_name, index_owner in get_stream_rows(indexes, key):
+            table_indexes[get_table_id(index_owner, index_name)] = make_index(table_owner, table_name, index_type,
+                                                                              index_name, index_owner)
+        for table_owner, kind, table_name, index_name, index_owner, column_name, descend, data_default in \
+                get_stream_rows(index_columns, key):
+            add_index_column(table_indexes[get_table_id(index_owner, index_name)], column_name, descend,
+                             data_default)
+        table_triggers = {}
+        for owner, kind, table_name, trigger_name, trigger_type, triggering_event, trigger_owner in \
+                get_stream_rows(triggers, key):
+            table_triggers[get_table_id(trigger_owner, trigger_name)] = make_trigger(owner, trigger_name,
+                                                                                     trigger_type, triggering_event,
+                                                                                     table_name, trigger_owner)
+        yield table_id, table, table_constraints, table_indexes, table_triggers
+    for stream in streams:
+        close_stream(stream)
+
+
 def process_constraints(tables, constraints):
     for i in constraints:
         table_id = constraints[i]["table"]
         if constraints[i]["type"] == 'P':
             for j in (constraints[i]["columns"]):
                 tables[table_id]["columns"][j]["primary_key"] = True
-            tables[table_id]["unique_indexes"].append({"name": i, "columns": constraints[i]["columns"]})
+            tables[table_id]["unique_indexes"].append({"name": constraints[i]["name"],
+                                                       "columns": constraints[i]["columns"]})
         elif constraints[i]["type"] == 'R':
-            ref_table = constraints[constraints[i]["ref_constr"]]["table"]
+            ref_table = constraints[i]["ref_table"]
             for j in (constraints[i]["columns"]):
                 tables[table_id]["columns"][j]["ref_table"] = ref_table
         elif constraints[i]["type"] == 'C':
@@ -350,10 +863,57 @@ def process_constraints(tables, constraints):
             for j in (constraints[i]["columns"]):
                 tables[table_id]["columns"][j]["check"] = constraints[i]["check"]
         elif constraints[i]["type"] == 'U':
-            tables[table_id]["unique_indexes"].append({"name": i, "columns": constraints[i]["columns"]})
+            tables[table_id]["unique_indexes"].append({"name": constraints[i]["name"],
+                                                       "columns": constraints[i]["columns"]})
     return tables
 
 
+def process_foreign_keys(tables, constraints):
+    # graph of foreign keys: referencing tables with constraint names and dependency level of every table.
+    # Referenced constraint is found by its owner and name, it is absent for tables of schemas, which aren't documented
+    referenced_by = {}
+    references = {}
+    for i in constraints:
+        if constraints[i]["type"] != 'R':
+            continue
+        ref_constraint = constraints.get((constraints[i]["ref_owner"], constraints[i]["ref_constr"]))
+        if ref_constraint is None or ref_constraint["table"] not in tables:
+            continue
+        table_id = constraints[i]["table"]
+        ref_table = ref_constraint["table"]
+        referenced_by.setdefault(ref_table, []).append((table_id, constraints[i]["name"]))
+        if ref_table != table_id:
+            references.setdefault(table_id, set()).add(ref_table)
+    return {"referenced_by": referenced_by, "levels": get_dependency_levels(tables, references)}
+
+
+def get_dependency_levels(tables, references):
+    # tables without references are on level 0, others are one level above the highest table they reference.
+    # Tables in reference cycles and tables, which depend on them, get no level
+    dependents = {}
+    for table_id in references:
+        for ref_table in references[table_id]:
+            dependents.setdefault(ref_table, []).append(table_id)
+    waiting = {table_id: len(references[table_id]) for table_id in references}
+    ready = [table_id for table_id in tables if table_id not in references]
+    levels = dict.fromkeys(ready, 0)
+    while ready:
+        table_id = ready.pop()
+        for dependent in dependents.get(table_id, ()):
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                levels[dependent] = max(levels[ref_table] for ref_table in references[dependent]) + 1
+                ready.append(dependent)
+    return levels
+
+
+def get_fk_index_part(fk_index, table_ids):
+    # part of index for tables rendered by one worker
+    referenced_by = fk_index["referenced_by"]
+    return {"referenced_by": {i: referenced_by[i] for i in table_ids if i in referenced_by},
+            "levels": {i: fk_index["levels"][i] for i in table_ids if i in fk_index["levels"]}}
+
+
 def process_triggers(tables, triggers):
     for i in triggers:
         table_id = triggers[i]["table"]
@@ -368,22 +928,80 @@ def process_indexes(tables, indexes):
     return tables
 
 
-def make_report_header(file, tables, types, schema, trans, gen_user):
+def get_schema_objects(objects):
+    # group objects by owner, keeping gather order inside every schema
+    schema_objects = {}
+    for i in objects:
+        schema_objects.setdefault(objects[i]["owner"], []).append(i)
+    return schema_objects
+
+
+def make_report_schema_header(file, schema, trans, size=1):
+    file.add_header("{}: {}".format(trans.get_message(M_SCHEMA), schema), size)
+
+
+def make_report_header(file, tables, types, code, schemas, trans, gen_user, search_dir=None):
+    schema_tables = get_schema_objects(tables)
+    make_report_title(file, schemas, trans, gen_user)
+    make_report_search(file, search_dir, trans)
+    make_report_table_links(file, ((i, tables[i]) for schema in schema_tables for i in schema_tables[schema]), trans,
+                            len(schemas) > 1)
+    make_report_type_links(file, types, trans, len(schemas) > 1)
+    make_report_code_links(file, code, trans, len(schemas) > 1)
+
+
+def make_report_title(file, schemas, trans, gen_user):
     file.init()
-    file.add_header("{}: {}".format(trans.get_message(M_SCHEMA), schema))
+    make_report_schema_header(file, ", ".join(schemas), trans)
     file.add_header("{}: {}".format(trans.get_message(M_GENERATED_AS), gen_user))
-    if len(tables) > 0:
-        file.add_header("{}".format(trans.get_message(M_TABLES)))
-        for i in tables:
-            if tables[i]["nested"]:
-                continue
-            file.add_link(i, tables[i]["name"])
-            file.new_line()
+
+
+def make_report_search(file, search_dir, trans):
+    if search_dir is not None:
+        file.add_search(os.path.basename(search_dir) + "/", trans.get_message(M_SEARCH))
+
+
+def get_search_link(file, anchor):
+    return file.get_page_link(anchor) + "#" + anchor
+
+
+def make_report_table_links(file, tables, trans, multi_schema=False):
+    # tables are pairs of table id and table, grouped by schema
+    prev_owner = None
+    for i, table in tables:
+        if prev_owner is None:
+            file.add_header("{}".format(trans.get_message(M_TABLES)))
+        if multi_schema and table["owner"] != prev_owner:
+            make_report_schema_header(file, table["owner"], trans, 3)
+        prev_owner = table["owner"]
+        if table["nested"]:
+            continue
+        file.add_link(i, table["name"])
+        file.new_line()
+
+
+def make_report_type_links(file, types, trans, multi_schema=False):
     if len(types) > 0:
         file.add_header("{}".format(trans.get_message(M_TYPES)))
-        for i in types:
-            file.add_link(i, types[i]["name"])
-            file.new_line()
+        schema_types = get_schema_objects(types)
+        for schema in schema_types:
+            if multi_schema:
+                make_report_schema_header(file, schema, trans, 3)
+            for i in schema_types[schema]:
+                file.add_link(i, types[i]["name"])
+                file.new_line()
+
+
+def make_report_code_links(file, code, trans, multi_schema=False):
+    if len(code) > 0:
+        file.add_header("{}".format(trans.get_message(M_CODE_UNITS)))
+        schema_code = get_schema_objects(code)
+        for schema in schema_code:
+            if multi_schema:
+                make_report_schema_header(file, schema, trans, 3)
+            for i in schema_code[schema]:
+                file.add_link(i, code[i]["name"])
+                file.new_line()
 
 
 def make_report_footer(file, run_stats, trans):
@@ -396,7 +1014,41 @@ def make_report_footer(file, run_stats, trans):
     file.add_table_row([trans.get_message(M_REPORT_PROCESS_BEGIN), run_stats["start_report"]])
     run_stats["end_report"] = datetime.datetime.now()
     file.add_table_row([trans.get_message(M_REPORT_PROCESS_END), run_stats["end_report"]])
+    if "changed_objects" in run_stats:
+        file.add_table_row([trans.get_message(M_CHANGED_OBJECTS), run_stats["changed_objects"]])
+    if "render_cache" in run_stats:
+        file.add_table_row([trans.get_message(M_RENDER_CACHE_HITS), run_stats["render_cache"]["hits"]])
+        file.add_table_row([trans.get_message(M_RENDER_CACHE_MISSES), run_stats["render_cache"]["misses"]])
     file.close_table()
+    if len(run_stats.get("stages", {})) > 0:
+        file.new_line()
+        file.write("{}:".format(trans.get_message(M_GATHER_STAGES)))
+        file.new_line()
+        file.add_table()
+        file.add_table_row([trans.get_message(M_STAGE), trans.get_message(M_STAGE_TIME)])
+        for stage_name in run_stats["stages"]:
+            file.add_table_row([stage_name, run_stats["stages"][stage_name]])
+        file.close_table()
+    if len(run_stats.get("queries", {})) > 0:
+        file.new_line()
+        file.write("{}:".format(trans.get_message(M_QUERIES)))
+        file.new_line()
+        file.add_table()
+        file.add_table_row([trans.get_message(M_QUERY), trans.get_message(M_EXECUTIONS), trans.get_message(M_ROWS),
+                            trans.get_message(M_ROUND_TRIPS), trans.get_message(M_BYTES_RECEIVED),
+                            trans.get_message(M_FETCH_SIZE), trans.get_message(M_STAGE_TIME)])
+        for query_name in run_stats["queries"]:
+            query_stats = run_stats["queries"][query_name]
+            # round trips are estimated by fetch size, when session statistics weren't available
+            round_trips = query_stats["round_trips"]
+            if not query_stats["measured"]:
+                round_trips = "~{}".format(round_trips)
+            bytes_received = query_stats["bytes"]
+            if bytes_received is None:
+                bytes_received = ""
+            file.add_table_row([query_name, query_stats["executions"], query_stats["rows"], round_trips, bytes_received,
+                                query_stats["arraysize"], query_stats["elapsed"]])
+        file.close_table()
 
 
 def make_report_attr(file, attr, trans):
@@ -426,13 +1078,13 @@ def make_report_attr(file, attr, trans):
         file.add_table_cell(trans.translate_bool(True))
     else:
         file.add_table_cell('')
-    if "ref_table" in attr.keys():
+    if "ref_table" in attr:
         file.open_table_cell()
         file.add_link(attr["ref_table"], attr["ref_table"])
         file.close_table_cell()
     else:
         file.add_table_cell('')
-    if "check" in attr.keys():
+    if "check" in attr:
         file.add_table_cell(attr["check"])
     else:
         file.add_table_cell('')
@@ -464,70 +1116,117 @@ def make_report_index(file, index):
         file.close_list()
 
 
-def make_report_tables(file, tables, trans):
-    for i in tables:
-        # don't need nested tables storage in report
-        if tables[i]["nested"]:
-            continue
-        file.add_link_anchor(i)
-        file.add_header(tables[i]["name"], 2)
-        file.write("{}: {}".format(trans.get_message(M_TABLE), tables[i]["name"]))
+def make_report_tables(file, tables, trans, multi_schema=False, search_index=None, fk_index=None):
+    schema_tables = get_schema_objects(tables)
+    for schema in schema_tables:
+        if multi_schema:
+            make_report_schema_header(file, schema, trans)
+        for i in schema_tables[schema]:
+            file.add_cached(get_table_cache_values(i, tables[i], fk_index), make_report_table, i, tables[i], trans,
+                            fk_index)
+            if search_index is not None and not tables[i]["nested"]:
+                add_search_table(search_index, i, tables[i], get_search_link(file, i))
+
+
+def get_table_cache_values(i, table, fk_index=None):
+    # section of table depends on its foreign keys index entries too
+    fk_values = None
+    if fk_index is not None:
+        fk_values = (fk_index["levels"].get(i), fk_index["referenced_by"].get(i))
+    return i, table.pack(), fk_values
+
+
+def make_report_table(file, i, table, trans, fk_index=None):
+    # don't need nested tables storage in report
+    if table["nested"]:
+        return
+    file.add_link_anchor(i)
+    file.add_header(table["name"], 2)
+    file.write("{}: {}".format(trans.get_message(M_TABLE), table["name"]))
+    file.new_line()
+    file.write("{}: {}".format(trans.get_message(M_TABLE_OR_VIEW), trans.get_message(table["type"])))
+    file.new_line()
+    if "table_type" in table:
+        file.write("{}: {}".format(trans.get_message(M_TABLE_CATEGORY),
+                                   trans.get_message(table["table_type"])))
         file.new_line()
-        file.write("{}: {}".format(trans.get_message(M_TABLE_OR_VIEW), trans.get_message(tables[i]["type"])))
+    if "partitioned" in table:
+        file.write("{}: {}".format(trans.get_message(M_IS_PARTITIONED),
+                                   trans.translate_bool(table["partitioned"])))
         file.new_line()
-        if "table_type" in tables[i].keys():
-            file.write("{}: {}".format(trans.get_message(M_TABLE_CATEGORY),
-                                       trans.get_message(tables[i]["table_type"])))
-            file.new_line()
-        if "partitioned" in tables[i].keys():
-            file.write("{}: {}".format(trans.get_message(M_IS_PARTITIONED),
-                                       trans.translate_bool(tables[i]["partitioned"])))
-            file.new_line()
-        if tables[i]["comment"] is not None and len(tables[i]["comment"]) > 0:
-            file.write("{}: {}".format(trans.get_message(M_COMMENT), tables[i]["comment"]))
-            file.new_line()
-        file.write("{}:".format(trans.get_message(M_COLUMNS)))
+    if table["comment"] is not None and len(table["comment"]) > 0:
+        file.write("{}: {}".format(trans.get_message(M_COMMENT), table["comment"]))
         file.new_line()
-        file.add_table()
-        file.open_table_row()
-        file.add_table_cell(trans.get_message(M_COLUMN_NAME))
-        file.add_table_cell(trans.get_message(M_COLUMN_TYPE))
-        file.add_table_cell(trans.get_message(M_COLUMN_LENGTH))
-        file.add_table_cell(trans.get_message(M_COLUMN_LENGTH_SEMANTICS))
-        file.add_table_cell(trans.get_message(M_COLUMN_PRECISION))
-        file.add_table_cell(trans.get_message(M_COLUMN_SCALE))
-        file.add_table_cell(trans.get_message(M_COLUMN_DEFAULT))
-        file.add_table_cell(trans.get_message(M_COLUMN_PK))
-        file.add_table_cell(trans.get_message(M_COLUMN_FK))
-        file.add_table_cell(trans.get_message(M_COLUMN_CHECK))
-        file.add_table_cell(trans.get_message(M_COLUMN_NULLABLE))
-        file.add_table_cell(trans.get_message(M_COMMENT))
-        file.close_table_row()
-        for j in tables[i]["columns"]:
-            make_report_attr(file, tables[i]["columns"][j], trans)
-        file.close_table()
-        if len(tables[i]["unique_indexes"]) > 0:
-            file.new_line()
-            file.write("{}:".format(trans.get_message(M_UNIQUE_CONSTRAINTS)))
-            file.new_line()
-            file.new_line()
-            for j in tables[i]["unique_indexes"]:
-                make_report_unique_index(file, j)
-        if len(tables[i]["indexes"]) > 0:
-            file.new_line()
-            file.write("{}:".format(trans.get_message(M_INDEXES)))
-            file.new_line()
-            file.new_line()
-            for j in tables[i]["indexes"]:
-                make_report_index(file, j)
-        make_report_triggers(file, tables[i]["triggers"], trans)
+    # foreign keys index is made only from whole model, streamed tables have none
+    if fk_index is not None and table["type"] == TYPE_TABLE:
+        make_report_dependency_level(file, fk_index["levels"].get(i), trans)
+    file.add_fragment((M_COLUMNS, trans.locale, trans.encoding), make_report_columns_header, trans)
+    for j in table["columns"]:
+        make_report_attr(file, table["columns"][j], trans)
+    file.close_table()
+    if len(table["unique_indexes"]) > 0:
+        file.new_line()
+        file.write("{}:".format(trans.get_message(M_UNIQUE_CONSTRAINTS)))
+        file.new_line()
+        file.new_line()
+        for j in table["unique_indexes"]:
+            make_report_unique_index(file, j)
+    if len(table["indexes"]) > 0:
+        file.new_line()
+        file.write("{}:".format(trans.get_message(M_INDEXES)))
+        file.new_line()
+        file.new_line()
+        for j in table["indexes"]:
+            make_report_index(file, j)
+    if fk_index is not None and i in fk_index["referenced_by"]:
+        make_report_referenced_by(file, fk_index["referenced_by"][i], trans)
+    make_report_triggers(file, table["triggers"], trans)
+
+
+def make_report_dependency_level(file, level, trans):
+    if level is None:
+        level = trans.get_message(M_REFERENCE_CYCLE)
+    file.write("{}: {}".format(trans.get_message(M_DEPENDENCY_LEVEL), level))
+    file.new_line()
+
+
+def make_report_referenced_by(file, references, trans):
+    # pairs of referencing table id and foreign key name
+    file.new_line()
+    file.write("{}:".format(trans.get_message(M_REFERENCED_BY)))
+    file.new_line()
+    file.new_line()
+    for table_id, constraint_name in references:
+        file.add_link(table_id, table_id)
+        file.write(" ({})".format(constraint_name))
+        file.new_line()
+
+
+def make_report_columns_header(file, trans):
+    file.write("{}:".format(trans.get_message(M_COLUMNS)))
+    file.new_line()
+    file.add_table()
+    file.open_table_row()
+    file.add_table_cell(trans.get_message(M_COLUMN_NAME))
+    file.add_table_cell(trans.get_message(M_COLUMN_TYPE))
+    file.add_table_cell(trans.get_message(M_COLUMN_LENGTH))
+    file.add_table_cell(trans.get_message(M_COLUMN_LENGTH_SEMANTICS))
+    file.add_table_cell(trans.get_message(M_COLUMN_PRECISION))
+    file.add_table_cell(trans.get_message(M_COLUMN_SCALE))
+    file.add_table_cell(trans.get_message(M_COLUMN_DEFAULT))
+    file.add_table_cell(trans.get_message(M_COLUMN_PK))
+    file.add_table_cell(trans.get_message(M_COLUMN_FK))
+    file.add_table_cell(trans.get_message(M_COLUMN_CHECK))
+    file.add_table_cell(trans.get_message(M_COLUMN_NULLABLE))
+    file.add_table_cell(trans.get_message(M_COMMENT))
+    file.close_table_row()
 
 
 def make_report_queues(file, queues, trans):
     if len(queues) == 0:
         return
     file.add_header(trans.get_message(M_QUEUES))
-    file.open_table()
+    file.add_table()
     file.open_table_row()
     file.add_table_cell(trans.get_message(M_QUEUE))
     file.add_table_cell(trans.get_message(M_TABLE))
@@ -547,81 +1246,140 @@ def make_report_queues(file, queues, trans):
     file.close_table()
 
 
-def make_report_types(file, types, trans):
+def make_report_types(file, types, trans, multi_schema=False, search_index=None):
     if len(types) == 0:
         return
     file.add_header(trans.get_message(M_TYPES))
 
-    for i in types:
-        file.add_link_anchor(types[i]["type_id"])
-        file.add_header(types[i]["name"], 2)
-        file.write("{0}: {1}".format(trans.get_message(M_TYPE), types[i]["code"]))
+    schema_types = get_schema_objects(types)
+    for schema in schema_types:
+        if multi_schema:
+            make_report_schema_header(file, schema, trans, 2)
+        for i in schema_types[schema]:
+            file.add_cached(types[i], make_report_type, types[i], trans)
+            if search_index is not None:
+                add_search_type(search_index, i, types[i], get_search_link(file, i))
+
+
+def make_report_type(file, type_info, trans):
+    file.add_link_anchor(type_info["type_id"])
+    file.add_header(type_info["name"], 2)
+    file.write("{0}: {1}".format(trans.get_message(M_TYPE), type_info["code"]))
+    file.new_line()
+    if type_info["is_array"]:
+        file.write("{0}: {1}".format(trans.get_message(M_ARRAY_TYPE), type_info["array_type"]))
         file.new_line()
-        if types[i]["is_array"]:
-            file.write("{0}: {1}".format(trans.get_message(M_ARRAY_TYPE), types[i]["array_type"]))
-            file.new_line()
-            if types[i]["array_size"] is not None:
-                file.write("{0}: {1}".format(trans.get_message(M_ARRAY_SIZE), types[i]["array_size"]))
-            else:
-                file.write("{0}: {1}".format(trans.get_message(M_ARRAY_SIZE), trans.get_message(M_UNBOUNDED)))
+        if type_info["array_size"] is not None:
+            file.write("{0}: {1}".format(trans.get_message(M_ARRAY_SIZE), type_info["array_size"]))
+        else:
+            file.write("{0}: {1}".format(trans.get_message(M_ARRAY_SIZE), trans.get_message(M_UNBOUNDED)))
+        file.new_line()
+        file.write("{0}: {1}".format(trans.get_message(M_COLUMN_TYPE), type_info["array_elem_type"]))
+        file.new_line()
+        if type_info["array_elem_len"] is not None:
+            file.write("{0}: {1}".format(trans.get_message(M_COLUMN_LENGTH), type_info["array_elem_len"]))
             file.new_line()
-            file.write("{0}: {1}".format(trans.get_message(M_COLUMN_TYPE), types[i]["array_elem_type"]))
+        if type_info["array_elem_precision"] is not None:
+            file.write("{0}: {1}".format(trans.get_message(M_COLUMN_PRECISION), type_info["array_elem_precision"]))
             file.new_line()
-            if types[i]["array_elem_len"] is not None:
-                file.write("{0}: {1}".format(trans.get_message(M_COLUMN_LENGTH), types[i]["array_elem_len"]))
-                file.new_line()
-            if types[i]["array_elem_precision"] is not None:
-                file.write("{0}: {1}".format(trans.get_message(M_COLUMN_PRECISION), types[i]["array_elem_precision"]))
-                file.new_line()
-            if types[i]["array_elem_scale"] is not None:
-                file.write("{0}: {1}".format(trans.get_message(M_COLUMN_SCALE), types[i]["array_elem_scale"]))
-                file.new_line()
-        elif types[i]["is_object"]:
-            if len(types[i]["methods"]) > 0:
-                file.write(trans.get_message(M_METHODS))
-                file.open_list()
-                for m in types[i]["methods"]:
-                    file.add_list_element(m["name"])
-                file.close_list()
+        if type_info["array_elem_scale"] is not None:
+            file.write("{0}: {1}".format(trans.get_message(M_COLUMN_SCALE), type_info["array_elem_scale"]))
             file.new_line()
-            file.add_table()
+    elif type_info["is_object"]:
+        if len(type_info["methods"]) > 0:
+            file.write(trans.get_message(M_METHODS))
+            file.open_list()
+            for m in type_info["methods"]:
+                file.add_list_element(m["name"])
+            file.close_list()
+        file.new_line()
+        file.add_fragment((M_ATTRS, trans.locale, trans.encoding), make_report_type_attrs_header, trans)
+        for attr in type_info["attrs"]:
             file.open_table_row()
-            file.add_table_cell(trans.get_message(M_ATTR_NAME))
-            file.add_table_cell(trans.get_message(M_COLUMN_TYPE))
-            file.add_table_cell(trans.get_message(M_COLUMN_LENGTH))
-            file.add_table_cell(trans.get_message(M_COLUMN_PRECISION))
-            file.add_table_cell(trans.get_message(M_COLUMN_SCALE))
+            file.add_table_cell(attr["name"])
+            if len(attr["type_id"]) > 0:
+                file.open_table_cell()
+                file.add_link(attr["type_id"], attr["type_id"])
+                file.close_table_cell()
+            else:
+                file.add_table_cell(attr["type"])
+            file.add_table_cell(attr["length"])
+            file.add_table_cell(attr["precision"])
+            file.add_table_cell(attr["scale"])
             file.close_table_row()
-            file.write(trans.get_message(M_ATTRS))
-            for attr in types[i]["attrs"]:
-                file.open_table_row()
-                file.add_table_cell(attr["name"])
-                if len(attr["type_id"]) > 0:
-                    file.open_table_cell()
-                    file.add_link(attr["type_id"], attr["type_id"])
-                    file.close_table_cell()
-                else:
-                    file.add_table_cell(attr["type"])
-                file.add_table_cell(attr["length"])
-                file.add_table_cell(attr["precision"])
-                file.add_table_cell(attr["scale"])
-            file.close_table()
+        file.close_table()
 
 
+def make_report_code(file, code, trans, multi_schema=False, sources=None):
+    # units are sorted by schema, their source is read from stream of source lines unit by unit
+    if len(code) == 0:
+        return
+    file.add_header(trans.get_message(M_CODE_UNITS))
+    prev_owner = None
+    for i, unit, source in get_code_units(code, sources):
+        if multi_schema and unit["owner"] != prev_owner:
+            make_report_schema_header(file, unit["owner"], trans, 2)
+        prev_owner = unit["owner"]
+        file.add_cached((i, unit, source), make_report_code_unit, i, unit, source, trans)
+
+
+def make_report_code_unit(file, i, unit, source, trans):
+    file.add_link_anchor(i)
+    file.add_header(unit["name"], 2)
+    file.write("{0}: {1}".format(trans.get_message(M_TYPE), unit["type"]))
+    file.new_line()
+    if len(unit["subprograms"]) > 0:
+        file.add_fragment((M_SUBPROGRAMS, trans.locale, trans.encoding), make_report_subprograms_header, trans)
+        for subprogram in unit["subprograms"]:
+            file.add_table_row([subprogram["name"], subprogram["overload"] or "",
+                                get_arguments_text(subprogram["arguments"]), subprogram["returns"] or ""])
+        file.close_table()
+    if len(source) > 0:
+        file.write(trans.get_message(M_SOURCE))
+        file.open_code()
+        file.add_code(source)
+        file.close_code()
+
+
+def get_arguments_text(arguments):
+    return ", ".join("{} {} {}".format(argument["name"], argument["in_out"], argument["type"])
+                     for argument in arguments)
 
 
+def make_report_subprograms_header(file, trans):
+    file.write(trans.get_message(M_SUBPROGRAMS))
+    file.add_table()
+    file.add_table_row([trans.get_message(M_SUBPROGRAM), trans.get_message(M_OVERLOAD),
+                        trans.get_message(M_ARGUMENTS), trans.get_message(M_RETURNS)])
+
+
+def make_report_type_attrs_header(file, trans):
+    file.write(trans.get_message(M_ATTRS))
+    file.add_table()
+    file.open_table_row()
+    file.add_table_cell(trans.get_message(M_ATTR_NAME))
+    file.add_table_cell(trans.get_message(M_COLUMN_TYPE))
+    file.add_table_cell(trans.get_message(M_COLUMN_LENGTH))
+    file.add_table_cell(trans.get_message(M_COLUMN_PRECISION))
+    file.add_table_cell(trans.get_message(M_COLUMN_SCALE))
+    file.close_table_row()
+
+
+def make_report_triggers_header(file, trans):
+    file.new_line()
+    file.write("{}:".format(trans.get_message(M_TRIGGERS)))
+    file.new_line()
+    file.add_table()
+    file.open_table_row()
+    file.add_table_cell(trans.get_message(M_TRIGGER_NAME))
+    file.add_table_cell(trans.get_message(M_TRIGGER_EVENT))
+    file.add_table_cell(trans.get_message(M_TRIGGER_ACTION))
+    file.close_table_row()
+
 
 def make_report_triggers(file, triggers, trans):
     if len(triggers) > 0:
-        file.new_line()
-        file.write("{}:".format(trans.get_message(M_TRIGGERS)))
-        file.new_line()
-        file.add_table()
-        file.open_table_row()
-        file.add_table_cell(trans.get_message(M_TRIGGER_NAME))
-        file.add_table_cell(trans.get_message(M_TRIGGER_EVENT))
-        file.add_table_cell(trans.get_message(M_TRIGGER_ACTION))
-        file.close_table_row()
+        file.add_fragment((M_TRIGGERS, trans.locale, trans.encoding), make_report_triggers_header, trans)
         for i in triggers:
             file.open_table_row()
             file.add_table_cell(i["owner"] + "." + i["name"])
@@ -631,24 +1389,359 @@ def make_report_triggers(file, triggers, trans):
         file.close_table()
 
 
-def make_report(tables, queues, types, run_stats, filename, schema, locale, gen_user, file_type):
+def make_report(tables, queues, types, code, run_stats, filename, schemas, locale, gen_user, file_type,
+                buffer_size=None, search=False, fk_index=None, cache_dir=None, cache_size=None, sources=None):
     run_stats["start_report"] = datetime.datetime.now()
     translator = L18n()
     translator.set_locale(locale)
-    report = Report(file_type)
+    report = Report(file_type, buffer_size)
     report.set_file(filename)
-    make_report_header(report, tables, types, schema, translator, gen_user)
-    make_report_tables(report, tables, translator)
+    open_report_cache(report, translator, cache_dir, cache_size)
+    search_dir = None
+    search_index = None
+    if search:
+        search_dir = get_search_dir(filename)
+        search_index = new_search_index()
+    make_report_header(report, tables, types, code, schemas, translator, gen_user, search_dir)
+    make_report_tables(report, tables, translator, len(schemas) > 1, search_index, fk_index)
     make_report_queues(report, queues, translator)
-    make_report_types(report, types, translator)
+    make_report_types(report, types, translator, len(schemas) > 1, search_index)
+    make_report_code(report, code, translator, len(schemas) > 1, sources)
+    if search:
+        save_search_index(search_index, search_dir)
+    close_report_cache(report, run_stats)
+    if sources is not None:
+        run_stats["queries"] = get_stats()
     make_report_footer(report, run_stats, translator)
     report.close()
 
 
+def open_report_cache(report, trans, cache_dir, cache_size):
+    if cache_dir is not None:
+        from yet_another_oracle_doc_gen.render_cache import open_cache
+        report.render_cache = open_cache(cache_dir, cache_size, (report.mode, trans.locale,
+                                                                 sorted(trans.msg_map.items())))
+
+
+def close_report_cache(report, run_stats):
+    if report.render_cache is not None:
+        from yet_another_oracle_doc_gen.render_cache import close_cache
+        close_cache(report.render_cache)
+        run_stats["render_cache"] = {"hits": report.render_cache["hits"], "misses": report.render_cache["misses"]}
+
+
+def get_report_pages(tables, types, code, extension):
+    # page names are made from object ids. Names, which differ only by case or replaced characters, get numbers,
+    # because file names could be case insensitive
+    pages = {}
+    used_names = set()
+    for object_id in itertools.chain((i for i in tables if not tables[i]["nested"]), types, code):
+        name = PAGE_NAME_CHARS.sub("_", object_id)
+        page = name + extension
+        n = 1
+        while page.lower() in used_names:
+            n += 1
+            page = "{}_{}{}".format(name, n, extension)
+        used_names.add(page.lower())
+        pages[object_id] = page
+    return pages
+
+
+def open_report_page(pages, pages_dir, page, file_type, buffer_size):
+    report = Report(file_type, buffer_size)
+    report.set_file(os.path.join(pages_dir, page))
+    report.set_pages(pages, page)
+    report.init()
+    return report
+
+
+def make_report_table_pages(tables, pages, pages_dir, locale, file_type, buffer_size=None, fk_index=None):
+    # runs in worker process, tables are packed to be sent cheaper
+    translator = L18n()
+    translator.set_locale(locale)
+    tables = unpack_tables(tables)
+    for i in tables:
+        if tables[i]["nested"]:
+            continue
+        report = open_report_page(pages, pages_dir, pages[i], file_type, buffer_size)
+        make_report_table(report, i, tables[i], translator, fk_index)
+        report.close()
+
+
+def make_report_type_pages(types, pages, pages_dir, locale, file_type, buffer_size=None):
+    translator = L18n()
+    translator.set_locale(locale)
+    for i in types:
+        report = open_report_page(pages, pages_dir, pages[i], file_type, buffer_size)
+        make_report_type(report, types[i], translator)
+        report.close()
+
+
+def make_report_code_pages(code, pages, pages_dir, locale, file_type, buffer_size=None, sources=None):
+    # runs in main process, which reads stream of source
+    translator = L18n()
+    translator.set_locale(locale)
+    for i, unit, source in get_code_units(code, sources):
+        report = open_report_page(pages, pages_dir, pages[i], file_type, buffer_size)
+        make_report_code_unit(report, i, unit, source, translator)
+        report.close()
+
+
+def make_report_pages(tables, queues, types, code, run_stats, filename, schemas, locale, gen_user, file_type,
+                      buffer_size=None, workers=None, search=False, fk_index=None, sources=None):
+    # index page with links, queues and footer, and page for every table, type and program unit. Pages of tables
+    # and types are rendered by process pool
+    run_stats["start_report"] = datetime.datetime.now()
+    translator = L18n()
+    translator.set_locale(locale)
+    pages_dir = os.path.splitext(filename)[0] + PAGES_DIR_SUFFIX
+    os.makedirs(pages_dir, exist_ok=True)
+    pages = get_report_pages(tables, types, code, get_file_extension(file_type))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    table_ids = list(tables)
+    chunk_size = max(1, -(-len(table_ids) // (workers * PAGE_CHUNKS_PER_WORKER)))
+    tasks = []
+    for start in range(0, len(table_ids), chunk_size):
+        chunk = table_ids[start:start + chunk_size]
+        chunk_fk_index = None
+        if fk_index is not None:
+            chunk_fk_index = get_fk_index_part(fk_index, chunk)
+        tasks.append((make_report_table_pages, (pack_tables({i: tables[i] for i in chunk}), pages, pages_dir, locale,
+                                                file_type, buffer_size, chunk_fk_index)))
+    if len(types) > 0:
+        tasks.append((make_report_type_pages, (types, pages, pages_dir, locale, file_type, buffer_size)))
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(task, *task_args) for task, task_args in tasks]
+            for future in futures:
+                future.result()
+    else:
+        for task, task_args in tasks:
+            task(*task_args)
+    make_report_code_pages(code, pages, pages_dir, locale, file_type, buffer_size, sources)
+    report = Report(file_type, buffer_size)
+    report.set_file(filename)
+    report.set_pages(pages, pages_dir=os.path.basename(pages_dir) + "/")
+    search_dir = None
+    if search:
+        # pages are written by other processes, so index is made here from same objects
+        search_dir = get_search_dir(filename)
+        search_index = new_search_index()
+        for i in tables:
+            if not tables[i]["nested"]:
+                add_search_table(search_index, i, tables[i], get_search_link(report, i))
+        for i in types:
+            add_search_type(search_index, i, types[i], get_search_link(report, i))
+        save_search_index(search_index, search_dir)
+    make_report_header(report, tables, types, code, schemas, translator, gen_user, search_dir)
+    make_report_queues(report, queues, translator)
+    if sources is not None:
+        run_stats["queries"] = get_stats()
+    make_report_footer(report, run_stats, translator)
+    report.close()
+
+
+def get_table_record(table_id, table):
+    record = {"record": RECORD_TABLE, "id": table_id}
+    if table["type"] != TYPE_TABLE:
+        record["record"] = RECORD_VIEW
+    record.update(table.as_dict())
+    record["type"] = RECORD_TABLE_TYPES[record["type"]]
+    if "table_type" in record:
+        record["table_type"] = RECORD_TABLE_KINDS[record["table_type"]]
+    return record
+
+
+def open_records_file(filename, buffer_size=None):
+    if buffer_size is None:
+        return jsonl.open_file(filename)
+    return jsonl.open_file(filename, buffer_size)
+
+
+def make_report_records_tail(file, queues, types, code, sources=None):
+    for i in queues:
+        jsonl.write_record(file, dict({"record": RECORD_QUEUE, "id": i}, **queues[i]))
+    for i in types:
+        jsonl.write_record(file, dict({"record": RECORD_TYPE, "id": i}, **types[i]))
+    for i, unit, source in get_code_units(code, sources):
+        jsonl.write_record(file, dict({"record": RECORD_CODE, "id": i}, **unit, source=source))
+
+
+def make_report_records(tables, queues, types, code, run_stats, filename, buffer_size=None, sources=None):
+    # every table, view, queue, type and program unit is self-contained record, with its columns, constraints and
+    # indexes. Records are written after whole model is gathered, make_report_records_stream writes them as tables
+    # are gathered
+    run_stats["start_report"] = datetime.datetime.now()
+    file = open_records_file(filename, buffer_size)
+    schema_tables = get_schema_objects(tables)
+    for schema in schema_tables:
+        for i in schema_tables[schema]:
+            jsonl.write_record(file, get_table_record(i, tables[i]))
+    make_report_records_tail(file, queues, types, code, sources)
+    run_stats["end_report"] = datetime.datetime.now()
+    jsonl.close_file(file, filename)
+
+
+def make_report_records_stream(connect, owners, catalog, queues, types, code, run_stats, filename,
+                               buffer_size=None):
+    # records are written as soon as tables are processed, so they could be read before run ends
+    run_stats["start_report"] = datetime.datetime.now()
+    file = open_records_file(filename, buffer_size)
+    for table_id, table, constraints, indexes, triggers in stream_tables(connect, owners, catalog):
+        tables = process_constraints({table_id: table}, constraints)
+        tables = process_triggers(tables, triggers)
+        tables = process_indexes(tables, indexes)
+        jsonl.write_record(file, get_table_record(table_id, tables[table_id]))
+    make_report_records_tail(file, queues, types, code, open_source_stream(connect, owners, catalog))
+    run_stats["queries"] = get_stats()
+    run_stats["end_report"] = datetime.datetime.now()
+    jsonl.close_file(file, filename)
+
+
+def make_report_stream(connect, owners, catalog, queues, types, code, run_stats, filename, locale, gen_user,
+                       file_type, buffer_size=None, search=False, cache_dir=None, cache_size=None):
+    # tables are gathered, processed and written one by one, so only current one is kept in memory
+    run_stats["start_report"] = datetime.datetime.now()
+    translator = L18n()
+    translator.set_locale(locale)
+    report = Report(file_type, buffer_size)
+    report.set_file(filename)
+    open_report_cache(report, translator, cache_dir, cache_size)
+    multi_schema = len(owners) > 1
+    search_dir = None
+    search_index = None
+    if search:
+        search_dir = get_search_dir(filename)
+        search_index = new_search_index()
+    make_report_title(report, owners, translator, gen_user)
+    make_report_search(report, search_dir, translator)
+    table_rows = get_table_list_rows(connect, owners, catalog)
+    make_report_table_links(report, ((table_id, table) for key, table_id, table in stream_table_list(table_rows)),
+                            translator, multi_schema)
+    make_report_type_links(report, types, translator, multi_schema)
+    make_report_code_links(report, code, translator, multi_schema)
+    prev_owner = None
+    for table_id, table, constraints, indexes, triggers in stream_tables(connect, owners, catalog, table_rows):
+        tables = process_constraints({table_id: table}, constraints)
+        tables = process_triggers(tables, triggers)
+        tables = process_indexes(tables, indexes)
+        if multi_schema and table["owner"] != prev_owner:
+            make_report_schema_header(report, table["owner"], translator)
+        prev_owner = table["owner"]
+        report.add_cached(get_table_cache_values(table_id, tables[table_id]), make_report_table, table_id,
+                          tables[table_id], translator)
+        if search and not table["nested"]:
+            add_search_table(search_index, table_id, table, get_search_link(report, table_id))
+    make_report_queues(report, queues, translator)
+    make_report_types(report, types, translator, multi_schema, search_index)
+    if len(code) > 0:
+        make_report_code(report, code, translator, multi_schema, open_source_stream(connect, owners, catalog))
+    if search:
+        save_search_index(search_index, search_dir)
+    close_report_cache(report, run_stats)
+    run_stats["queries"] = get_stats()
+    make_report_footer(report, run_stats, translator)
+    report.close()
+
+
+def load_diff_model(filename):
+    # snapshots keep gathered model, it is processed same way as for report
+    model = load_snapshot(filename)["model"]
+    tables = process_constraints(model["tables"], model["constraints"])
+    tables = process_triggers(tables, model["triggers"])
+    model["tables"] = process_indexes(tables, model["indexes"])
+    return model
+
+
+def get_diff_changes():
+    # messages of changes, in order of columns of summary
+    from yet_another_oracle_doc_gen.diff import CHANGE_ADDED, CHANGE_CHANGED, CHANGE_DROPPED
+    return {CHANGE_ADDED: M_ADDED, CHANGE_DROPPED: M_DROPPED, CHANGE_CHANGED: M_CHANGED}
+
+
+def make_diff_report(changes, filename, old_name, new_name, locale, file_type, buffer_size=None):
+    translator = L18n()
+    translator.set_locale(locale)
+    report = Report(file_type, buffer_size)
+    report.set_file(filename)
+    report.init()
+    report.add_header("{}: {} - {}".format(translator.get_message(M_SCHEMA_CHANGES), old_name, new_name))
+    report.add_table()
+    diff_changes = get_diff_changes()
+    report.add_table_row([""] + [translator.get_message(diff_changes[diff_change]) for diff_change in diff_changes])
+    for objects, message, record in DIFF_OBJECTS:
+        counts = [sum(1 for object_id, change, object_changes in changes[objects] if change == diff_change)
+                  for diff_change in diff_changes]
+        report.add_table_row([translator.get_message(message)] + [str(count) for count in counts])
+    report.close_table()
+    for objects, message, record in DIFF_OBJECTS:
+        if len(changes[objects]) == 0:
+            continue
+        report.add_header(translator.get_message(message), 2)
+        for object_id, change, object_changes in changes[objects]:
+            report.add_header("{}: {}".format(object_id, translator.get_message(diff_changes[change])), 3)
+            if len(object_changes) > 0:
+                make_diff_report_changes(report, object_changes, translator, diff_changes)
+    report.close()
+
+
+def make_diff_report_changes(file, changes, trans, diff_changes):
+    file.add_fragment((M_SCHEMA_CHANGES, trans.locale, trans.encoding), make_diff_report_changes_header, trans)
+    for change in changes:
+        part = ""
+        if change["part"] in DIFF_PARTS:
+            part = trans.get_message(DIFF_PARTS[change["part"]])
+        file.add_table_row([part, change["name"], get_diff_value(change["field"]),
+                            trans.get_message(diff_changes[change["change"]]), get_diff_value(change["old"]),
+                            get_diff_value(change["new"])])
+    file.close_table()
+
+
+def make_diff_report_changes_header(file, trans):
+    file.add_table()
+    file.add_table_row([trans.get_message(M_PART), trans.get_message(M_NAME), trans.get_message(M_FIELD),
+                        trans.get_message(M_CHANGE), trans.get_message(M_OLD_VALUE), trans.get_message(M_NEW_VALUE)])
+
+
+def get_diff_value(value):
+    if value is None:
+        return ""
+    return str(value)
+
+
+def make_diff_records(changes, filename, buffer_size=None):
+    file = open_records_file(filename, buffer_size)
+    for objects, message, record in DIFF_OBJECTS:
+        for object_id, change, object_changes in changes[objects]:
+            jsonl.write_record(file, {"record": record, "id": object_id, "change": change, "changes": object_changes})
+    jsonl.close_file(file, filename)
+
+
+def make_diff(args, locale, file_type, buffer_size):
+    from yet_another_oracle_doc_gen.diff import diff_models
+    old_filename, new_filename = args.diff
+    # models are only read and compared, same as for report
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        changes = diff_models(load_diff_model(old_filename), load_diff_model(new_filename))
+    finally:
+        if gc_enabled:
+            gc.enable()
+    if file_type == MODE_JSONL:
+        make_diff_records(changes, args.file, buffer_size)
+    else:
+        make_diff_report(changes, args.file, os.path.basename(old_filename), os.path.basename(new_filename), locale,
+                         file_type, buffer_size)
+
+
 def get_system_views(connect, use_dba):
     views_temp = ["all_tables", "all_tab_comments", "all_views", "all_tab_columns", "all_col_comments",
                   "all_constraints", "all_cons_columns", "all_triggers", "all_queues", "all_indexes",
-                  "all_ind_columns", "all_types", "all_coll_types", "all_type_attrs", "all_type_methods"]
+                  "all_ind_columns", "all_tab_cols", "all_types", "all_coll_types", "all_type_attrs",
+                  "all_type_methods", "all_users", "all_objects", "all_procedures", "all_arguments", "all_source"]
     views = {}
     dba_views = []
     for i in views_temp:
@@ -657,9 +1750,7 @@ def get_system_views(connect, use_dba):
     if use_dba:
         sql = '''select lower(view_name) from all_views where view_name in ('{}')'''.\
             format("','".join(dba_views).upper())
-        cursor = connect.cursor()
-        cursor.execute(sql)
-        for view_name, in cursor:
+        for view_name, in fetch_rows(connect, "system_views", sql, None, SIZE_SMALL):
             views["all" + view_name[3:]] = view_name
     return views
 
@@ -673,14 +1764,96 @@ def get_settings():
     parser.add_argument("--locale", "-l", help="Localization file name, should be in l18n folder", action="store",
                         default="english")
     parser.add_argument("--file", "-f", help="Report file", action="store")
-    parser.add_argument("--file_type", "-ft", help="File type, html or docx", action="store", default='html')
+    parser.add_argument("--file_type", "-ft", help="File type, html, docx or jsonl. JSON lines records are written "
+                                                   "as tables are gathered only with --stream, otherwise after "
+                                                   "whole schema is gathered", action="store", default='html')
+    parser.add_argument("--buffer_size", help="Report output buffer size, KB", action="store", type=int)
     parser.add_argument("--user", "-u", help="User for gathering metadata", action="store")
     parser.add_argument("--password", "-p", help="Password", action="store")
     parser.add_argument("--tns", "-t", help="TNS for gathering metadata", action="store")
+    parser.add_argument("--driver", help="Database driver. fake reads data dictionary from SQLite file, given as TNS "
+                                         "and made by fake_db module", action="store", choices=sorted(DRIVERS),
+                        default=DRIVER_CX_ORACLE)
     parser.add_argument("--target_user", "-r",
-                        help="Target schema for documentation. If not specified, connect schema used", action="store")
+                        help="Target schemas for documentation, comma separated names or LIKE patterns. "
+                             "If not specified, connect schema used", action="store")
+    parser.add_argument("--parallel", "-P", help="Run gather stages concurrently on N pooled sessions",
+                        action="store", type=int, default=1)
+    parser.add_argument("--shards", "-S", help="Split columns and indexes queries into N table name ranges, "
+                                               "gathered on separate sessions", action="store", type=int, default=1)
+    parser.add_argument("--async", help="Gather stages concurrently on asyncio sessions of python-oracledb, in one "
+                                        "thread. --parallel sets number of sessions, by default one per stage",
+                        action="store_true", default=False, dest="async_gather")
+    parser.add_argument("--arraysize", help="Rows fetched per round trip for dictionary queries. "
+                                            "If not specified, chosen by expected query size", action="store", type=int)
+    parser.add_argument("--prefetch", help="Rows prefetched on query execution. If not specified, same as arraysize",
+                        action="store", type=int)
+    parser.add_argument("--long-columns", help="LONG columns: column defaults, check conditions and function-based "
+                                               "index expressions. full fetches them piecewise row by row, truncate "
+                                               "fetches them by arrays, cut to --long-size, skip doesn't fetch them. "
+                                               "Gain of truncate and skip isn't measured yet, --profile-json shows "
+                                               "round trips and time of queries to compare",
+                        action="store", choices=[LONG_FULL, LONG_TRUNCATE, LONG_SKIP], default=LONG_FULL)
+    parser.add_argument("--long-size", help="Characters of LONG values kept by --long-columns truncate",
+                        action="store", type=int, default=DEFAULT_LONG_SIZE)
+    parser.add_argument("--incremental", help="State file of previous run. Only objects with changed DDL time "
+                                              "are gathered, others are taken from state", action="store")
+    parser.add_argument("--save-snapshot", help="Save gathered metadata to snapshot file", action="store")
+    parser.add_argument("--from-snapshot", help="Make report from snapshot file, without connecting to database",
+                        action="store")
+    parser.add_argument("--diff", help="Write changes between two snapshot files to report, instead of schema "
+                                       "description", action="store", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--stream", help="Write every table to report as soon as it is gathered, without keeping "
+                                         "whole schema in memory", action="store_true", default=False)
+    parser.add_argument("--multi-file", help="Write index page to report file and page for every table and type "
+                                             "to directory next to it", action="store_true", default=False)
+    parser.add_argument("--report-workers", help="Processes writing pages of multi-file report. "
+                                                 "If not specified, number of CPUs", action="store", type=int)
+    parser.add_argument("--search-index", help="Write search index of tables, columns, types and comments to "
+                                               "directory next to report, and search box to report",
+                        action="store_true", default=False)
+    parser.add_argument("--render-cache", help="Directory of rendered table and type sections, kept between runs. "
+                                               "Sections of unchanged objects are copied from it", action="store")
+    parser.add_argument("--render-cache-size", help="Size limit of render cache, MB. Least recently used sections "
+                                                    "are removed over it", action="store", type=int,
+                        default=DEFAULT_RENDER_CACHE_SIZE)
+    parser.add_argument("--profile-json", help="Save run timings and per query statistics to JSON file",
+                        action="store")
+    parser.add_argument("--daemon", help="Serve reports of databases from JSON config over HTTP. Session pools and "
+                                         "gathered models are kept between requests", action="store",
+                        metavar="CONFIG")
+    parser.add_argument("--host", help="Address of daemon", action="store", default=DEFAULT_HOST)
+    parser.add_argument("--port", help="Port of daemon", action="store", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--model-ttl", help="Seconds, for which daemon serves gathered model without checking "
+                                            "changes of data dictionary", action="store", type=int,
+                        default=DEFAULT_MODEL_TTL)
     args = parser.parse_args()
-    if args.interactive:
+    if args.stream and (args.parallel > 1 or args.shards > 1 or args.async_gather or args.incremental is not None or
+                        args.save_snapshot is not None or args.from_snapshot is not None or args.multi_file):
+        parser.error("--stream can't be used with --parallel, --shards, --async, --incremental, snapshots or "
+                     "--multi-file")
+    # changed objects are regathered by names on one session
+    if args.incremental is not None and (args.parallel > 1 or args.shards > 1 or args.async_gather):
+        parser.error("--incremental can't be used with --parallel, --shards or --async")
+    # drivers of daemon are set by its config and checked for every database
+    if args.async_gather and args.driver not in ASYNC_DRIVERS and args.daemon is None:
+        parser.error("--async needs --driver {}".format(DRIVER_ORACLEDB))
+    if args.diff is not None and (args.stream or args.multi_file or args.search_index or
+                                  args.incremental is not None or args.save_snapshot is not None or
+                                  args.from_snapshot is not None):
+        parser.error("--diff can't be used with --stream, --multi-file, --search-index, --incremental or snapshots")
+    if args.search_index and args.file_type.upper() != MODE_HTML:
+        parser.error("--search-index is supported only for html reports")
+    if args.render_cache is not None and (args.file_type.upper() != MODE_HTML or args.multi_file):
+        parser.error("--render-cache is supported only for single file html reports")
+    if args.multi_file and args.file_type.upper() == MODE_JSONL:
+        parser.error("--multi-file can't be used with jsonl, it has record for every object")
+    if args.daemon is not None and (args.stream or args.multi_file or args.search_index or args.diff is not None or
+                                    args.incremental is not None or args.save_snapshot is not None or
+                                    args.from_snapshot is not None):
+        parser.error("--daemon can't be used with --stream, --multi-file, --search-index, --diff, --incremental or "
+                     "snapshots")
+    if args.interactive and args.from_snapshot is None and args.diff is None and args.daemon is None:
         if args.user is None:
             args.user = input('Username: ')
         if args.password is None:
@@ -689,43 +1862,308 @@ def get_settings():
             args.tns = input('TNS: ')
         if args.target_user is None:
             args.target_user = input('Target schema(empty for connect schema: ')
-        if args.file is None:
-            args.file = input('Report filename: ')
+    if args.interactive and args.file is None and args.daemon is None:
+        args.file = input('Report filename: ')
     if args.target_user is None:
         args.target_user = args.user
     return args
 
 
-def main():
-    args = get_settings()
-    connect = get_connect(args)
+def print_database_error(connect, exc):
+    error, = exc.args
+    print("NLS_LANG: " + os.environ.get("NLS_LANG"))
+    print("Database version : " + str(get_version(connect)))
+    print(error.message)
+
+
+def save_profile(filename, run_stats):
+    # dates are saved in ISO format and durations in seconds, for comparing runs by external tools
+    def convert(value):
+        if isinstance(value, dict):
+            return {key: convert(value[key]) for key in value}
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        if isinstance(value, datetime.timedelta):
+            return value.total_seconds()
+        return value
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(convert(run_stats), f, indent=2)
+
+
+def gather_model(args, run_stats, database=None):
+    # database of daemon keeps session pool, catalog and owners between runs
+    if database is None:
+        connect = get_connect(args)
+    else:
+        connect = acquire_connect(database["pool"], args)
     target_user = args.target_user
-    locale = args.locale
     use_dba = args.dba
-    file_type = args.file_type.upper()
-    run_stats = {"start_gather": datetime.datetime.now()}
+    pool = None
+    try:
+        if database is None:
+            enable_session_stats(connect, get_driver(args.driver).DatabaseError)
+            catalog = make_catalog(get_system_views(connect, use_dba), args.long_columns == LONG_SKIP)
+            owners = get_owners(connect, target_user, catalog)
+            if len(owners) == 0:
+                raise ValueError('No schemas found for: {}'.format(target_user))
+        else:
+            catalog = database["catalog"]
+            owners = database["owners"]
+        state = None
+        if args.incremental is not None:
+            versions = gather_object_versions(connect, owners, catalog)
+            state = load_state(args.incremental)
+            if state is not None and state["owners"] != owners:
+                state = None
+        if state is not None:
+            changed = get_changed_names(state, versions)
+            run_stats["changed_objects"] = sum(len(changed[group]) for group in changed)
+            gathered = gather_incremental(connect, owners, catalog, run_stats, changed)
+        else:
+            key_ranges = None
+            if args.shards > 1:
+                key_ranges = get_key_ranges(connect, owners, catalog, args.shards)
+            if args.async_gather:
+                import asyncio
+                sessions = args.parallel if args.parallel > 1 else len(GATHER_STAGES)
+                gathered = asyncio.run(gather_async(args, owners, catalog, run_stats, sessions, key_ranges))
+            else:
+                if database is not None:
+                    pool = database["pool"]
+                elif args.parallel > 1 or key_ranges is not None:
+                    pool = get_pool(args, args.parallel + len(SHARDED_STAGES) * args.shards)
+                if args.parallel > 1:
+                    gathered = gather_parallel(pool, args, owners, catalog, run_stats, key_ranges)
+                else:
+                    gathered = gather_serial(connect, owners, catalog, run_stats, pool, args, key_ranges)
+        model = {"tables": merge_columns(gathered["tables"], gathered["columns"]),
+                 "constraints": gathered["constraints"], "indexes": gathered["indexes"],
+                 "triggers": gathered["triggers"], "queues": gathered["queues"], "types": gathered["types"],
+                 "code": gathered["code"]}
+        if state is not None:
+            model = merge_model(state["model"], model, changed)
+        if args.incremental is not None:
+            # state is saved before processing, which changes gathered dicts
+            save_state(args.incremental, owners, versions, model)
+    except get_driver(args.driver).DatabaseError as exc:
+        print_database_error(connect, exc)
+        raise
+    finally:
+        if database is not None:
+            release_connect(database["pool"], connect)
+        elif pool is not None:
+            pool.close()
+    return model, owners
+
+
+def stream_report(args, run_stats, locale, file_type, buffer_size):
+    # only queues, types and program units without source are gathered before report, tables and source are
+    # streamed into it
+    connect = get_connect(args)
     try:
-        db_views = get_system_views(connect, use_dba)
-        schema_info = gather_tables(connect, target_user, db_views)
-        schema_info = gather_attrs(connect, target_user, schema_info, db_views)
-        schema_constraints = gather_constraints(connect, target_user, db_views)
-        schema_indexes = gather_indexes(connect, target_user, db_views)
-        triggers_constraints = gather_triggers(connect, target_user, db_views)
-        queues = gather_queues(connect, target_user, db_views)
-        types = gather_types(connect, target_user, db_views)
+        enable_session_stats(connect, get_driver(args.driver).DatabaseError)
+        catalog = make_catalog(get_system_views(connect, args.dba), args.long_columns == LONG_SKIP)
+        owners = get_owners(connect, args.target_user, catalog)
+        if len(owners) == 0:
+            raise ValueError('No schemas found for: {}'.format(args.target_user))
+        set_binary_sort(connect)
+        queues = run_stage(run_stats, "queues", gather_queues, connect, owners, catalog)
+        types = run_stage(run_stats, "types", gather_types, connect, owners, catalog)
+        code = run_stage(run_stats, "code", gather_code, connect, owners, catalog)
         run_stats["end_gather"] = datetime.datetime.now()
-        run_stats["start_process"] = datetime.datetime.now()
-        schema_info = process_constraints(schema_info, schema_constraints)
-        schema_info = process_triggers(schema_info, triggers_constraints)
-        schema_info = process_indexes(schema_info, schema_indexes)
-    except cx_Oracle.DatabaseError as exc:
-        error, = exc.args
-        print("NLS_LANG: " + os.environ.get("NLS_LANG"))
-        print("Database version : " + str(get_version(connect)))
-        print(error.message)
+        run_stats["start_process"] = run_stats["end_gather"]
+        run_stats["end_process"] = run_stats["end_gather"]
+        # table queries are fetched together from one session, so session statistics can't be split between them
+        disable_session_stats()
+        if file_type == MODE_JSONL:
+            make_report_records_stream(connect, owners, catalog, queues, types, code, run_stats, args.file,
+                                       buffer_size)
+        else:
+            make_report_stream(connect, owners, catalog, queues, types, code, run_stats, args.file, locale, args.user,
+                               file_type, buffer_size, args.search_index, args.render_cache,
+                               args.render_cache_size * 1024 * 1024)
+    except get_driver(args.driver).DatabaseError as exc:
+        print_database_error(connect, exc)
+        raise
+
+
+def get_database_args(args, settings):
+    database_args = argparse.Namespace(**vars(args))
+    for key in DATABASE_SETTINGS:
+        if key in settings:
+            setattr(database_args, key, settings[key])
+    if "target_user" not in settings:
+        database_args.target_user = database_args.user
+    if database_args.driver not in DRIVERS:
+        raise ValueError('Unsupported driver: {}'.format(database_args.driver))
+    if database_args.async_gather and database_args.driver not in ASYNC_DRIVERS:
+        raise ValueError('--async needs driver {}'.format(DRIVER_ORACLEDB))
+    return database_args
+
+
+def open_database(args, buffer_size):
+    # one more session, than gather uses at once, for the session which runs serial stages. Every session sorts
+    # binary, as source stream needs, so it is set once for session, instead of every render
+    pool = get_pool(args, 1 + args.parallel + len(SHARDED_STAGES) * args.shards, set_pooled_binary_sort)
+    connect = acquire_connect(pool, args)
+    try:
+        catalog = make_catalog(get_system_views(connect, args.dba), args.long_columns == LONG_SKIP)
+        owners = get_owners(connect, args.target_user, catalog)
+    finally:
+        release_connect(pool, connect)
+    if len(owners) == 0:
+        raise ValueError('No schemas found for: {}'.format(args.target_user))
+    return {"args": args, "buffer_size": buffer_size, "pool": pool, "catalog": catalog, "owners": owners}
+
+
+def close_database(database):
+    if database["pool"] is not None:
+        database["pool"].close()
+
+
+def check_database(database):
+    connect = acquire_connect(database["pool"], database["args"])
+    try:
+        return get_objects_signature(connect, database["owners"], database["catalog"])
+    finally:
+        release_connect(database["pool"], connect)
+
+
+def gather_database(database):
+    # signature is read before gather, so objects changed during it are gathered again after next check
+    signature = check_database(database)
+    run_stats = {"start_gather": datetime.datetime.now(), "stages": {}}
+    model, owners = gather_model(database["args"], run_stats, database)
+    run_stats["end_gather"] = datetime.datetime.now()
+    run_stats["start_process"] = run_stats["end_gather"]
+    tables = process_constraints(model["tables"], model["constraints"])
+    fk_index = process_foreign_keys(tables, model["constraints"])
+    tables = process_triggers(tables, model["triggers"])
+    tables = process_indexes(tables, model["indexes"])
+    run_stats["end_process"] = datetime.datetime.now()
+    return signature, {"tables": tables, "queues": model["queues"], "types": model["types"], "code": model["code"],
+                       "fk_index": fk_index, "run_stats": run_stats}
+
+
+def render_database(database, model, file_type):
+    # report functions write files, so report is written to temporary file and read back
+    import tempfile
+    args = database["args"]
+    run_stats = dict(model["run_stats"])
+    handle, filename = tempfile.mkstemp(suffix=get_file_extension(file_type))
+    os.close(handle)
+    source_connect = None
+    sources = None
+    try:
+        if len(model["code"]) > 0:
+            source_connect = acquire_connect(database["pool"], args)
+            if database["pool"] is None:
+                set_binary_sort(source_connect)
+            sources = open_source_stream(source_connect, database["owners"], database["catalog"])
+        if file_type == MODE_JSONL:
+            make_report_records(model["tables"], model["queues"], model["types"], model["code"], run_stats, filename,
+                                database["buffer_size"], sources)
+        else:
+            cache_dir = args.render_cache if file_type == MODE_HTML else None
+            make_report(model["tables"], model["queues"], model["types"], model["code"], run_stats, filename,
+                        database["owners"], args.locale, args.user, file_type, database["buffer_size"], False,
+                        model["fk_index"], cache_dir, args.render_cache_size * 1024 * 1024, sources)
+        with open(filename, "rb") as f:
+            return f.read()
+    finally:
+        if source_connect is not None:
+            release_connect(database["pool"], source_connect)
+        os.remove(filename)
+
+
+def run_daemon(args, buffer_size):
+    from yet_another_oracle_doc_gen.service import load_config, serve
+    settings = load_config(args.daemon)
+    databases = {}
+    try:
+        for name in settings:
+            databases[name] = open_database(get_database_args(args, settings[name]), buffer_size)
+    except Exception:
+        for name in databases:
+            close_database(databases[name])
         raise
+    functions = {"check": check_database, "gather": gather_database, "render": render_database,
+                 "close": close_database}
+    file_types = [args.file_type.upper()] + [file_type for file_type in FILE_EXTENSIONS
+                                             if file_type != args.file_type.upper()]
+    serve(args.host, args.port, databases, file_types, args.model_ttl, functions)
+
+
+def main():
+    args = get_settings()
+    locale = args.locale
+    file_type = args.file_type.upper()
+    long_size = None
+    if args.long_columns == LONG_TRUNCATE:
+        long_size = args.long_size
+    configure(args.arraysize, args.prefetch, long_size)
+    reset_stats()
+    run_stats = {"start_gather": datetime.datetime.now(), "stages": {}}
+    buffer_size = None
+    if args.buffer_size is not None:
+        buffer_size = args.buffer_size * 1024
+    if args.daemon is not None:
+        run_daemon(args, buffer_size)
+        return
+    if args.diff is not None:
+        make_diff(args, locale, file_type, buffer_size)
+        if args.interactive:
+            print('Job finished')
+        return
+    if args.stream:
+        stream_report(args, run_stats, locale, file_type, buffer_size)
+        if args.profile_json is not None:
+            save_profile(args.profile_json, run_stats)
+        if args.interactive:
+            print('Job finished')
+        return
+    if args.from_snapshot is not None:
+        snapshot = load_snapshot(args.from_snapshot)
+        model = snapshot["model"]
+        owners = snapshot["owners"]
+        gen_user = snapshot["gen_user"]
+    else:
+        model, owners = gather_model(args, run_stats)
+        gen_user = args.user
+        if args.save_snapshot is not None:
+            save_snapshot(args.save_snapshot, {"owners": owners, "gen_user": gen_user, "model": model})
+    run_stats["end_gather"] = datetime.datetime.now()
+    run_stats["queries"] = get_stats()
+    run_stats["start_process"] = datetime.datetime.now()
+    schema_info = process_constraints(model["tables"], model["constraints"])
+    fk_index = process_foreign_keys(schema_info, model["constraints"])
+    schema_info = process_triggers(schema_info, model["triggers"])
+    schema_info = process_indexes(schema_info, model["indexes"])
     run_stats["end_process"] = datetime.datetime.now()
-    make_report(schema_info, queues, types, run_stats, args.file, target_user, locale, args.user, file_type)
+    # reports from snapshots have no source, it isn't kept in model
+    source_connect = None
+    sources = None
+    if args.from_snapshot is None and len(model["code"]) > 0:
+        source_connect, sources = open_source(args, owners)
+    try:
+        if file_type == MODE_JSONL:
+            make_report_records(schema_info, model["queues"], model["types"], model["code"], run_stats, args.file,
+                                buffer_size, sources)
+        elif args.multi_file:
+            make_report_pages(schema_info, model["queues"], model["types"], model["code"], run_stats, args.file,
+                              owners, locale, gen_user, file_type, buffer_size, args.report_workers,
+                              args.search_index, fk_index, sources)
+        else:
+            make_report(schema_info, model["queues"], model["types"], model["code"], run_stats, args.file, owners,
+                        locale, gen_user, file_type, buffer_size, args.search_index, fk_index, args.render_cache,
+                        args.render_cache_size * 1024 * 1024, sources)
+    finally:
+        if source_connect is not None:
+            source_connect.close()
+    if sources is not None:
+        run_stats["queries"] = get_stats()
+    if args.profile_json is not None:
+        save_profile(args.profile_json, run_stats)
     if args.interactive:
         print('Job finished')
 
@@ -1,8 +1,15 @@
 # Constants for looking message translation in localization file
+M_ADDED = "ADDED"
+M_ARGUMENTS = "ARGUMENTS"
 M_ARRAY_TYPE = "ARRAY_TYPE"
 M_ARRAY_SIZE = "ARRAY_SIZE"
 M_ATTRS = "ATTRS"
 M_ATTR_NAME = "ATTR_NAME"
+M_BYTES_RECEIVED = "BYTES_RECEIVED"
+M_CHANGE = "CHANGE"
+M_CHANGED = "CHANGED"
+M_CHANGED_OBJECTS = "CHANGED_OBJECTS"
+M_CODE_UNITS = "CODE_UNITS"
 M_COMMENT = "COMMENT"
 M_COLUMNS = "COLUMNS"
 M_COLUMN_NAME = "COLUMN_NAME"
@@ -17,10 +24,17 @@ M_COLUMN_FK = "COLUMN_FK"
 M_COLUMN_CHECK = "COLUMN_CHECK"
 M_COLUMN_NULLABLE = "COLUMN_NULLABLE"
 
+M_DEPENDENCY_LEVEL = "DEPENDENCY_LEVEL"
+M_DROPPED = "DROPPED"
+
+M_EXECUTIONS = "EXECUTIONS"
 M_EXEC_TIME = "EXEC_TIME"
 
 M_FALSE = "FALSE"
+M_FETCH_SIZE = "FETCH_SIZE"
+M_FIELD = "FIELD"
 
+M_GATHER_STAGES = "GATHER_STAGES"
 M_GENERATED_AS = "GENERATED_AS"
 
 M_INDEXES = "INDEXES"
@@ -32,14 +46,38 @@ M_METADATA_PROCESS_BEGIN = "METADATA_PROCESS_BEGIN"
 M_METADATA_PROCESS_END = "METADATA_PROCESS_END"
 M_METHODS = "METHODS"
 
+M_NAME = "NAME"
+M_NEW_VALUE = "NEW_VALUE"
+
+M_OLD_VALUE = "OLD_VALUE"
+M_OVERLOAD = "OVERLOAD"
+
+M_PART = "PART"
+
+M_QUERIES = "QUERIES"
+M_QUERY = "QUERY"
 M_QUEUE = "QUEUE"
 M_QUEUES = "QUEUES"
 M_QUEUE_TYPE = "QUEUE_TYPE"
 
+M_REFERENCED_BY = "REFERENCED_BY"
+M_REFERENCE_CYCLE = "REFERENCE_CYCLE"
+M_RENDER_CACHE_HITS = "RENDER_CACHE_HITS"
+M_RENDER_CACHE_MISSES = "RENDER_CACHE_MISSES"
 M_REPORT_PROCESS_BEGIN = "REPORT_PROCESS_BEGIN"
 M_REPORT_PROCESS_END = "REPORT_PROCESS_END"
+M_RETURNS = "RETURNS"
+M_ROUND_TRIPS = "ROUND_TRIPS"
+M_ROWS = "ROWS"
 
 M_SCHEMA = "SCHEMA"
+M_SCHEMA_CHANGES = "SCHEMA_CHANGES"
+M_SEARCH = "SEARCH"
+M_SOURCE = "SOURCE"
+M_STAGE = "STAGE"
+M_STAGE_TIME = "STAGE_TIME"
+M_SUBPROGRAM = "SUBPROGRAM"
+M_SUBPROGRAMS = "SUBPROGRAMS"
 
 M_TABLE = "TABLE"
 M_TABLE_CATEGORY = "TABLE_CATEGORY"
@@ -0,0 +1,179 @@
+import operator
+import sys
+
+
+class Record:
+    # Base of compact model objects. Fields are slots, but process and report functions still use them as dicts
+    __slots__ = ()
+    # fields, which are absent for dict users while they are None
+    optional = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # all field values are read by one C call, model of big schema has millions of them
+        cls.field_values = operator.attrgetter(*cls.__slots__)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        if key in self.optional:
+            return getattr(self, key) is not None
+        return key in self.__slots__
+
+    def keys(self):
+        return [name for name in self.__slots__ if name in self]
+
+    def get(self, key, default=None):
+        if key in self:
+            return getattr(self, key)
+        return default
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.keys()}
+
+    def pack(self):
+        # marshal saves only builtin types, so records are saved as tuples of field values
+        return self.field_values(self)
+
+    @classmethod
+    def unpack(cls, values):
+        record = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, values):
+            setattr(record, name, value)
+        return record
+
+
+# Fields of column. Columns are kept in tables as plain tuples of atomic values in this order, collector doesn't
+# track such tuples, so millions of columns cost it nothing
+COLUMN_FIELDS = ("name", "type", "length", "precision", "scale", "default", "comment", "primary_key", "nullable",
+                 "length_semantics", "type_id", "ref_table", "check")
+COLUMN_INDEXES = {name: i for i, name in enumerate(COLUMN_FIELDS)}
+# fields, which are absent for dict users while they are None
+COLUMN_OPTIONAL = ("ref_table", "check")
+
+
+def make_column_values(name, data_type, length, precision, scale, default, comment, primary_key, nullable,
+                       length_semantics, type_id):
+    # names and types repeat across schema, so every table shares the same string objects.
+    # ref_table and check are set by constraints processing
+    return (sys.intern(name), sys.intern(data_type), length, precision, scale, default, comment, primary_key,
+            nullable, length_semantics, sys.intern(type_id), None, None)
+
+
+class Column:
+    # Dict style view of column tuple in table, made on access. Changed field replaces the tuple
+    __slots__ = ("rows", "key")
+
+    def __init__(self, rows, key):
+        self.rows = rows
+        self.key = key
+
+    def __getitem__(self, key):
+        return self.rows[self.key][COLUMN_INDEXES[key]]
+
+    def __setitem__(self, key, value):
+        values = list(self.rows[self.key])
+        values[COLUMN_INDEXES[key]] = value
+        self.rows[self.key] = tuple(values)
+
+    def __contains__(self, key):
+        if key in COLUMN_OPTIONAL:
+            return self[key] is not None
+        return key in COLUMN_INDEXES
+
+    def keys(self):
+        return [name for name in COLUMN_FIELDS if name in self]
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def as_dict(self):
+        return {name: self[name] for name in self.keys()}
+
+    def pack(self):
+        return self.rows[self.key]
+
+
+class Columns:
+    # Columns of table by name. Values are set as tuples of make_column_values and read as Column views
+    __slots__ = ("rows",)
+
+    def __init__(self, rows=None):
+        self.rows = {} if rows is None else rows
+
+    def __getitem__(self, name):
+        if name not in self.rows:
+            raise KeyError(name)
+        return Column(self.rows, name)
+
+    def __setitem__(self, name, values):
+        self.rows[name] = values
+
+    def __contains__(self, name):
+        return name in self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def keys(self):
+        return self.rows.keys()
+
+    def update(self, rows):
+        self.rows.update(rows)
+
+
+class Table(Record):
+    # columns go last, they are packed separately
+    __slots__ = ("name", "owner", "comment", "type", "table_type", "partitioned", "nested", "unique_indexes",
+                 "triggers", "indexes", "columns")
+    optional = ("table_type", "partitioned")
+
+    def __init__(self, name, owner, comment, object_type, nested, table_type=None, partitioned=None):
+        # table names repeat in constraints, indexes and triggers
+        self.name = sys.intern(name)
+        self.owner = sys.intern(owner)
+        self.comment = comment
+        self.type = object_type
+        # views have no table type and partitioning
+        self.table_type = table_type
+        self.partitioned = partitioned
+        self.nested = nested
+        self.unique_indexes = []
+        self.triggers = []
+        self.indexes = []
+        self.columns = Columns()
+
+    def as_dict(self):
+        table = Record.as_dict(self)
+        table["columns"] = [self.columns[name].as_dict() for name in self.columns]
+        return table
+
+    def pack(self):
+        return Record.pack(self)[:-1] + (tuple(self.columns.rows.values()),)
+
+    @classmethod
+    def unpack(cls, values):
+        # unpacked columns are tuples already
+        table = super().unpack(values[:-1])
+        table.columns = Columns({column[0]: column for column in values[-1]})
+        return table
+
+
+def pack_tables(tables):
+    return {table_id: tables[table_id].pack() for table_id in tables}
+
+
+def unpack_tables(tables):
+    return {table_id: Table.unpack(tables[table_id]) for table_id in tables}
@@ -0,0 +1,312 @@
+import re
+
+# Object kinds of streaming queries, tables of every schema go before its views, as in report.
+# Kind is computed by joining all_views in stream_* queries
+STREAM_KIND_TABLE = 0
+STREAM_KIND_VIEW = 1
+
+# Statements are kept on connections, so the same text isn't parsed again on next execution
+STATEMENT_CACHE_SIZE = 40
+# Counts of binds in IN lists are rounded up to one of these, so different object lists give the same text
+IN_LIST_SIZES = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1000]
+
+VIEW_NAME = re.compile(r"\ball_\w+\b")
+# LONG columns of dictionary: column defaults with virtual column formulas, and check conditions
+LONG_COLUMN = re.compile(r"\b(?:t\.data_default|c\.search_condition)\b")
+
+# Dictionary queries with all_* views and placeholders for filters
+QUERIES = {
+    "owners": """
+        select u.username
+          from all_users u
+         where u.username like :pattern
+         order by u.username""",
+    "key_ranges": """
+        select min(table_name)
+          from (select t.table_name, ntile(:n) over (order by t.table_name) as bucket
+                  from all_tables t
+                where {owner_filter}
+                   and t.table_name not like 'BIN$%')
+         group by bucket""",
+    "tables": """
+        select t.table_name, c.comments, t.owner, t.temporary, t.iot_type, t.partitioned, t.nested
+          from all_tables t
+          left join all_tab_comments c
+            on t.owner = c.owner
+           and t.table_name = c.table_name
+         where {owner_filter}
+           and t.table_name not like 'BIN$%'
+         order by t.owner, t.table_name""",
+    "views": """
+        select t.view_name, c.comments, t.owner
+          from all_views t
+          left join all_tab_comments c
+            on t.owner = c.owner
+           and t.view_name = c.table_name
+         where {owner_filter}
+         order by t.owner, t.view_name""",
+    "columns": """
+        select t.owner, t.table_name, t.column_name, c.comments, t.owner, t.data_type,
+            t.data_length, t.data_precision, t.data_scale, t.data_default, t.nullable,
+            t.char_length, t.char_used, dt.owner as dt_owner, dt.type_name
+          from all_tab_columns t
+          left join all_col_comments c
+            on t.owner = c.owner
+           and t.table_name = c.table_name
+           and t.column_name = c.column_name
+          left join all_types dt
+            on dt.owner = t.data_type_owner
+           and t.data_type = dt.type_name
+         where {owner_filter}{range_filter}
+         order by t.owner, t.table_name, t.column_name""",
+    "constraints": """
+        select c.table_name, c.constraint_type, c.constraint_name, c.owner, c.search_condition,
+            c.r_owner, c.r_constraint_name, c.index_owner, c.index_name, r.table_name as r_table_name
+          from all_constraints c
+          left join all_constraints r
+            on r.owner = c.r_owner
+           and r.constraint_name = c.r_constraint_name
+         where {owner_filter}
+           and c.constraint_name not like 'BIN$%'
+         order by c.owner, c.table_name, c.constraint_name""",
+    "constraint_columns": """
+        select cc.owner, cc.constraint_name, cc.column_name
+          from all_cons_columns cc
+         where {owner_filter}
+           and cc.constraint_name not like 'BIN$%'
+         order by owner, table_name, constraint_name, position""",
+    "indexes": """
+        select i.table_owner, i.table_name, i.index_type, i.index_name, i.owner as index_owner
+          from all_indexes i
+         where {owner_filter}
+           and i.table_name not like 'BIN$%'{range_filter}
+         order by i.table_owner, i.table_name, i.index_name""",
+    "index_columns": """
+        select i.table_owner, i.table_name, i.index_name, i.owner as index_owner,
+               c.column_name, c.descend, t.data_default
+          from all_indexes i
+          join all_ind_columns c
+            on i.owner = c.index_owner
+           and i.index_name = c.index_name
+          left join all_tab_cols t
+            on t.owner = i.table_owner
+           and t.table_name = i.table_name
+           and t.column_name = c.column_name
+           and t.virtual_column = 'YES'
+         where {owner_filter}
+           and i.table_name not like 'BIN$%'{range_filter}
+         order by i.table_owner, i.table_name, i.index_name, c.column_position""",
+    "triggers": """
+        select t.table_owner, t.trigger_name, t.trigger_type, t.triggering_event, t.table_name, t.owner
+          from all_triggers t
+         where {owner_filter}
+         order by t.owner, t.table_name, t.trigger_name""",
+    "queues": """
+        select t.owner, t.name, t.queue_table, t.user_comment, t.queue_type
+          from all_queues t
+         where {owner_filter}
+         order by t.owner, t.name, t.queue_table""",
+    "types": """
+        select t.owner, t.type_name, t.typecode
+          from all_types t
+         where {owner_filter}
+         order by t.owner, t.type_name""",
+    "coll_types": """
+        select t.owner, t.type_name, t.coll_type, t.upper_bound, t.elem_type_name, t.length, t.precision,
+            t.scale
+          from all_coll_types t
+         where {owner_filter}
+         order by t.owner, t.type_name""",
+    "type_attrs": """
+        select t.owner, t.type_name, t.attr_name, t.attr_type_owner, t.attr_type_mod, t.attr_type_name,
+            t.precision, t.scale, t.attr_no, t.length
+          from all_type_attrs t
+         where {owner_filter}
+         order by t.owner, t.type_name, attr_no""",
+    "type_methods": """
+        select t.owner, t.type_name, t.method_name, t.method_no
+          from all_type_methods t
+         where {owner_filter}
+         order by t.owner, t.type_name, method_no""",
+    # PL/SQL units are documented by their specifications, package bodies are implementation
+    "code_units": """
+        select o.owner, o.object_name, o.object_type
+          from all_objects o
+         where {owner_filter}
+           and o.object_type in ('PACKAGE', 'PROCEDURE', 'FUNCTION')
+         order by o.owner, o.object_name""",
+    "code_subprograms": """
+        select p.owner, p.object_name, p.procedure_name, p.subprogram_id, p.overload
+          from all_procedures p
+         where {owner_filter}
+           and p.object_type in ('PACKAGE', 'PROCEDURE', 'FUNCTION')
+           and p.subprogram_id > 0
+         order by p.owner, p.object_name, p.subprogram_id""",
+    "code_arguments": """
+        select a.owner, nvl(a.package_name, a.object_name), a.subprogram_id, a.argument_name, a.position,
+            a.data_type, a.in_out
+          from all_arguments a
+         where {owner_filter}
+           and a.data_level = 0
+         order by a.owner, a.package_name, a.object_name, a.subprogram_id, a.sequence""",
+    "code_source": """
+        select s.owner, s.name, s.type, s.line, s.text
+          from all_source s
+         where {owner_filter}
+           and s.type in ('PACKAGE', 'PROCEDURE', 'FUNCTION')
+         order by s.owner, s.name, s.type, s.line""",
+    "object_versions": """
+        select o.owner, o.object_name,
+            decode(o.object_type, 'VIEW', 'TABLE', 'PACKAGE', 'CODE', 'PROCEDURE', 'CODE', 'FUNCTION', 'CODE',
+                   o.object_type),
+            o.last_ddl_time
+          from all_objects o
+         where {owner_filter}
+           and o.object_type in ('TABLE', 'VIEW', 'QUEUE', 'TYPE', 'PACKAGE', 'PROCEDURE', 'FUNCTION')
+           and o.object_name not like 'BIN$%'
+         union all
+        select i.table_owner, i.table_name, 'TABLE', o.last_ddl_time
+          from all_indexes i
+          join all_objects o
+            on o.owner = i.owner
+           and o.object_name = i.index_name
+           and o.object_type = 'INDEX'
+         where {index_filter}
+           and i.table_name not like 'BIN$%'
+         union all
+        select t.table_owner, t.table_name, 'TABLE', o.last_ddl_time
+          from all_triggers t
+          join all_objects o
+            on o.owner = t.owner
+           and o.object_name = t.trigger_name
+           and o.object_type = 'TRIGGER'
+         where {trigger_filter}
+           and t.table_name is not null""",
+    "object_changes": """
+        select count(*), max(o.last_ddl_time)
+          from all_objects o
+         where {owner_filter}""",
+    "stream_tables": """
+        select t.owner, 0 as kind, t.table_name, c.comments, t.temporary, t.iot_type, t.partitioned,
+            t.nested
+          from all_tables t
+          left join all_tab_comments c
+            on t.owner = c.owner
+           and t.table_name = c.table_name
+         where {owner_filter}
+           and t.table_name not like 'BIN$%'
+         union all
+        select t.owner, 1 as kind, t.view_name, c.comments, null, null, null, null
+          from all_views t
+          left join all_tab_comments c
+            on t.owner = c.owner
+           and t.view_name = c.table_name
+         where {owner_filter}
+         order by 1, 2, 3""",
+    "stream_columns": """
+        select t.owner, case when v.view_name is null then 0 else 1 end as kind, t.table_name, t.column_name,
+            c.comments, t.data_type, t.data_length, t.data_precision, t.data_scale, t.data_default, t.nullable,
+            t.char_length, t.char_used, dt.owner as dt_owner, dt.type_name
+          from all_tab_columns t
+          left join all_col_comments c
+            on t.owner = c.owner
+           and t.table_name = c.table_name
+           and t.column_name = c.column_name
+          left join all_types dt
+            on dt.owner = t.data_type_owner
+           and t.data_type = dt.type_name
+          left join all_views v
+            on v.owner = t.owner
+           and v.view_name = t.table_name
+         where {owner_filter}
+         order by t.owner, kind, t.table_name, t.column_name""",
+    "stream_constraints": """
+        select c.owner, case when v.view_name is null then 0 else 1 end as kind, c.table_name, c.constraint_type,
+            c.constraint_name, c.search_condition, c.r_owner, c.r_constraint_name, c.index_owner, c.index_name,
+            r.table_name as r_table_name
+          from all_constraints c
+          left join all_constraints r
+            on r.owner = c.r_owner
+           and r.constraint_name = c.r_constraint_name
+          left join all_views v
+            on v.owner = c.owner
+           and v.view_name = c.table_name
+         where {owner_filter}
+           and c.constraint_name not like 'BIN$%'
+         order by c.owner, kind, c.table_name, c.constraint_name""",
+    "stream_constraint_columns": """
+        select cc.owner, case when v.view_name is null then 0 else 1 end as kind, cc.table_name, cc.constraint_name,
+            cc.column_name
+          from all_cons_columns cc
+          left join all_views v
+            on v.owner = cc.owner
+           and v.view_name = cc.table_name
+         where {owner_filter}
+           and cc.constraint_name not like 'BIN$%'
+         order by cc.owner, kind, cc.table_name, cc.constraint_name, cc.position""",
+    "stream_indexes": """
+        select i.table_owner, 0 as kind, i.table_name, i.index_type, i.index_name, i.owner as index_owner
+          from all_indexes i
+         where {owner_filter}
+           and i.table_name not like 'BIN$%'
+         order by i.table_owner, i.table_name, i.index_name""",
+    "stream_index_columns": """
+        select i.table_owner, 0 as kind, i.table_name, i.index_name, i.owner as index_owner,
+               c.column_name, c.descend, t.data_default
+          from all_indexes i
+          join all_ind_columns c
+            on i.owner = c.index_owner
+           and i.index_name = c.index_name
+          left join all_tab_cols t
+            on t.owner = i.table_owner
+           and t.table_name = i.table_name
+           and t.column_name = c.column_name
+           and t.virtual_column = 'YES'
+         where {owner_filter}
+           and i.table_name not like 'BIN$%'
+         order by i.table_owner, i.table_name, i.index_name, c.column_position""",
+    "stream_triggers": """
+        select t.table_owner, case when v.view_name is null then 0 else 1 end as kind, t.table_name, t.trigger_name,
+            t.trigger_type, t.triggering_event, t.owner
+          from all_triggers t
+          left join all_views v
+            on v.owner = t.table_owner
+           and v.view_name = t.table_name
+         where {owner_filter}
+           and t.table_name is not null
+         order by t.table_owner, kind, t.table_name, t.owner, t.trigger_name""",
+}
+
+
+def resolve_views(sql, available_views):
+    # whole names only, so all_tab_cols isn't replaced by part of all_tab_columns replacement
+    return VIEW_NAME.sub(lambda match: available_views.get(match.group(0), match.group(0)), sql)
+
+
+def skip_long_columns(sql):
+    # LONG column in select list turns off prefetching, so skipped ones aren't selected at all
+    return LONG_COLUMN.sub("null", sql)
+
+
+def make_catalog(available_views, skip_long=False):
+    # views are resolved once for every query, at startup
+    queries = {name: resolve_views(QUERIES[name], available_views) for name in QUERIES}
+    if skip_long:
+        queries = {name: skip_long_columns(queries[name]) for name in queries}
+    return {"queries": queries, "statements": {}}
+
+
+def get_statement(catalog, name, **filters):
+    # statement is built once for every set of filters and then the same text is reused
+    key = (name,) + tuple(sorted(filters.items()))
+    statements = catalog["statements"]
+    if key not in statements:
+        statements[key] = catalog["queries"][name].format(**filters)
+    return statements[key]
+
+
+def get_in_list_size(count):
+    for size in IN_LIST_SIZES:
+        if count <= size:
+            return size
+    return IN_LIST_SIZES[-1]
@@ -0,0 +1,85 @@
+import hashlib
+import marshal
+import os
+
+# Rendered sections of objects, kept on disk between runs. Fragment key is hash of object values, report mode,
+# locale messages and code of modules, which render them, so changed objects and new versions miss the cache.
+# Least recently used fragments are removed, when cache grows over its size. Fragment use time is modification
+# time of its file, it is updated on every hit
+FRAGMENT_SUFFIX = ".frag"
+DIGEST_SIZE = 20
+# same as for schema diff: values are written without marks of interned and repeated objects
+MARSHAL_VERSION = 0
+RENDER_MODULES = ["main.py", "reports.py", os.path.join("report_functions", "html.py")]
+
+
+def get_code_key():
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in RENDER_MODULES:
+        with open(os.path.join(module_dir, name), "rb") as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+def open_cache(directory, max_size, context):
+    # context is everything, which changes all fragments, like report mode and locale messages
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.blake2b(get_code_key(), digest_size=DIGEST_SIZE)
+    digest.update(marshal.dumps(context, MARSHAL_VERSION))
+    return {"directory": directory, "max_size": max_size, "context": digest.digest(), "hits": 0, "misses": 0}
+
+
+def get_fragment_key(cache, values):
+    digest = hashlib.blake2b(cache["context"], digest_size=DIGEST_SIZE)
+    digest.update(marshal.dumps(values, MARSHAL_VERSION))
+    return digest.hexdigest()
+
+
+def get_fragment_file(cache, key):
+    return os.path.join(cache["directory"], key + FRAGMENT_SUFFIX)
+
+
+def get_fragment(cache, key):
+    filename = get_fragment_file(cache, key)
+    try:
+        with open(filename, "r", encoding="utf-8", newline="") as f:
+            fragment = f.read()
+    except FileNotFoundError:
+        cache["misses"] += 1
+        return None
+    os.utime(filename)
+    cache["hits"] += 1
+    return fragment
+
+
+def put_fragment(cache, key, fragment):
+    # fragment is renamed into place, so other run never reads it half written
+    filename = get_fragment_file(cache, key)
+    temp_filename = "{}.{}.tmp".format(filename, os.getpid())
+    with open(temp_filename, "w", encoding="utf-8", newline="") as f:
+        f.write(fragment)
+    os.replace(temp_filename, filename)
+
+
+def close_cache(cache):
+    fragments = []
+    size = 0
+    with os.scandir(cache["directory"]) as entries:
+        for entry in entries:
+            if entry.name.endswith(FRAGMENT_SUFFIX):
+                stat = entry.stat()
+                fragments.append((stat.st_mtime, stat.st_size, entry.path))
+                size += stat.st_size
+    if size <= cache["max_size"]:
+        return
+    fragments.sort()
+    for mtime, fragment_size, filename in fragments:
+        if size <= cache["max_size"]:
+            break
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            # removed by other run
+            pass
+        size -= fragment_size
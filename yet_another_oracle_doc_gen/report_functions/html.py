@@ -1,4 +1,102 @@
-import codecs
+import json
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+FILE_EXTENSION = ".html"
+# output of functions depends only on their arguments, so rendered parts could be copied
+CACHE_FRAGMENTS = True
+# Search widget, loads index shards as scripts by first characters of every query word
+SEARCH_RESULTS_LIMIT = 100
+SEARCH_SCRIPT = """
+var yaodgSearch = {
+  shards: {},
+  requested: {},
+  key: function (word) {
+    return Array.from(word).slice(0, 2).map(function (c) { return c.codePointAt(0).toString(16); }).join("_");
+  },
+  add: function (key, shard) {
+    this.shards[key] = shard;
+    this.run();
+  },
+  load: function (key) {
+    var self = this, script = document.createElement("script");
+    this.requested[key] = true;
+    script.src = yaodgSearchDir + key + ".js";
+    // there is no shard, when no token starts with such characters
+    script.onerror = function () { self.add(key, {docs: [], tokens: {}}); };
+    document.body.appendChild(script);
+  },
+  run: function () {
+    var words = document.getElementById("yaodg-search").value.toLowerCase().split(/\\s+/).filter(function (word) {
+      return Array.from(word).length >= 2;
+    });
+    var found = null, matched = {}, missing = false, i;
+    for (i = 0; i < words.length; i++) {
+      var key = this.key(words[i]);
+      if (!(key in this.shards)) {
+        missing = true;
+        if (!(key in this.requested)) {
+          this.load(key);
+        }
+      }
+    }
+    if (missing) {
+      return;
+    }
+    for (i = 0; i < words.length; i++) {
+      var shard = this.shards[this.key(words[i])], docs = {};
+      for (var token in shard.tokens) {
+        if (token.lastIndexOf(words[i], 0) === 0) {
+          shard.tokens[token].forEach(function (doc) {
+            var link = shard.docs[doc][1];
+            if (found === null || link in found) {
+              docs[link] = shard.docs[doc];
+              (matched[link] = matched[link] || []).push(token);
+            }
+          });
+        }
+      }
+      found = docs;
+    }
+    var results = document.getElementById("yaodg-search-results");
+    results.innerHTML = "";
+    var links = found === null ? [] : Object.keys(found).slice(0, yaodgSearchLimit);
+    links.forEach(function (link) {
+      var item = document.createElement("li"), a = document.createElement("a");
+      a.href = link;
+      a.textContent = found[link][0];
+      item.appendChild(a);
+      item.appendChild(document.createTextNode(" (" + matched[link].filter(function (token, n, tokens) {
+        return tokens.indexOf(token) === n;
+      }).join(", ") + ")"));
+      results.appendChild(item);
+    });
+  }
+};
+"""
+
+
+class ReportBuffer:
+    # Collects report fragments in memory and writes them to file in big UTF-8 encoded chunks
+    def __init__(self, filename, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.file = open(filename, "wb")
+        self.buffer_size = buffer_size
+        self.fragments = []
+        self.size = 0
+
+    def write(self, text):
+        self.fragments.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.file.write("".join(self.fragments).encode("utf-8"))
+        self.fragments = []
+        self.size = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
 
 
 def add_header(file, text, size=1):
@@ -6,14 +104,21 @@ def add_header(file, text, size=1):
     file.write('<{0}>{1}</{2}>'.format(tag, text, tag))
 
 
-def add_link(file, anchor, text):
-    file.write('<a href="#{0}">{1}</a>'.format(anchor, text))
+def add_link(file, anchor, text, page=""):
+    file.write('<a href="{0}#{1}">{2}</a>'.format(page, anchor, text))
 
 
 def add_link_anchor(file, anchor):
     file.write('<a id="{0}"></a>'.format(anchor))
 
 
+def add_search(file, search_dir, placeholder):
+    file.write('<input id="yaodg-search" type="search" placeholder="{0}" oninput="yaodgSearch.run()">'
+               '<ul id="yaodg-search-results"></ul>'.format(placeholder))
+    file.write("<script>var yaodgSearchDir = {0}; var yaodgSearchLimit = {1};{2}</script>".format(
+        json.dumps(search_dir), SEARCH_RESULTS_LIMIT, SEARCH_SCRIPT))
+
+
 def add_new_line(file):
     file.write('<br>')
 
@@ -27,7 +132,7 @@ def add_table_row(file):
 
 
 def add_table_cell(file, text):
-    file.write("<td>{}</td>".format(text))
+    file.write("<td>" + str(text) + "</td>")
 
 
 def open_table_cell(file):
@@ -58,6 +163,19 @@ def close_list(file):
     file.write('</ul>')
 
 
+def open_code(file):
+    file.write("<pre><code>")
+
+
+def add_code(file, text):
+    # source is the only text, which isn't markup, so only it is escaped
+    file.write(text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;"))
+
+
+def close_code(file):
+    file.write("</code></pre>")
+
+
 def write(file, text):
     file.write(text)
 
@@ -67,8 +185,8 @@ def init(file):
     file.write("<body>")
 
 
-def open_file(filename):
-    f = codecs.open(filename, 'w', "utf-8")
+def open_file(filename, buffer_size=DEFAULT_BUFFER_SIZE):
+    f = ReportBuffer(filename, buffer_size)
     return f
 
 
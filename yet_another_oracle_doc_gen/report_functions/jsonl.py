@@ -0,0 +1,17 @@
+import json
+from yet_another_oracle_doc_gen.report_functions.html import ReportBuffer, DEFAULT_BUFFER_SIZE
+
+# Records of objects, one JSON document per line, so file could be read before it's finished and split by lines
+
+
+def open_file(filename, buffer_size=DEFAULT_BUFFER_SIZE):
+    f = ReportBuffer(filename, buffer_size)
+    return f
+
+
+def write_record(file, record):
+    file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+def close_file(file, file_name=None):
+    file.close()
@@ -0,0 +1,300 @@
+import hashlib
+import re
+import time
+import zipfile
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+FILE_EXTENSION = ".docx"
+# Word limits bookmark names to 40 characters, starting with letter
+BOOKMARK_PREFIX = "b"
+INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# most of texts are names without special characters, they are written as is
+SPECIAL_CHARS = re.compile('[&<>"\x00-\x08\x0b\x0c\x0e-\x1f]')
+TABLE_WIDTH = 9000
+TAB_SIZE = 4
+RELATIONSHIP_HYPERLINK = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" \
+ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/styles.xml" \
+ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+</Types>"""
+
+PACKAGE_RELATIONSHIPS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" \
+Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+<w:docDefaults><w:rPrDefault><w:rPr><w:sz w:val="20"/></w:rPr></w:rPrDefault></w:docDefaults>
+<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>
+<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/>\
+<w:next w:val="Normal"/><w:pPr><w:keepNext/><w:spacing w:before="240" w:after="120"/><w:outlineLvl w:val="0"/></w:pPr>\
+<w:rPr><w:b/><w:sz w:val="32"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/><w:basedOn w:val="Normal"/>\
+<w:next w:val="Normal"/><w:pPr><w:keepNext/><w:spacing w:before="200" w:after="100"/><w:outlineLvl w:val="1"/></w:pPr>\
+<w:rPr><w:b/><w:sz w:val="28"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="Heading3"><w:name w:val="heading 3"/><w:basedOn w:val="Normal"/>\
+<w:next w:val="Normal"/><w:pPr><w:keepNext/><w:spacing w:before="160" w:after="80"/><w:outlineLvl w:val="2"/></w:pPr>\
+<w:rPr><w:b/><w:sz w:val="24"/></w:rPr></w:style>
+<w:style w:type="paragraph" w:styleId="ListBullet"><w:name w:val="List Bullet"/><w:basedOn w:val="Normal"/>\
+<w:pPr><w:ind w:left="720" w:hanging="360"/></w:pPr></w:style>
+<w:style w:type="paragraph" w:styleId="Code"><w:name w:val="Code"/><w:basedOn w:val="Normal"/>\
+<w:pPr><w:spacing w:before="0" w:after="0"/></w:pPr>\
+<w:rPr><w:rFonts w:ascii="Courier New" w:hAnsi="Courier New" w:cs="Courier New"/><w:sz w:val="18"/></w:rPr></w:style>
+<w:style w:type="character" w:styleId="Hyperlink"><w:name w:val="Hyperlink"/>\
+<w:rPr><w:color w:val="0563C1"/><w:u w:val="single"/></w:rPr></w:style>
+<w:style w:type="table" w:styleId="TableGrid"><w:name w:val="Table Grid"/><w:tblPr><w:tblBorders>\
+<w:top w:val="single" w:sz="4" w:space="0" w:color="auto"/>\
+<w:left w:val="single" w:sz="4" w:space="0" w:color="auto"/>\
+<w:bottom w:val="single" w:sz="4" w:space="0" w:color="auto"/>\
+<w:right w:val="single" w:sz="4" w:space="0" w:color="auto"/>\
+<w:insideH w:val="single" w:sz="4" w:space="0" w:color="auto"/>\
+<w:insideV w:val="single" w:sz="4" w:space="0" w:color="auto"/>\
+</w:tblBorders></w:tblPr></w:style>
+</w:styles>"""
+
+DOCUMENT_START = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" \
+xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><w:body>"""
+
+DOCUMENT_END = """<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>\
+<w:pgMar w:top="1134" w:right="850" w:bottom="1134" w:left="1134" w:header="708" w:footer="708" w:gutter="0"/>\
+</w:sectPr></w:body></w:document>"""
+
+
+class DocxWriter:
+    # Writes WordprocessingML straight into document entry of zip container, in big UTF-8 encoded chunks.
+    # Report functions write text and links as in HTML, so writer opens and closes paragraphs itself
+    def __init__(self, filename, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.zip = zipfile.ZipFile(filename, "w", zipfile.ZIP_DEFLATED)
+        self.zip.writestr("[Content_Types].xml", CONTENT_TYPES)
+        self.zip.writestr("_rels/.rels", PACKAGE_RELATIONSHIPS)
+        self.zip.writestr("word/styles.xml", STYLES)
+        document = zipfile.ZipInfo("word/document.xml", time.localtime()[:6])
+        document.compress_type = zipfile.ZIP_DEFLATED
+        self.document = self.zip.open(document, "w")
+        self.buffer_size = buffer_size
+        self.fragments = []
+        self.size = 0
+        self.paragraph = False
+        self.cell_empty = False
+        # first row of table is kept, until number of columns for table grid is known
+        self.first_row = None
+        self.first_row_cells = 0
+        self.bookmarks = 0
+        # relationships of links to other documents by target
+        self.links = {}
+        self.write(DOCUMENT_START)
+
+    def write(self, xml):
+        if self.first_row is not None:
+            self.first_row.append(xml)
+            return
+        self.fragments.append(xml)
+        self.size += len(xml)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        self.document.write("".join(self.fragments).encode("utf-8"))
+        self.fragments = []
+        self.size = 0
+
+    def open_paragraph(self, properties=""):
+        if not self.paragraph:
+            self.write("<w:p>" + properties)
+            self.paragraph = True
+            self.cell_empty = False
+
+    def close_paragraph(self):
+        if self.paragraph:
+            self.write("</w:p>")
+            self.paragraph = False
+
+    def add_run(self, text):
+        run = '<w:r><w:t xml:space="preserve">' + escape(text) + '</w:t></w:r>'
+        if not self.paragraph:
+            run = "<w:p>" + run
+            self.paragraph = True
+            self.cell_empty = False
+        self.write(run)
+
+    def get_link_relationship(self, target):
+        if target not in self.links:
+            self.links[target] = "rIdLink{}".format(len(self.links) + 1)
+        return self.links[target]
+
+    def close(self):
+        self.close_paragraph()
+        self.write(DOCUMENT_END)
+        self.flush()
+        self.document.close()
+        relationships = ['<Relationship Id="rIdStyles" '
+                         'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+                         'Target="styles.xml"/>']
+        for target in self.links:
+            relationships.append('<Relationship Id="{0}" Type="{1}" Target="{2}" TargetMode="External"/>'.format(
+                self.links[target], RELATIONSHIP_HYPERLINK, escape(target)))
+        self.zip.writestr("word/_rels/document.xml.rels",
+                          '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                          '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">' +
+                          "".join(relationships) + "</Relationships>")
+        self.zip.close()
+
+
+def escape(text):
+    text = str(text)
+    if SPECIAL_CHARS.search(text) is None:
+        return text
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+    return INVALID_XML_CHARS.sub("", text)
+
+
+def get_bookmark(anchor):
+    # anchors are object ids with dots and any characters of quoted names, so bookmarks are made from their hashes
+    return BOOKMARK_PREFIX + hashlib.sha1(anchor.encode("utf-8")).hexdigest()[:32]
+
+
+def add_header(file, text, size=1):
+    file.close_paragraph()
+    file.open_paragraph('<w:pPr><w:pStyle w:val="Heading{0}"/></w:pPr>'.format(size))
+    file.add_run(text)
+    file.close_paragraph()
+
+
+def add_link(file, anchor, text, page=""):
+    file.open_paragraph()
+    if page:
+        link = 'r:id="{0}"'.format(file.get_link_relationship(page + "#" + get_bookmark(anchor)))
+    else:
+        link = 'w:anchor="{0}"'.format(get_bookmark(anchor))
+    file.write('<w:hyperlink {0} w:history="1"><w:r><w:rPr><w:rStyle w:val="Hyperlink"/></w:rPr>'
+               '<w:t xml:space="preserve">{1}</w:t></w:r></w:hyperlink>'.format(link, escape(text)))
+
+
+def add_link_anchor(file, anchor):
+    # bookmarks are allowed both in paragraph and between them
+    file.bookmarks += 1
+    file.write('<w:bookmarkStart w:id="{0}" w:name="{1}"/><w:bookmarkEnd w:id="{0}"/>'.format(
+        file.bookmarks, get_bookmark(anchor)))
+
+
+def add_new_line(file):
+    # line ends paragraph, line without text is empty paragraph
+    if file.paragraph:
+        file.close_paragraph()
+    else:
+        file.write("<w:p/>")
+
+
+def add_table(file):
+    file.close_paragraph()
+    file.write('<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="0" w:type="auto"/></w:tblPr>')
+    file.first_row = []
+    file.first_row_cells = 0
+
+
+def add_table_row(file):
+    file.write("<w:tr>")
+
+
+def add_table_cell(file, text):
+    # cells with text are most of document, so they are written at once
+    if file.first_row is not None:
+        file.first_row_cells += 1
+    text = escape(text)
+    if text:
+        file.write('<w:tc><w:p><w:r><w:t xml:space="preserve">' + text + '</w:t></w:r></w:p></w:tc>')
+    else:
+        file.write("<w:tc><w:p/></w:tc>")
+
+
+def open_table_cell(file):
+    if file.first_row is not None:
+        file.first_row_cells += 1
+    file.write("<w:tc>")
+    file.cell_empty = True
+
+
+def close_table_cell(file):
+    file.close_paragraph()
+    # cell should have at least one paragraph
+    if file.cell_empty:
+        file.write("<w:p/>")
+        file.cell_empty = False
+    file.write("</w:tc>")
+
+
+def close_table(file):
+    if file.first_row is not None:
+        close_first_row(file)
+    file.write("</w:tbl>")
+
+
+def close_table_row(file):
+    file.write("</w:tr>")
+    if file.first_row is not None:
+        close_first_row(file)
+
+
+def close_first_row(file):
+    first_row = file.first_row
+    file.first_row = None
+    columns = max(file.first_row_cells, 1)
+    file.write("<w:tblGrid>" + '<w:gridCol w:w="{0}"/>'.format(TABLE_WIDTH // columns) * columns + "</w:tblGrid>")
+    file.write("".join(first_row))
+
+
+def open_list(file):
+    file.close_paragraph()
+
+
+def add_list_element(file, text):
+    file.close_paragraph()
+    file.open_paragraph('<w:pPr><w:pStyle w:val="ListBullet"/></w:pPr>')
+    file.add_run("\u2022 " + str(text))
+    file.close_paragraph()
+
+
+def close_list(file):
+    pass
+
+
+def open_code(file):
+    file.close_paragraph()
+
+
+def add_code(file, text):
+    # every line of source is paragraph, tabs are expanded, because text of run keeps only spaces
+    for line in escape(text.expandtabs(TAB_SIZE)).splitlines():
+        file.write('<w:p><w:pPr><w:pStyle w:val="Code"/></w:pPr><w:r><w:t xml:space="preserve">' + line +
+                   '</w:t></w:r></w:p>')
+
+
+def close_code(file):
+    pass
+
+
+def write(file, text):
+    file.add_run(text)
+
+
+def init(file):
+    # document start is written by writer, because package parts should go before it
+    pass
+
+
+def open_file(filename, buffer_size=DEFAULT_BUFFER_SIZE):
+    f = DocxWriter(filename, buffer_size)
+    return f
+
+
+def close_file(file, file_name=None):
+    file.close()
@@ -1,59 +1,150 @@
-import yet_another_oracle_doc_gen.report_functions.html as html
-#import yet_another_oracle_doc_gen.report_functions.ms_word as word
+import importlib
+from urllib.parse import quote
 MODE_HTML = "HTML"
 MODE_WORD = "DOCX"
+# JSON lines aren't document, so they are written by records, without Report
+MODE_JSONL = "JSONL"
+FILE_EXTENSIONS = {MODE_HTML: ".html", MODE_WORD: ".docx", MODE_JSONL: ".jsonl"}
+# Modules with report functions of built in modes, imported by first report of the mode. They aren't entry points,
+# so start doesn't scan metadata of installed packages. Other modes are looked up in entry points of installed
+# packages, entry point name is mode and value is module
+BACKENDS = {MODE_HTML: "yet_another_oracle_doc_gen.report_functions.html",
+            MODE_WORD: "yet_another_oracle_doc_gen.report_functions.ms_word"}
+BACKEND_ENTRY_POINTS = "yet_another_oracle_doc_gen.report_backends"
+# Report attributes and backend functions, bound to them. Backend without search just has no add_search
+BACKEND_FUNCTIONS = {"_add_header": "add_header", "_write": "write", "_set_file": "open_file",
+                     "_close_file": "close_file", "_init": "init", "_new_line": "add_new_line", "_add_link": "add_link",
+                     "_add_link_anchor": "add_link_anchor", "_add_search": "add_search", "_add_table": "add_table",
+                     "_add_table_row": "add_table_row", "_add_table_cell": "add_table_cell",
+                     "_close_table": "close_table", "_close_table_row": "close_table_row",
+                     "_open_table_cell": "open_table_cell", "_close_table_cell": "close_table_cell",
+                     "_add_list_element": "add_list_element", "_open_list": "open_list", "_close_list": "close_list",
+                     "_open_code": "open_code", "_add_code": "add_code", "_close_code": "close_code"}
+# Loaded backend modules by mode
+_backends = {}
+# Rendered constant parts of reports by mode and key, shared by all reports of process
+_fragments = {}
+
+
+def find_backend_entry_point(mode):
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        # before Python 3.8 only built in backends are available
+        return None
+    found = entry_points()
+    if hasattr(found, "select"):
+        found = found.select(group=BACKEND_ENTRY_POINTS)
+    else:
+        found = found.get(BACKEND_ENTRY_POINTS, [])
+    for entry_point in found:
+        if entry_point.name.upper() == mode:
+            return entry_point
+    return None
+
+
+def get_backend(mode):
+    backend = _backends.get(mode)
+    if backend is not None:
+        return backend
+    if mode in BACKENDS:
+        backend = importlib.import_module(BACKENDS[mode])
+    else:
+        entry_point = find_backend_entry_point(mode)
+        if entry_point is None:
+            raise ValueError('Unsupported report type: {}'.format(mode))
+        backend = entry_point.load()
+    _backends[mode] = backend
+    return backend
+
+
+def get_file_extension(mode):
+    if mode in FILE_EXTENSIONS:
+        return FILE_EXTENSIONS[mode]
+    return getattr(get_backend(mode), "FILE_EXTENSION", "." + mode.lower())
+
+
+class FragmentCapture:
+    # Collects text written by report functions, instead of file
+    def __init__(self):
+        self.fragments = []
+
+    def write(self, text):
+        self.fragments.append(text)
 
 
 class Report:
-    def __init__(self, mode=MODE_HTML):
+    def __init__(self, mode=MODE_HTML, buffer_size=None):
         self.file = None
         self.file_name = None
         self.mode = mode
-        if self.mode == MODE_HTML:
-            self._add_header = html.add_header
-            self._write = html.write
-            self._set_file = html.open_file
-            self._close_file = html.close_file
-            self._init = html.init
-            self._new_line = html.add_new_line
-            self._add_link = html.add_link
-            self._add_link_anchor = html.add_link_anchor
-            self._add_table = html.add_table
-            self._add_table_row = html.add_table_row
-            self._add_table_cell = html.add_table_cell
-            self._close_table = html.close_table
-            self._close_table_row = html.close_table_row
-            self._open_table_cell = html.open_table_cell
-            self._close_table_cell = html.close_table_cell
-            self._add_list_element = html.add_list_element
-            self._open_list = html.open_list
-            self._close_list = html.close_list
-        # elif self.mode == MODE_WORD:
-        #     self._add_header = word.add_header
-        #     self._write = word.write
-        #     self._set_file = word.open_file
-        #     self._close_file = word.close_file
-        #     self._init = word.init
-        #     self._new_line = word.add_new_line
-        #     self._add_link = word.add_link
-        #     self._add_link_anchor = word.add_link_anchor
-        #     self._add_table = word.add_table
-        #     self._add_table_row = word.add_table_row
-        #     self._add_table_cell = word.add_table_cell
-        #     self._close_table = word.close_table
-        #     self._close_table_row = word.close_table_row
-        #     self._open_table_cell = word.open_table_cell
-        #     self._close_table_cell = word.close_table_cell
-        #     self._add_list_element = word.add_list_element
-        #     self._open_list = word.open_list
-        #     self._close_list = word.close_list
-        else:
-            raise ValueError('Unsupported report type: {}'.format(mode))
+        self.buffer_size = buffer_size
+        # pages of multi-file report by anchor, links to other pages are written as page.html#anchor
+        self.pages = None
+        self.page = None
+        self.pages_dir = ""
+        backend = get_backend(mode)
+        # Word writer keeps state of paragraphs and tables, so its output can't be cached and copied
+        self.cache_fragments = getattr(backend, "CACHE_FRAGMENTS", False)
+        # on-disk cache of rendered object sections, opened by caller
+        self.render_cache = None
+        for method, function in BACKEND_FUNCTIONS.items():
+            setattr(self, method, getattr(backend, function, None))
 
     def set_file(self, filename):
-        self.file = self._set_file(filename)
+        if self.buffer_size is None:
+            self.file = self._set_file(filename)
+        else:
+            self.file = self._set_file(filename, self.buffer_size)
         self.file_name = filename
 
+    def set_pages(self, pages, page=None, pages_dir=""):
+        # page is current page name, pages_dir is path from current file to pages
+        self.pages = pages
+        self.page = page
+        self.pages_dir = pages_dir
+
+    def get_page_link(self, anchor):
+        if self.pages is None or anchor not in self.pages:
+            return ""
+        page = self.pages[anchor]
+        if page == self.page:
+            return ""
+        return quote(self.pages_dir + page)
+
+    def add_fragment(self, key, render, *args):
+        # constant parts of report, like table headers, are rendered once, and then copied as string
+        if not self.cache_fragments:
+            render(self, *args)
+            return
+        fragment = _fragments.get((self.mode, key))
+        if fragment is None:
+            fragment = self.capture(render, *args)
+            _fragments[(self.mode, key)] = fragment
+        self._write(self.file, fragment)
+
+    def add_cached(self, values, render, *args):
+        # object sections are taken from render cache by hash of values they are rendered from
+        if self.render_cache is None or not self.cache_fragments:
+            render(self, *args)
+            return
+        from yet_another_oracle_doc_gen.render_cache import get_fragment, get_fragment_key, put_fragment
+        key = get_fragment_key(self.render_cache, values)
+        fragment = get_fragment(self.render_cache, key)
+        if fragment is None:
+            fragment = self.capture(render, *args)
+            put_fragment(self.render_cache, key, fragment)
+        self._write(self.file, fragment)
+
+    def capture(self, render, *args):
+        file = self.file
+        self.file = FragmentCapture()
+        try:
+            render(self, *args)
+            return "".join(self.file.fragments)
+        finally:
+            self.file = file
+
     def add_header(self, text, size=1):
         self._add_header(self.file, text, size)
 
@@ -70,11 +161,14 @@ class Report:
         self._new_line(self.file)
 
     def add_link(self, anchor, text):
-        self._add_link(self.file, anchor, text)
+        self._add_link(self.file, anchor, text, self.get_page_link(anchor))
 
     def add_link_anchor(self, anchor):
         self._add_link_anchor(self.file, anchor)
 
+    def add_search(self, search_dir, placeholder):
+        self._add_search(self.file, quote(search_dir), placeholder)
+
     def add_table(self):
         self._add_table(self.file)
 
@@ -118,4 +212,14 @@ class Report:
         self._add_list_element(self.file, elem)
 
     def close_list(self):
-        self._close_list(self.file)
\ No newline at end of file
+        self._close_list(self.file)
+
+    def open_code(self):
+        self._open_code(self.file)
+
+    def add_code(self, text):
+        # text is whole lines of source, written as is
+        self._add_code(self.file, text)
+
+    def close_code(self):
+        self._close_code(self.file)
\ No newline at end of file
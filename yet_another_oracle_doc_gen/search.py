@@ -0,0 +1,92 @@
+import json
+import os
+import re
+
+# Search index of report: tokens of table, column, type and attribute names and comments, pointing to objects.
+# Index is split into shards by first characters of tokens, so search widget loads only shards it needs.
+# Shards are JavaScript files with JSON inside, because browsers don't let pages opened from disk load JSON files
+SEARCH_DIR_SUFFIX = "_search"
+SHARD_KEY_LENGTH = 2
+MIN_TOKEN_LENGTH = 2
+NAME_PARTS = re.compile(r"[\W_]+")
+TEXT_WORDS = re.compile(r"\w+")
+
+
+def get_search_dir(filename):
+    return os.path.splitext(filename)[0] + SEARCH_DIR_SUFFIX
+
+
+def new_search_index():
+    # docs are pairs of label and link, postings are lists of doc numbers by token
+    return {"docs": [], "postings": {}}
+
+
+def get_name_tokens(name):
+    # whole name and its parts, so column CUSTOMER_ID is found by customer_id, customer and id
+    name = name.lower()
+    tokens = set(NAME_PARTS.split(name))
+    tokens.add(name)
+    return tokens
+
+
+def get_text_tokens(text):
+    if text is None:
+        return set()
+    return set(TEXT_WORDS.findall(text.lower()))
+
+
+def add_document(search_index, label, link, tokens):
+    doc = len(search_index["docs"])
+    search_index["docs"].append((label, link))
+    postings = search_index["postings"]
+    for token in tokens:
+        if len(token) >= MIN_TOKEN_LENGTH:
+            postings.setdefault(token, []).append(doc)
+
+
+def add_search_table(search_index, table_id, table, link):
+    tokens = get_name_tokens(table["name"]) | get_text_tokens(table["comment"])
+    for name in table["columns"]:
+        tokens |= get_name_tokens(name)
+        tokens |= get_text_tokens(table["columns"][name]["comment"])
+    add_document(search_index, table_id, link, tokens)
+
+
+def add_search_type(search_index, type_id, type_info, link):
+    tokens = get_name_tokens(type_info["name"])
+    for attr in type_info["attrs"]:
+        tokens |= get_name_tokens(attr["name"])
+    add_document(search_index, type_id, link, tokens)
+
+
+def get_shard_key(token):
+    # code points in hex, same as search widget makes from query
+    return "_".join("{:x}".format(ord(c)) for c in token[:SHARD_KEY_LENGTH])
+
+
+def save_search_index(search_index, directory):
+    os.makedirs(directory, exist_ok=True)
+    # shards of previous report could be missing in this one
+    for name in os.listdir(directory):
+        if name.endswith(".js"):
+            os.remove(os.path.join(directory, name))
+    postings = search_index["postings"]
+    shards = {}
+    for token in postings:
+        shards.setdefault(get_shard_key(token), []).append(token)
+    for key in shards:
+        # every shard has its own list of docs, numbered from zero
+        doc_numbers = {}
+        docs = []
+        tokens = {}
+        for token in shards[key]:
+            token_docs = []
+            for doc in postings[token]:
+                if doc not in doc_numbers:
+                    doc_numbers[doc] = len(docs)
+                    docs.append(search_index["docs"][doc])
+                token_docs.append(doc_numbers[doc])
+            tokens[token] = token_docs
+        shard = json.dumps({"docs": docs, "tokens": tokens}, ensure_ascii=False, separators=(",", ":"))
+        with open(os.path.join(directory, key + ".js"), "w", encoding="utf-8") as f:
+            f.write("yaodgSearch.add({}, {});".format(json.dumps(key), shard))
@@ -0,0 +1,123 @@
+import html
+import http.server
+import json
+import os
+import socketserver
+import threading
+import time
+import traceback
+import urllib.parse
+from yet_another_oracle_doc_gen.reports import get_file_extension, MODE_HTML, MODE_JSONL, MODE_WORD
+
+# Daemon mode: reports of configured databases are served over HTTP. Gathered model of every database is kept in
+# memory. When it is older than TTL, cheap signature of data dictionary is read, and the model is gathered again
+# only if signature changed. Rendered reports are kept until the model changes
+CONTENT_TYPES = {MODE_HTML: "text/html; charset=utf-8",
+                 MODE_WORD: "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                 MODE_JSONL: "application/jsonl; charset=utf-8"}
+# query parameter, which makes signature checked at once, whatever age of the model is
+CHECK_PARAMETER = "check"
+
+
+def load_config(filename):
+    # {"databases": {"name": {"driver": ..., "tns": ..., "user": ..., "password": ..., "target_user": ...}}}
+    with open(filename, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    databases = config.get("databases")
+    if not isinstance(databases, dict) or len(databases) == 0:
+        raise ValueError('No databases in config: {}'.format(filename))
+    return databases
+
+
+def new_entry(database):
+    return {"database": database, "lock": threading.Lock(), "model": None, "signature": None, "checked": None,
+            "reports": {}}
+
+
+def get_report(entry, file_type, ttl, functions, check=False):
+    # requests to one database wait for each other, so the model is gathered once
+    with entry["lock"]:
+        if entry["model"] is not None and (check or time.monotonic() - entry["checked"] >= ttl):
+            if functions["check"](entry["database"]) == entry["signature"]:
+                entry["checked"] = time.monotonic()
+            else:
+                entry["model"] = None
+        if entry["model"] is None:
+            entry["reports"] = {}
+            entry["signature"], entry["model"] = functions["gather"](entry["database"])
+            entry["checked"] = time.monotonic()
+        report = entry["reports"].get(file_type)
+        if report is None:
+            report = functions["render"](entry["database"], entry["model"], file_type)
+            entry["reports"][file_type] = report
+    return report
+
+
+def get_file_types(file_types):
+    # reports are requested as database name with file extension
+    return {get_file_extension(file_type): file_type for file_type in file_types}
+
+
+class ReportServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, entries, file_types, ttl, functions):
+        super().__init__(address, ReportHandler)
+        self.entries = entries
+        self.file_types = file_types
+        self.ttl = ttl
+        self.functions = functions
+
+
+class ReportHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        path = urllib.parse.unquote(url.path).strip("/")
+        if path == "":
+            self.send_body(self.get_index(), CONTENT_TYPES[MODE_HTML])
+            return
+        name, extension = os.path.splitext(path)
+        entry = self.server.entries.get(name)
+        file_type = self.server.file_types.get(extension.lower())
+        if entry is None or file_type is None:
+            self.send_error(404)
+            return
+        check = CHECK_PARAMETER in urllib.parse.parse_qs(url.query, keep_blank_values=True)
+        try:
+            report = get_report(entry, file_type, self.server.ttl, self.server.functions, check)
+        except Exception as exc:
+            traceback.print_exc()
+            self.send_error(500, explain=str(exc))
+            return
+        self.send_body(report, CONTENT_TYPES.get(file_type, "application/octet-stream"))
+
+    def get_index(self):
+        lines = ["<!DOCTYPE html>", "<html><head><meta charset=\"utf-8\"></head><body><ul>"]
+        for name in self.server.entries:
+            links = ['<a href="{}{}">{}</a>'.format(urllib.parse.quote(name), extension, extension[1:])
+                     for extension in self.server.file_types]
+            lines.append("<li>{} {}</li>".format(html.escape(name), " ".join(links)))
+        lines.append("</ul></body></html>")
+        return "\n".join(lines).encode("utf-8")
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host, port, databases, file_types, ttl, functions):
+    # databases are opened by caller, they are closed by functions["close"] on shutdown
+    entries = {name: new_entry(databases[name]) for name in databases}
+    server = ReportServer((host, port), entries, get_file_types(file_types), ttl, functions)
+    print("Serving reports on http://{}:{}/".format(host, server.server_address[1]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for name in databases:
+            functions["close"](databases[name])
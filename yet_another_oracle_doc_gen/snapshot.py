@@ -0,0 +1,46 @@
+import gc
+import marshal
+import mmap
+import os
+from yet_another_oracle_doc_gen.model import pack_tables, unpack_tables
+
+# File starts with magic and format version, marshalled model follows
+SNAPSHOT_MAGIC = b"YAODGSNP"
+SNAPSHOT_FORMAT = 4
+HEADER_SIZE = len(SNAPSHOT_MAGIC) + 4
+
+
+def save_snapshot(filename, snapshot):
+    # snapshot holds gathered model before processing, which changes it.
+    # Column names and types are interned by model, marshal writes them once and references them later,
+    # and loads them as single objects
+    snapshot = dict(snapshot, model=dict(snapshot["model"], tables=pack_tables(snapshot["model"]["tables"])))
+    header = SNAPSHOT_MAGIC + SNAPSHOT_FORMAT.to_bytes(2, "little") + marshal.version.to_bytes(2, "little")
+    temp_name = filename + ".tmp"
+    with open(temp_name, "wb") as f:
+        f.write(header)
+        f.write(marshal.dumps(snapshot))
+    os.replace(temp_name, filename)
+
+
+def load_snapshot(filename):
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                raise ValueError("{} is not a snapshot file".format(filename))
+            snapshot_format = int.from_bytes(data[len(SNAPSHOT_MAGIC):len(SNAPSHOT_MAGIC) + 2], "little")
+            marshal_version = int.from_bytes(data[len(SNAPSHOT_MAGIC) + 2:HEADER_SIZE], "little")
+            if snapshot_format != SNAPSHOT_FORMAT or marshal_version > marshal.version:
+                raise ValueError("Unsupported snapshot format {} in {}".format(snapshot_format, filename))
+            # model is acyclic, so collector runs on millions of new containers would only waste time
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                # unmarshal straight from mapped pages, without reading file into memory first
+                with memoryview(data) as view, view[HEADER_SIZE:] as payload:
+                    snapshot = marshal.loads(payload)
+                snapshot["model"]["tables"] = unpack_tables(snapshot["model"]["tables"])
+            finally:
+                if gc_enabled:
+                    gc.enable()
+    return snapshot